@@ -4,6 +4,7 @@ This package exposes the primary public API for the text chunking layer:
 
     - Chunk / MergedChunk / BBox
     - merge_chunks() helper
+    - ChunkTable (columnar storage for large chunk collections)
     - Chunker / ChunkerConfig for running the pipeline
 
 Everything outside the package should import from here rather than
@@ -13,6 +14,7 @@ reaching into individual modules.
 from __future__ import annotations
 
 from backbone.chunking.chunk import Chunk, MergedChunk, BBox
+from backbone.chunking.chunk_table import ChunkTable
 from backbone.chunking.chunk_utils import merge_chunks
 from .chunker import Chunker, ChunkerConfig
 
@@ -20,6 +22,7 @@ __all__ = [
     "Chunk",
     "MergedChunk",
     "BBox",
+    "ChunkTable",
     "merge_chunks",
     "Chunker",
     "ChunkerConfig",
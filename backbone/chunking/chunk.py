@@ -87,13 +87,19 @@ class MergedChunk(Chunk):
     a higher‑level unit such as a full note, paragraph, or heading
     + body block.
 
-    The constructor performs the following:
+    The merged fields are derived from the children:
 
         * content   – concatenation of all child.contents separated by "\n"
         * bbox      – geometric union of all child.bbox values
         * metadata  – shallow merge of child.metadata (later wins)
         * page      – taken from the first child
         * children  – the original list of Chunk objects
+
+    ``content``, ``bbox`` and ``metadata`` are computed on first access and
+    cached, so building a MergedChunk is O(1) and callers that only need
+    ids / children never pay for the text join or metadata merge. Children
+    edited before the first access are reflected in the result; assigning
+    a field stores that value instead.
     """
 
     def __init__(
@@ -105,57 +111,71 @@ class MergedChunk(Chunk):
         if not chunks:
             raise ValueError("MergedChunk requires at least one child Chunk")
 
+        self._content: Optional[str] = None
+        self._bbox: Optional[BBox] = None
+        self._bbox_ready = False  # None is a valid merged bbox
+        self._metadata: Optional[Dict[str, Any]] = None
+
+        self.id = id or str(uuid.uuid4())
+        self.type = merge_type
         # Canonical values from first child
-        page = chunks[0].page
-        source_file = chunks[0].source_file
-
-        # Merge text
-        content = "\n".join((c.content or "") for c in chunks)
-
-        # Merge bounding boxes
-        bbox = self._union_bbox([c.bbox for c in chunks])
-
-        # Merge metadata (later items override)
-        merged_meta: Dict[str, Any] = {}
-        for c in chunks:
-            merged_meta.update(c.metadata)
-
-        super().__init__(
-            id=id or str(uuid.uuid4()),
-            content=content,
-            type=merge_type,
-            bbox=bbox,
-            page=page,
-            source_file=source_file,
-            metadata=merged_meta,
-            children=list(chunks),
-        )
+        self.page = chunks[0].page
+        self.source_file = chunks[0].source_file
+        self.children = list(chunks)
 
         # Optional alias used by some legacy code
         self.chunks = self.children
 
+    # ------------------------------------------------------------------
+    # Lazily merged fields
+    # ------------------------------------------------------------------
+    @property
+    def content(self) -> str:
+        if self._content is None:
+            self._content = "\n".join((c.content or "") for c in self.children)
+        return self._content
+
+    @content.setter
+    def content(self, value: str) -> None:
+        self._content = value
+
+    @property
+    def bbox(self) -> Optional[BBox]:
+        if not self._bbox_ready:
+            self._bbox = self._union_bbox([c.bbox for c in self.children])
+            self._bbox_ready = True
+        return self._bbox
+
+    @bbox.setter
+    def bbox(self, value: Optional[BBox]) -> None:
+        self._bbox = value
+        self._bbox_ready = True
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        if self._metadata is None:
+            # Later children override earlier ones.
+            merged_meta: Dict[str, Any] = {}
+            for c in self.children:
+                merged_meta.update(c.metadata)
+            self._metadata = merged_meta
+        return self._metadata
+
+    @metadata.setter
+    def metadata(self, value: Dict[str, Any]) -> None:
+        self._metadata = value
+
     # ------------------------------------------------------------------
     @staticmethod
     def _union_bbox(bboxes: List[Optional[BBox]]) -> Optional[BBox]:
         """Return the minimal box that contains all non‑None child bboxes."""
-        xs0: List[float] = []
-        ys0: List[float] = []
-        xs1: List[float] = []
-        ys1: List[float] = []
-
-        for b in bboxes:
-            if not b:
-                continue
-            x0, y0, x1, y1 = b
-            xs0.append(float(x0))
-            ys0.append(float(y0))
-            xs1.append(float(x1))
-            ys1.append(float(y1))
-
-        if not xs0:
+        boxes = [b for b in bboxes if b]
+        if not boxes:
             return None
 
-        return (min(xs0), min(ys0), max(xs1), max(ys1))
+        # Column-wise over the transposed boxes: one C-level min/max per edge.
+        xs0, ys0, xs1, ys1 = zip(*boxes)
+        return (float(min(xs0)), float(min(ys0)), float(max(xs1)), float(max(ys1)))
 
     # ------------------------------------------------------------------
     @classmethod
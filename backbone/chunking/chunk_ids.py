@@ -0,0 +1,75 @@
+"""Deterministic chunk IDs.
+
+By default every :class:`Chunk` gets ``str(uuid.uuid4())``, so two runs over
+the same PDF never agree on IDs. In deterministic mode a line's ID is a hash
+of
+
+    (source hash, page, bbox rounded to BBOX_DECIMALS, text, ordinal)
+
+where *ordinal* counts identical (bbox, text) lines earlier on the same page
+so repeated lines stay distinct. A MergedChunk's ID is derived from its
+children's IDs. The digest is formatted as a UUID string, so anything that
+expects the default ID shape keeps working.
+
+IDs are produced in bulk, one call per page:
+
+    ids = line_ids(source_hash, page_number, [(bbox, text), ...])
+"""
+
+from __future__ import annotations
+
+import hashlib
+import uuid
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from backbone.chunking.chunk import BBox
+
+
+ID_MODE_UUID = "uuid"
+ID_MODE_DETERMINISTIC = "deterministic"
+ID_MODES = (ID_MODE_UUID, ID_MODE_DETERMINISTIC)
+
+# Bbox rounding for the hash (PDF units); absorbs float noise between
+# extractor versions without merging distinct lines.
+BBOX_DECIMALS = 1
+
+
+def _digest_id(payload: str) -> str:
+    return str(uuid.UUID(bytes=hashlib.blake2b(payload.encode("utf-8"), digest_size=16).digest()))
+
+
+def line_ids(
+    source_hash: str,
+    page: Optional[int],
+    lines: Iterable[Tuple[Optional[BBox], str]],
+) -> List[str]:
+    """Deterministic IDs for one page's lines, in input order."""
+    seen: Dict[Tuple[str, str], int] = {}
+    out: List[str] = []
+    prefix = f"{source_hash}|{page}|"
+
+    for bbox, text in lines:
+        box = (
+            ",".join(f"{float(v):.{BBOX_DECIMALS}f}" for v in bbox) if bbox else "-"
+        )
+        key = (box, text)
+        ordinal = seen.get(key, 0)
+        seen[key] = ordinal + 1
+        out.append(_digest_id(f"{prefix}{box}|{text}|{ordinal}"))
+
+    return out
+
+
+def merged_id(child_ids: Sequence[str], merge_type: str = "merged") -> str:
+    """Deterministic ID of a MergedChunk built from *child_ids* (in order)."""
+    return _digest_id(f"merged|{merge_type}|" + "|".join(child_ids))
+
+
+__all__ = [
+    "ID_MODE_UUID",
+    "ID_MODE_DETERMINISTIC",
+    "ID_MODES",
+    "BBOX_DECIMALS",
+    "line_ids",
+    "merged_id",
+]
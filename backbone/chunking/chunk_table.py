@@ -0,0 +1,521 @@
+"""Columnar (struct-of-arrays) storage for collections of chunks.
+
+A :class:`Chunk` is a dataclass with its own ``metadata`` dict, ``children``
+list, bbox tuple and uuid string. On 100k-line sets that is several hundred
+bytes of Python objects per text line, and every grouping / geometry pass
+walks those objects one by one.
+
+:class:`ChunkTable` stores the same information as NumPy columns:
+
+    page              int32    (-1 = None)
+    coords            (n, 4)   x0, y0, x1, y1; NaN = no bbox. float32 when
+                               every value survives the round trip (PyMuPDF
+                               coordinates do), float64 otherwise
+    type_code         int16    index into ``types``
+    source_code       int16    index into ``sources`` (-1 = None)
+    column            int16    ``chunk.column`` attribute (-1 = unset)
+                               (these three are widened to int32 / int64
+                               when a value does not fit int16)
+    parent            int32    row of the parent chunk (-1 = top level)
+    merged            bool     row is a MergedChunk
+    meta_codes[key]   int32    per visual metadata key (``ENCODED_KEYS``):
+                               index into ``meta_values[key]`` (-1 = absent)
+    meta_layout       int32    index into ``layouts`` (key order of the dict)
+
+Text is one UTF-8 blob addressed by byte offsets. IDs are packed to 16
+bytes per row when they are all canonical UUID strings (the default), and
+kept as a blob with offsets otherwise. Metadata keys that are not encoded
+as columns live in the sparse ``extra`` dict (row -> {key: value}).
+
+Rows are stored in pre-order: each MergedChunk row is followed by its
+children (and their children), so ``from_chunks(...).to_chunks()`` gives
+back the same tree: same ids, content, type, bbox, page, source file,
+metadata (including key order) and ``column``.
+
+Usage:
+
+    table = ChunkTable.from_chunks(chunks)
+    ColumnDetector().assign_columns_table(table)
+    grouped = SemanticGrouper().group_table(table, "notes_sheet")
+    chunks = grouped.to_chunks()
+
+New tables are assembled row by row with ``ChunkTable.builder()`` (a
+:class:`ChunkTableBuilder`): ``add_row`` / ``add_tree`` / ``extend_table``,
+then ``build()``.
+"""
+
+from __future__ import annotations
+
+import sys
+import uuid
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backbone.chunking.chunk import BBox, Chunk, MergedChunk
+
+
+# Metadata keys stored as code columns (written by visual_chunker_bridge).
+ENCODED_KEYS: Tuple[str, ...] = (
+    "visual_region_class",
+    "visual_region_id",
+    "visual_note_id",
+    "visual_column_id",
+    "visual_column_index",
+    "visual_confidence",
+)
+
+
+class ChunkTable:
+    """NumPy-backed table of chunks (see module docstring)."""
+
+    def __init__(
+        self,
+        *,
+        page: np.ndarray,
+        coords: np.ndarray,
+        type_code: np.ndarray,
+        source_code: np.ndarray,
+        column: np.ndarray,
+        parent: np.ndarray,
+        merged: np.ndarray,
+        meta_codes: Dict[str, np.ndarray],
+        meta_layout: np.ndarray,
+        text: bytes,
+        text_offsets: np.ndarray,
+        uuids: Optional[np.ndarray],
+        ids: Optional[bytes],
+        id_offsets: Optional[np.ndarray],
+        extra: Dict[int, Dict[str, Any]],
+        types: List[str],
+        sources: List[Optional[str]],
+        meta_values: Dict[str, List[Any]],
+        layouts: List[Tuple[str, ...]],
+    ) -> None:
+        self.page = page
+        self.coords = coords
+        self.type_code = type_code
+        self.source_code = source_code
+        self.column = column
+        self.parent = parent
+        self.merged = merged
+        self.meta_codes = meta_codes
+        self.meta_layout = meta_layout
+
+        self.text = text
+        self.text_offsets = text_offsets
+        self.uuids = uuids
+        self.ids = ids
+        self.id_offsets = id_offsets
+        self.extra = extra
+
+        self.types = types
+        self.sources = sources
+        self.meta_values = meta_values
+        self.layouts = layouts
+
+    # ------------------------------------------------------------------
+    # Column views
+    # ------------------------------------------------------------------
+    @property
+    def x0(self) -> np.ndarray:
+        return self.coords[:, 0]
+
+    @property
+    def y0(self) -> np.ndarray:
+        return self.coords[:, 1]
+
+    @property
+    def x1(self) -> np.ndarray:
+        return self.coords[:, 2]
+
+    @property
+    def y1(self) -> np.ndarray:
+        return self.coords[:, 3]
+
+    @property
+    def has_bbox(self) -> np.ndarray:
+        return ~np.isnan(self.coords[:, 0])
+
+    @property
+    def visual_note(self) -> np.ndarray:
+        """Code of metadata["visual_note_id"] per row (-1 = key absent)."""
+        return self.meta_codes["visual_note_id"]
+
+    def has_meta_key(self, key: str, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Boolean mask: rows whose metadata contains *key*."""
+        if rows is None:
+            rows = np.arange(len(self))
+        if key in self.meta_codes:
+            mask = self.meta_codes[key][rows] >= 0
+        else:
+            mask = np.zeros(rows.size, dtype=bool)
+        if self.extra:
+            extra = self.extra
+            mask |= np.fromiter(
+                (key in extra.get(r, ()) for r in rows.tolist()), dtype=bool, count=rows.size
+            )
+        return mask
+
+    def __len__(self) -> int:
+        return int(self.page.shape[0])
+
+    # ------------------------------------------------------------------
+    # Row accessors
+    # ------------------------------------------------------------------
+    def content(self, row: int) -> str:
+        return self.text[self.text_offsets[row]:self.text_offsets[row + 1]].decode("utf-8")
+
+    def contents(self, rows: Optional[Iterable[int]] = None) -> List[str]:
+        offs = self.text_offsets.tolist()
+        text = self.text
+        if rows is None:
+            rows = range(len(self))
+        return [text[offs[r]:offs[r + 1]].decode("utf-8") for r in rows]
+
+    def chunk_id(self, row: int) -> str:
+        if self.uuids is not None:
+            return str(uuid.UUID(bytes=self.uuids[row].tobytes()))
+        return self.ids[self.id_offsets[row]:self.id_offsets[row + 1]].decode("utf-8")
+
+    def bbox(self, row: int) -> Optional[BBox]:
+        x0, y0, x1, y1 = self.coords[row].tolist()
+        if x0 != x0:  # NaN
+            return None
+        return (x0, y0, x1, y1)
+
+    def type_name(self, row: int) -> str:
+        return self.types[self.type_code[row]]
+
+    def metadata(self, row: int) -> Dict[str, Any]:
+        """Rebuild the row's metadata dict (original key order)."""
+        code = int(self.meta_layout[row])
+        if code < 0:
+            return {}
+        extra = self.extra.get(row, {})
+        out: Dict[str, Any] = {}
+        for key in self.layouts[code]:
+            codes = self.meta_codes.get(key)
+            if codes is not None and codes[row] >= 0:
+                out[key] = self.meta_values[key][codes[row]]
+            else:
+                out[key] = extra[key]
+        return out
+
+    def roots(self) -> np.ndarray:
+        """Row indices of top-level chunks, in order."""
+        return np.flatnonzero(self.parent < 0)
+
+    def children_of(self, row: int) -> np.ndarray:
+        return np.flatnonzero(self.parent == row)
+
+    def subtree_ends(self) -> np.ndarray:
+        """For each top-level row, the end (exclusive) of its pre-order subtree."""
+        roots = self.roots()
+        return np.append(roots[1:], len(self)).astype(np.int64)
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the table (arrays, blobs, sparse metadata)."""
+        arrays = [
+            self.page, self.coords, self.type_code, self.source_code, self.column,
+            self.parent, self.merged, self.meta_layout, self.text_offsets,
+            *self.meta_codes.values(),
+        ]
+        if self.uuids is not None:
+            arrays.append(self.uuids)
+        else:
+            arrays.append(self.id_offsets)
+        total = sum(a.nbytes for a in arrays)
+        total += sys.getsizeof(self.text)
+        if self.ids is not None:
+            total += sys.getsizeof(self.ids)
+        total += sys.getsizeof(self.extra)
+        total += sum(sys.getsizeof(m) for m in self.extra.values())
+        return total
+
+    # ------------------------------------------------------------------
+    # Conversion: objects -> table
+    # ------------------------------------------------------------------
+    @classmethod
+    def builder(cls) -> "ChunkTableBuilder":
+        """Empty builder for assembling a new table row by row."""
+        return ChunkTableBuilder()
+
+    @classmethod
+    def from_chunks(cls, chunks: Sequence[Chunk]) -> "ChunkTable":
+        builder = cls.builder()
+        for ch in chunks:
+            builder.add_tree(ch, -1)
+        return builder.build()
+
+    @classmethod
+    def concat(cls, tables: Sequence["ChunkTable"]) -> "ChunkTable":
+        """Concatenate tables (e.g. one per page) into one."""
+        builder = cls.builder()
+        for t in tables:
+            builder.extend_table(t)
+        return builder.build()
+
+    # ------------------------------------------------------------------
+    # Conversion: table -> objects
+    # ------------------------------------------------------------------
+    def to_chunks(self) -> List[Chunk]:
+        """Rebuild the original Chunk / MergedChunk tree."""
+        n = len(self)
+        built: List[Optional[Chunk]] = [None] * n
+        kids: Dict[int, List[int]] = {}
+        for row, par in enumerate(self.parent.tolist()):
+            if par >= 0:
+                kids.setdefault(par, []).append(row)
+
+        # Children always come after their parent (pre-order), so building
+        # in reverse guarantees kids exist before the MergedChunk needs them.
+        for row in range(n - 1, -1, -1):
+            built[row] = self._row_to_chunk(row, [built[k] for k in kids.get(row, [])])
+
+        return [built[r] for r in self.roots().tolist()]
+
+    def _row_to_chunk(self, row: int, children: List[Chunk]) -> Chunk:
+        page = int(self.page[row])
+        src = int(self.source_code[row])
+        fields = dict(
+            id=self.chunk_id(row),
+            content=self.content(row),
+            type=self.types[self.type_code[row]],
+            bbox=self.bbox(row),
+            page=page if page >= 0 else None,
+            source_file=self.sources[src] if src >= 0 else None,
+        )
+
+        if self.merged[row] and children:
+            ch: Chunk = MergedChunk(children, merge_type=fields["type"], id=fields["id"])
+            # Stored values win over what the constructor derived (the row
+            # may have been edited after merging, e.g. visual_note_id).
+            ch.content = fields["content"]
+            ch.bbox = fields["bbox"]
+            ch.page = fields["page"]
+            ch.source_file = fields["source_file"]
+            ch.metadata = self.metadata(row)
+        else:
+            ch = Chunk(metadata=self.metadata(row), children=children, **fields)
+
+        col = int(self.column[row])
+        if col >= 0:
+            ch.column = col
+        return ch
+
+
+# ---------------------------------------------------------------------
+# Builder
+# ---------------------------------------------------------------------
+
+def _vocab_key(value: Any) -> Optional[Hashable]:
+    """Vocabulary key for a metadata value, or None if it cannot be encoded."""
+    try:
+        hash(value)
+    except TypeError:
+        return None
+    # Keep 1, 1.0 and True apart.
+    return (type(value), value)
+
+
+def _small_ints(values: List[int]) -> np.ndarray:
+    """int16 array of *values*, widened instead of wrapping when one does not fit."""
+    arr = np.asarray(values, dtype=np.int64)
+    for dtype in (np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if not arr.size or (int(arr.min()) >= info.min and int(arr.max()) <= info.max):
+            return arr.astype(dtype)
+    return arr
+
+
+class ChunkTableBuilder:
+    """Accumulates rows as Python lists, then freezes them into arrays."""
+
+    def __init__(self) -> None:
+        self.page: List[int] = []
+        self.coords: List[Sequence[float]] = []
+        self.type_code: List[int] = []
+        self.source_code: List[int] = []
+        self.column: List[int] = []
+        self.parent: List[int] = []
+        self.merged: List[bool] = []
+        self.meta_layout: List[int] = []
+        self.meta_codes: Dict[str, List[int]] = {k: [] for k in ENCODED_KEYS}
+        self.texts: List[bytes] = []
+        self.id_list: List[str] = []
+        self.extra: Dict[int, Dict[str, Any]] = {}
+
+        self.types: List[str] = []
+        self._type_idx: Dict[str, int] = {}
+        self.sources: List[Optional[str]] = []
+        self._source_idx: Dict[Optional[str], int] = {}
+        self.layouts: List[Tuple[str, ...]] = []
+        self._layout_idx: Dict[Tuple[str, ...], int] = {}
+        self.meta_values: Dict[str, List[Any]] = {k: [] for k in ENCODED_KEYS}
+        self._meta_idx: Dict[str, Dict[Hashable, int]] = {k: {} for k in ENCODED_KEYS}
+
+    # vocab helpers ----------------------------------------------------
+    @staticmethod
+    def _code(value: Any, vocab: List[Any], index: Dict[Any, int], key: Any = None) -> int:
+        key = value if key is None else key
+        code = index.get(key)
+        if code is None:
+            code = len(vocab)
+            vocab.append(value)
+            index[key] = code
+        return code
+
+    def add_row(
+        self,
+        *,
+        id: str,
+        content: str,
+        type: str,
+        bbox: Optional[BBox],
+        page: Optional[int],
+        source_file: Optional[str],
+        metadata: Optional[Dict[str, Any]],
+        column: Optional[int],
+        parent: int,
+        merged: bool,
+    ) -> int:
+        row = len(self.page)
+        self.page.append(-1 if page is None else int(page))
+        self.coords.append(bbox if bbox else (np.nan, np.nan, np.nan, np.nan))
+        self.type_code.append(self._code(type, self.types, self._type_idx))
+        self.source_code.append(
+            -1 if source_file is None else self._code(source_file, self.sources, self._source_idx)
+        )
+        self.column.append(int(column) if isinstance(column, (int, np.integer)) else -1)
+        self.parent.append(parent)
+        self.merged.append(bool(merged))
+        self.texts.append((content or "").encode("utf-8"))
+        self.id_list.append(id or "")
+
+        if not metadata:
+            self.meta_layout.append(-1)
+            for codes in self.meta_codes.values():
+                codes.append(-1)
+            return row
+
+        self.meta_layout.append(
+            self._code(tuple(metadata), self.layouts, self._layout_idx)
+        )
+        residual: Dict[str, Any] = {}
+        for key in ENCODED_KEYS:
+            if key not in metadata:
+                self.meta_codes[key].append(-1)
+                continue
+            value = metadata[key]
+            vkey = _vocab_key(value)
+            if vkey is None:
+                self.meta_codes[key].append(-1)
+                residual[key] = value
+            else:
+                self.meta_codes[key].append(
+                    self._code(value, self.meta_values[key], self._meta_idx[key], vkey)
+                )
+        for key, value in metadata.items():
+            if key not in self.meta_codes:
+                residual[key] = value
+        if residual:
+            self.extra[row] = residual
+        return row
+
+    def add_tree(self, ch: Chunk, parent: int) -> None:
+        row = self.add_row(
+            id=ch.id,
+            content=ch.content,
+            type=ch.type,
+            bbox=ch.bbox,
+            page=ch.page,
+            source_file=ch.source_file,
+            metadata=ch.metadata,
+            column=getattr(ch, "column", None),
+            parent=parent,
+            merged=isinstance(ch, MergedChunk),
+        )
+        for child in ch.children:
+            self.add_tree(child, row)
+
+    def extend_table(
+        self,
+        t: ChunkTable,
+        rows: Optional[Iterable[int]] = None,
+        parent: int = -1,
+    ) -> None:
+        """Copy *rows* of *t* (default: all); rows whose parent is not copied hang off *parent*."""
+        remap: Dict[int, int] = {}
+        for r in (range(len(t)) if rows is None else rows):
+            par = int(t.parent[r])
+            col = int(t.column[r])
+            src = int(t.source_code[r])
+            remap[r] = self.add_row(
+                id=t.chunk_id(r),
+                content=t.content(r),
+                type=t.types[t.type_code[r]],
+                bbox=t.bbox(r),
+                page=int(t.page[r]) if t.page[r] >= 0 else None,
+                source_file=t.sources[src] if src >= 0 else None,
+                metadata=t.metadata(r),
+                column=col if col >= 0 else None,
+                parent=remap.get(par, parent),
+                merged=bool(t.merged[r]),
+            )
+
+    def build(self) -> ChunkTable:
+        n = len(self.page)
+
+        text_offsets = np.zeros(n + 1, dtype=np.int64)
+        if n:
+            np.cumsum([len(b) for b in self.texts], out=text_offsets[1:])
+
+        coords = np.asarray(self.coords, dtype=np.float64).reshape(n, 4)
+        narrow = coords.astype(np.float32)
+        if np.array_equal(narrow.astype(np.float64), coords, equal_nan=True):
+            coords = narrow
+
+        uuids, ids, id_offsets = _pack_ids(self.id_list)
+
+        return ChunkTable(
+            page=np.asarray(self.page, dtype=np.int32),
+            coords=coords,
+            type_code=_small_ints(self.type_code),
+            source_code=_small_ints(self.source_code),
+            column=_small_ints(self.column),
+            parent=np.asarray(self.parent, dtype=np.int32),
+            merged=np.asarray(self.merged, dtype=bool),
+            meta_codes={k: np.asarray(v, dtype=np.int32) for k, v in self.meta_codes.items()},
+            meta_layout=np.asarray(self.meta_layout, dtype=np.int32),
+            text=b"".join(self.texts),
+            text_offsets=text_offsets,
+            uuids=uuids,
+            ids=ids,
+            id_offsets=id_offsets,
+            extra=self.extra,
+            types=self.types,
+            sources=self.sources,
+            meta_values=self.meta_values,
+            layouts=self.layouts,
+        )
+
+
+def _pack_ids(id_list: List[str]):
+    """16-byte UUIDs when every id round-trips, else a UTF-8 blob + offsets."""
+    try:
+        packed = [uuid.UUID(s).bytes for s in id_list]
+        if all(str(uuid.UUID(bytes=b)) == s for b, s in zip(packed, id_list)):
+            arr = np.frombuffer(b"".join(packed), dtype=np.uint8).reshape(len(id_list), 16)
+            return arr.copy(), None, None
+    except ValueError:
+        pass
+
+    encoded = [s.encode("utf-8") for s in id_list]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    if encoded:
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return None, b"".join(encoded), offsets
+
+
+__all__ = ["ChunkTable", "ChunkTableBuilder", "ENCODED_KEYS"]
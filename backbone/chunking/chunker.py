@@ -7,24 +7,68 @@ Responsibilities:
     * detect sheet type (notes_sheet vs general)
     * optionally attach visual metadata via VisualChunkerBridge
     * group note‑sheet lines into semantic notes via SemanticGrouper
+
+Pages are independent of each other, so ``ChunkerConfig(workers=N)`` runs
+them in a process pool. Each worker opens its own document handle, handles
+a contiguous page range and sends its chunks back; the parent stitches the
+ranges together in page order, so the output matches the serial path.
+
+``Chunker.iter_pages`` is the streaming form: it yields one page at a time
+so callers can serialize and drop chunks as they go, keeping peak memory
+flat regardless of sheet count. ``process`` is a thin wrapper around it.
+
+Line extraction goes through the single-pass PageText ("dict" mode, served
+from the on-disk extraction cache when the PDF has not changed).
+
+``ChunkerConfig(id_mode="deterministic")`` replaces the per-line uuid4 with
+IDs hashed from (PDF content hash, page, bbox, text), so repeated runs over
+the same PDF produce the same chunk IDs (see chunk_ids.py).
 """
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import fitz  # PyMuPDF
 
 from backbone.chunking.chunk import Chunk
+from backbone.chunking.chunk_ids import ID_MODE_DETERMINISTIC, ID_MODE_UUID, ID_MODES, line_ids
 from backbone.chunking.semantic_grouper import SemanticGrouper, SemanticGrouperConfig
-from backbone.chunking.sheet_type_detector import detect_sheet_type
+from backbone.chunking.sheet_type_detector import SheetTypeDetector, detect_sheet_type
+from backbone.intake.document_pool import (
+    get_document_pool,
+    reset_document_pool,
+    select_page_indices,
+)
+from backbone.intake.extraction_cache import ExtractionCache, get_extraction_cache
+from backbone.intake.page_text import PageText
+
+
+# (page_number, sheet_type, raw chunk count, chunks after grouping)
+PageResult = Tuple[int, Optional[str], int, List[Chunk]]
 
 
 @dataclass
 class ChunkerConfig:
     debug: bool = True
     use_line_level_extractor: bool = True
+    # Number of worker processes for per-page work. 1 = serial (default).
+    workers: int = 1
+    # Reuse cached PyMuPDF extraction output for unchanged PDFs.
+    use_extraction_cache: bool = True
+    # "uuid" (random per run) or "deterministic" (stable across runs).
+    id_mode: str = ID_MODE_UUID
+    # Group each text column separately (see SemanticGrouperConfig.partition_by_column).
+    group_by_column: bool = False
+    # Sheet class -> keywords, highest priority first (see sheet_type_detector).
+    # None = notes_sheet vs general.
+    sheet_classes: Optional[Dict[str, Tuple[str, ...]]] = None
+    # Count sheet keywords on heading lines only, as whole words
+    # (use with EXTENDED_SHEET_CLASSES; see sheet_type_detector).
+    sheet_headings_only: bool = False
 
 
 class Chunker:
@@ -37,7 +81,23 @@ class Chunker:
         visual_bridge: Optional[Any] = None,
     ) -> None:
         self.config = config or ChunkerConfig()
-        self.grouper = SemanticGrouper(SemanticGrouperConfig())
+        if self.config.id_mode not in ID_MODES:
+            raise ValueError(
+                f"Unknown id_mode {self.config.id_mode!r}; expected one of {ID_MODES}"
+            )
+        self.grouper = SemanticGrouper(
+            SemanticGrouperConfig(
+                deterministic_ids=self.config.id_mode == ID_MODE_DETERMINISTIC,
+                partition_by_column=self.config.group_by_column,
+            )
+        )
+
+        self.sheet_detector = SheetTypeDetector(
+            self.config.sheet_classes, headings_only=self.config.sheet_headings_only
+        )
+        # Sheet type of every page processed so far (pages with text only),
+        # so callers don't have to detect it again.
+        self.page_sheet_types: Dict[int, str] = {}
 
         # Visual metadata (optional)
         self.visual_pages: Optional[Dict[int, Dict[str, Any]]] = visual_pages
@@ -49,69 +109,184 @@ class Chunker:
             print(">>> VISUAL BRIDGE: disabled or not available.")
 
     # ------------------------------------------------------------------
-    def process(self, pdf_path: str) -> List[Chunk]:
-        """Process an entire PDF into a flat list of chunks."""
+    def process(self, pdf_path: str, pages: Optional[Iterable[int]] = None) -> List[Chunk]:
+        """
+        Process a PDF into a flat list of chunks.
+
+        *pages* is an optional collection of 1-based page numbers; only those
+        pages are extracted, detected and grouped (default: every page).
+        """
+        all_chunks: List[Chunk] = []
+        for _page_number, _sheet_type, chunks in self.iter_pages(pdf_path, pages=pages):
+            all_chunks.extend(chunks)
+        return all_chunks
+
+    def iter_pages(
+        self, pdf_path: str, pages: Optional[Iterable[int]] = None
+    ) -> Iterator[Tuple[int, str, List[Chunk]]]:
+        """
+        Yield ``(page_number, sheet_type, chunks)`` one page at a time.
+
+        *pages* restricts processing to the given 1-based page numbers.
+
+        Pages without text are skipped. Each page's ``fitz.Page`` is
+        released as soon as its lines are extracted, and in parallel mode
+        only a bounded number of page ranges are in flight at once.
+        """
         if self.config.debug:
             print(">>> STARTING PER-PAGE CHUNKER")
             print(f">>> Source PDF: {pdf_path}")
             if self.config.use_line_level_extractor:
                 print(">>> USING LINE-LEVEL EXTRACTOR <<<")
 
-        doc = fitz.open(pdf_path)
-        all_chunks: List[Chunk] = []
-
-        for page_index in range(len(doc)):
-            page_number = page_index + 1
-            pdf_page = doc[page_index]
-
-            raw_page_chunks = self._extract_page_lines(pdf_page, page_number)
+        page_count = len(get_document_pool().get_document(pdf_path))
+        page_indices = select_page_indices(pages, page_count)
+        total = 0
 
-            if not raw_page_chunks:
-                if self.config.debug:
-                    print(f"\n>>> PROCESSING PAGE {page_number}")
-                    print("    Raw chunks on page: 0")
-                continue
+        workers = max(1, int(self.config.workers or 1))
+        if workers > 1 and len(page_indices) > 1:
+            page_results = self._iter_parallel(pdf_path, page_indices, workers)
+        else:
+            page_results = (
+                self._process_pages(pdf_path, [i])[0] for i in page_indices
+            )
 
+        for page_number, sheet_type, raw_count, grouped in page_results:
             if self.config.debug:
                 print(f"\n>>> PROCESSING PAGE {page_number}")
-                print(f"    Raw chunks on page: {len(raw_page_chunks)}")
+                print(f"    Raw chunks on page: {raw_count}")
+            if sheet_type is None:
+                continue
+            self.page_sheet_types[page_number] = sheet_type
 
-            sheet_type = detect_sheet_type(page_number, raw_page_chunks)
             if self.config.debug:
                 print(f"    Sheet type: {sheet_type}")
-
-            # Optional: attach visual metadata for this page
-            if self.visual_pages and self.visual_bridge:
-                vp = self.visual_pages.get(page_number)
-                if vp:
-                    try:
-                        self.visual_bridge.attach_visual_metadata_to_page(raw_page_chunks, vp)
-                    except Exception as exc:  # pragma: no cover - defensive
-                        print(f"    VISUAL BRIDGE ERROR (Page {page_number}): {exc}")
-
-            # Group into semantic units for notes sheets
-            if sheet_type.lower() == "notes_sheet":
-                grouped = self.grouper.group_page_chunks(raw_page_chunks, sheet_type)
-            else:
-                grouped = raw_page_chunks
-
-            if self.config.debug:
                 print(f"    Chunks after grouping: {len(grouped)}")
 
-            all_chunks.extend(grouped)
+            total += len(grouped)
+            yield page_number, sheet_type, grouped
 
         if self.config.debug:
-            print(f"\n>>> TOTAL CHUNKS AFTER GROUPING: {len(all_chunks)}")
+            print(f"\n>>> TOTAL CHUNKS AFTER GROUPING: {total}")
 
-        return all_chunks
+    # ------------------------------------------------------------------
+    def _iter_parallel(
+        self, pdf_path: str, page_indices: List[int], workers: int
+    ) -> Iterator[PageResult]:
+        """Fan contiguous page ranges out to a process pool, in page order."""
+        n_pages = len(page_indices)
+        workers = min(workers, n_pages)
+        # A few ranges per worker keeps the pool busy when page cost varies
+        # (dense notes sheets vs. near-empty plan sheets).
+        n_ranges = min(n_pages, workers * 4)
+        step = -(-n_pages // n_ranges)
+        ranges = iter([page_indices[start:start + step] for start in range(0, n_pages, step)])
+        # Bound the number of finished-but-unconsumed ranges held in memory.
+        max_in_flight = workers * 2
+
+        worker_config = replace(self.config, debug=False, workers=1)
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            def submit_next(pending: Deque) -> None:
+                nxt = next(ranges, None)
+                if nxt is not None:
+                    pending.append(
+                        pool.submit(
+                            _process_pages_worker,
+                            pdf_path,
+                            nxt,
+                            worker_config,
+                            self.visual_pages,
+                            self.visual_bridge,
+                        )
+                    )
+
+            pending: Deque = deque()
+            for _ in range(max_in_flight):
+                submit_next(pending)
+
+            # Consume in submission order → deterministic page order.
+            while pending:
+                fut = pending.popleft()
+                page_results = fut.result()
+                submit_next(pending)
+                yield from page_results
+
+    def _process_pages(self, pdf_path: str, page_indices: List[int]) -> List[PageResult]:
+        """Process the given 0-based pages of *pdf_path*, in order."""
+        results: List[PageResult] = []
+        source_hash = self._source_hash(pdf_path)
+
+        for page_index in page_indices:
+            page_number = page_index + 1
+
+            # One "dict" pass per page; the fitz.Page is released right after.
+            page_text = PageText.load(
+                pdf_path, page_index, use_cache=self.config.use_extraction_cache
+            )
+            blocks = page_text.blocks
+
+            raw_page_chunks = self._lines_from_blocks(blocks, page_number, source_hash)
+            results.append(self._process_page(raw_page_chunks, page_number))
+
+        return results
+
+    def _source_hash(self, pdf_path: str) -> Optional[str]:
+        """PDF content hash for deterministic IDs (None in uuid mode)."""
+        if self.config.id_mode != ID_MODE_DETERMINISTIC:
+            return None
+        cache = (
+            get_extraction_cache()
+            if self.config.use_extraction_cache
+            else ExtractionCache(enabled=False)
+        )
+        return cache.content_hash(pdf_path)
+
+    def _process_page(self, raw_page_chunks: List[Chunk], page_number: int) -> PageResult:
+        """Sheet-type detection, visual attach and grouping for one page."""
+        if not raw_page_chunks:
+            return (page_number, None, 0, [])
+
+        sheet_type = detect_sheet_type(page_number, raw_page_chunks, self.sheet_detector)
+
+        # Optional: attach visual metadata for this page
+        if self.visual_pages and self.visual_bridge:
+            vp = self.visual_pages.get(page_number)
+            if vp:
+                try:
+                    self.visual_bridge.attach_visual_metadata_to_page(raw_page_chunks, vp)
+                except Exception as exc:  # pragma: no cover - defensive
+                    print(f"    VISUAL BRIDGE ERROR (Page {page_number}): {exc}")
+
+        # Group into semantic units for notes sheets
+        if sheet_type.lower() == "notes_sheet":
+            grouped = self.grouper.group_page_chunks(raw_page_chunks, sheet_type)
+        else:
+            grouped = raw_page_chunks
+
+        return (page_number, sheet_type, len(raw_page_chunks), grouped)
 
     # ------------------------------------------------------------------
     def _extract_page_lines(self, pdf_page: "fitz.Page", page_number: int) -> List[Chunk]:
         """Return one Chunk per text line on the page."""
-        chunks: List[Chunk] = []
+        # (x0, y0, x1, y1, text, block_no, block_type) – same as get_text("blocks")
+        blocks = PageText.from_page(pdf_page).blocks
+        return self._lines_from_blocks(blocks, page_number)
+
+    def _lines_from_blocks(
+        self,
+        blocks: List[tuple],
+        page_number: int,
+        source_hash: Optional[str] = None,
+    ) -> List[Chunk]:
+        """
+        Split ``get_text("blocks")`` output into one Chunk per text line.
+
+        With *source_hash* set, chunk IDs are derived from it (one bulk
+        call per page) instead of a uuid4 per line.
+        """
+        lines: List[Tuple[Tuple[float, float, float, float], str]] = []
 
-        # Use PyMuPDF's plain text extraction with bbox info
-        blocks = pdf_page.get_text("blocks")  # (x0, y0, x1, y1, text, block_no, block_type, ...)
         for block in blocks:
             if len(block) < 5:
                 continue
@@ -120,18 +295,55 @@ class Chunker:
                 continue
 
             # Split into lines but keep the same bbox – good enough for now.
+            bbox = (float(x0), float(y0), float(x1), float(y1))
             for line in text.splitlines():
                 line = line.strip()
                 if not line:
                     continue
+                lines.append((bbox, line))
 
-                ch = Chunk(
+        if source_hash is None:
+            return [
+                Chunk(
                     content=line,
                     type="text_line",
-                    bbox=(float(x0), float(y0), float(x1), float(y1)),
+                    bbox=bbox,
                     page=page_number,
                     source_file=None,
                 )
-                chunks.append(ch)
+                for bbox, line in lines
+            ]
+
+        ids = line_ids(source_hash, page_number, lines)
+        return [
+            Chunk(
+                id=chunk_id,
+                content=line,
+                type="text_line",
+                bbox=bbox,
+                page=page_number,
+                source_file=None,
+            )
+            for chunk_id, (bbox, line) in zip(ids, lines)
+        ]
+
+
+# ----------------------------------------------------------------------
+# Process-pool entry points (must be module-level so they pickle)
+# ----------------------------------------------------------------------
+
+def _init_worker() -> None:
+    # Forked workers inherit the parent's pooled handles (and their file
+    # descriptors); give each worker its own document handle instead.
+    reset_document_pool()
+
 
-        return chunks
+def _process_pages_worker(
+    pdf_path: str,
+    page_indices: List[int],
+    config: ChunkerConfig,
+    visual_pages: Optional[Dict[int, Dict[str, Any]]],
+    visual_bridge: Optional[Any],
+) -> List[PageResult]:
+    chunker = Chunker(config, visual_pages=visual_pages, visual_bridge=visual_bridge)
+    return chunker._process_pages(pdf_path, page_indices)
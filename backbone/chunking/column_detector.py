@@ -3,9 +3,28 @@
 # Responsible for assigning a simple column index to each Chunk on a page.
 # This version is tolerant to both `chunk.page` and `chunk.page_number`
 # so we don't explode if older/newer code is mixed.
+#
+# Two NumPy engines segment the left edges (x0) of the text lines:
+#
+#   "chain"    – the original behaviour: sort x0, start a new column when
+#                the gap to the *previous* edge exceeds LEFT_TOLERANCE.
+#                A dense run of indented / centred lines can bridge two real
+#                columns into one.
+#   "density"  – histogram x0 into DENSITY_BIN_WIDTH bins, smooth with a
+#                ±LEFT_TOLERANCE window, and cut at the valleys where
+#                the smoothed edge density drops below a threshold. Stray
+#                edges between columns no longer bridge them.
+#
+# Both are O(n log n) (one sort) and run over every page of a document in a
+# single batched call (see `column_indices` / `assign_columns_document`).
+
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
 
-from typing import List, Optional
 from backbone.chunking.chunk import Chunk
+from backbone.chunking.chunk_table import ChunkTable
 
 # How close two left edges (x0) can be and still be considered the same column (in PDF units)
 LEFT_TOLERANCE = 20.0
@@ -13,9 +32,31 @@ LEFT_TOLERANCE = 20.0
 # Ignore tiny "clusters" of chunks that look like noise
 MIN_CLUSTER_SIZE = 5
 
+# Density engine: histogram bin width (PDF units) and what counts as "dense".
+DENSITY_BIN_WIDTH = 2.0
+DENSITY_MIN_COUNT = 2
+DENSITY_PEAK_RATIO = 0.05
+
+ENGINE_CHAIN = "chain"
+ENGINE_DENSITY = "density"
+ENGINES = (ENGINE_CHAIN, ENGINE_DENSITY)
+
 DEBUG = False
 
 
+@dataclass
+class ColumnDetectorConfig:
+    # "chain" (compatible with the original detector) or "density".
+    engine: str = ENGINE_CHAIN
+    left_tolerance: float = LEFT_TOLERANCE
+    min_cluster_size: int = MIN_CLUSTER_SIZE
+    density_bin_width: float = DENSITY_BIN_WIDTH
+    # A bin is inside a column when its smoothed edge count is at least
+    # max(density_min_count, density_peak_ratio * densest bin on the page).
+    density_min_count: int = DENSITY_MIN_COUNT
+    density_peak_ratio: float = DENSITY_PEAK_RATIO
+
+
 def _get_page(c: Chunk) -> Optional[int]:
     """
     Helper to read page number from a Chunk, tolerating both
@@ -33,7 +74,7 @@ class ColumnDetector:
     Very simple column detector:
 
         1. Take all chunk left edges (bbox[0]).
-        2. Cluster them left-to-right if they are within LEFT_TOLERANCE.
+        2. Segment them into columns (chain or density engine, see above).
         3. Discard tiny clusters (if possible).
         4. Assign a 1-based column index for each cluster.
 
@@ -42,6 +83,16 @@ class ColumnDetector:
     (visual_chunker_bridge).
     """
 
+    def __init__(self, config: Optional[ColumnDetectorConfig] = None) -> None:
+        self.config = config or ColumnDetectorConfig()
+        if self.config.engine not in ENGINES:
+            raise ValueError(
+                f"Unknown column engine {self.config.engine!r}; expected one of {ENGINES}"
+            )
+
+    # ------------------------------------------------------------------
+    # Object API
+    # ------------------------------------------------------------------
     def assign_columns(self, chunks: List[Chunk], sheet_type: Optional[str] = None) -> List[Chunk]:
         """
         Assigns `chunk.column = 1,2,3,...` based on x-position.
@@ -60,67 +111,193 @@ class ColumnDetector:
         if not chunks:
             return []
 
-        # Collect (x0, index) for all chunks that have a bbox
-        left_edges = []
-        for idx, c in enumerate(chunks):
-            bbox = getattr(c, "bbox", None)
-            if not bbox or len(bbox) != 4:
-                continue
-            x0 = float(bbox[0])
-            left_edges.append((x0, idx))
-
-        if not left_edges:
+        idx, x0 = self._left_edges(chunks)
+        if not idx:
             # Nothing to do
             if DEBUG:
                 page = _get_page(chunks[0])
                 print(f"    [ColumnDetector] page={page} - no bboxes, skipping.")
             return chunks
 
-        # Sort by x0 so we can cluster left-to-right
-        left_edges.sort(key=lambda t: t[0])
+        # Everything handed in is treated as one page (as before).
+        cols = self.column_indices(np.zeros(len(idx), dtype=np.int64), x0)
+        self._write_columns(chunks, idx, cols)
+        return chunks
 
-        clusters: List[List[int]] = []
-        current_cluster: List[int] = []
-        last_x: Optional[float] = None
+    def assign_columns_document(self, chunks: List[Chunk]) -> List[Chunk]:
+        """Like :meth:`assign_columns`, for every page of a document in one call."""
+        if not chunks:
+            return []
 
-        for x0, idx in left_edges:
-            if last_x is None or abs(x0 - last_x) <= LEFT_TOLERANCE:
-                current_cluster.append(idx)
-            else:
-                # Start a new cluster
-                if current_cluster:
-                    clusters.append(current_cluster)
-                current_cluster = [idx]
-            last_x = x0
+        idx, x0 = self._left_edges(chunks)
+        if idx:
+            pages = np.array(
+                [_get_page(chunks[i]) or 0 for i in idx], dtype=np.int64
+            )
+            self._write_columns(chunks, idx, self.column_indices(pages, x0))
+        return chunks
 
-        if current_cluster:
-            clusters.append(current_cluster)
+    @staticmethod
+    def _left_edges(chunks: List[Chunk]) -> Tuple[List[int], np.ndarray]:
+        # Collect (index, x0) for all chunks that have a bbox
+        idx: List[int] = []
+        xs: List[float] = []
+        for i, c in enumerate(chunks):
+            bbox = getattr(c, "bbox", None)
+            if not bbox or len(bbox) != 4:
+                continue
+            idx.append(i)
+            xs.append(float(bbox[0]))
+        return idx, np.asarray(xs, dtype=np.float64)
 
-        # Prefer "big" clusters (real columns) but fall back if all are tiny
-        big_clusters = [cl for cl in clusters if len(cl) >= MIN_CLUSTER_SIZE]
-        if big_clusters:
-            use_clusters = big_clusters
-        else:
-            use_clusters = clusters
-
-        # Map each chunk index to a column index (1-based, left to right)
-        index_to_column = {}
-        for col_idx, cluster in enumerate(use_clusters, start=1):
-            for idx in cluster:
-                index_to_column[idx] = col_idx
-
-        # Assign column number onto the chunk objects
-        for idx, c in enumerate(chunks):
-            col_idx = index_to_column.get(idx)
-            if col_idx is not None:
+    @staticmethod
+    def _write_columns(chunks: List[Chunk], idx: List[int], cols: np.ndarray) -> None:
+        for i, col in zip(idx, cols.tolist()):
+            if col > 0:
                 # Create/overwrite `column` attribute on the chunk
-                setattr(c, "column", col_idx)
+                setattr(chunks[i], "column", col)
+
+    # ------------------------------------------------------------------
+    # Columnar API
+    # ------------------------------------------------------------------
+    def assign_columns_table(self, table: ChunkTable, sheet_type: Optional[str] = None) -> ChunkTable:
+        """
+        :meth:`assign_columns` over a :class:`ChunkTable`.
+
+        Works on the top-level rows of every page in the table at once and
+        writes the result into ``table.column`` in-place.
+        """
+        rows = table.roots()
+        rows = rows[table.has_bbox[rows]]
+        if rows.size == 0:
+            return table
+
+        cols = self.column_indices(table.page[rows], table.x0[rows].astype(np.float64))
+        mask = cols > 0
+        table.column[rows[mask]] = cols[mask]
+        return table
+
+    def column_indices(self, pages: np.ndarray, x0: np.ndarray) -> np.ndarray:
+        """
+        Batched core: 1-based column per (page, x0) pair, 0 = no column.
+
+        Rows are segmented independently per distinct value of *pages*.
+        """
+        pages = np.asarray(pages)
+        x0 = np.asarray(x0, dtype=np.float64)
+        out = np.zeros(x0.size, dtype=np.int64)
+        if x0.size == 0:
+            return out
+
+        # Sort by (page, x0); stable so ties keep input order.
+        order = np.lexsort((x0, pages))
+        sp, sx = pages[order], x0[order]
+
+        new_page = np.ones(sx.size, dtype=bool)
+        new_page[1:] = sp[1:] != sp[:-1]
+        page_id = np.cumsum(new_page) - 1
+
+        if self.config.engine == ENGINE_DENSITY:
+            cluster_id, cluster_page = self._segment_density(sx, page_id, new_page)
+        else:
+            cluster_id, cluster_page = self._segment_chain(sx, page_id, new_page)
+
+        col_of_cluster = self._rank_clusters(cluster_id, cluster_page, sp[new_page])
+        # The density engine may find no column at all on a sparse page.
+        hit = cluster_id >= 0
+        cols = np.zeros(sx.size, dtype=np.int64)
+        cols[hit] = col_of_cluster[cluster_id[hit]]
+        out[order] = cols
+        return out
+
+    # ------------------------------------------------------------------
+    # Engines: sorted x0 -> cluster id per row (-1 = none), page of each cluster
+    # ------------------------------------------------------------------
+    def _segment_chain(
+        self, sx: np.ndarray, page_id: np.ndarray, new_page: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        # A new cluster starts on a page change or an x0 jump > tolerance.
+        new_cluster = new_page.copy()
+        new_cluster[1:] |= np.diff(sx) > self.config.left_tolerance
+        cluster_id = np.cumsum(new_cluster) - 1
+        return cluster_id, page_id[new_cluster]
+
+    def _segment_density(
+        self, sx: np.ndarray, page_id: np.ndarray, new_page: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        cfg = self.config
+        width = float(cfg.density_bin_width)
+        half = max(1, int(round(cfg.left_tolerance / width)))
+
+        # Per-page bins starting at the page's leftmost edge; pages are laid
+        # out back to back with `half + 1` empty bins between them so the
+        # smoothing window never mixes pages.
+        page_min = sx[new_page]
+        local_bin = np.floor((sx - page_min[page_id]) / width).astype(np.int64)
+        page_last = np.flatnonzero(np.append(new_page[1:], True))
+        page_bins = local_bin[page_last] + 1 + 2 * (half + 1)
+        page_offset = np.concatenate(([0], np.cumsum(page_bins)[:-1]))
+        row_bin = page_offset[page_id] + (half + 1) + local_bin
+
+        counts = np.bincount(row_bin, minlength=int(page_bins.sum()))
+        csum = np.concatenate(([0], np.cumsum(counts)))
+        n_bins = counts.size
+        hi = np.minimum(np.arange(n_bins) + half + 1, n_bins)
+        lo = np.maximum(np.arange(n_bins) - half, 0)
+        smoothed = csum[hi] - csum[lo]
+
+        bin_page = np.repeat(np.arange(page_bins.size), page_bins)
+        page_peak = np.maximum.reduceat(smoothed, page_offset)
+        threshold = np.maximum(cfg.density_min_count, cfg.density_peak_ratio * page_peak)
+        dense = smoothed >= threshold[bin_page]
+
+        # Contiguous dense runs are columns; valleys separate them.
+        run_start = dense.copy()
+        run_start[1:] &= ~dense[:-1]
+        run_id = np.cumsum(run_start) - 1
+
+        cluster_id = np.where(dense[row_bin], run_id[row_bin], -1)
+        return cluster_id, bin_page[run_start]
+
+    # ------------------------------------------------------------------
+    def _rank_clusters(
+        self, cluster_id: np.ndarray, cluster_page: np.ndarray, page_values: np.ndarray
+    ) -> np.ndarray:
+        """1-based column number per cluster (0 = dropped), ranked left to right per page."""
+        n_clusters = cluster_page.size
+        size = np.bincount(cluster_id[cluster_id >= 0], minlength=n_clusters)
+
+        # Prefer "big" clusters (real columns) but fall back if all are tiny
+        big = size >= self.config.min_cluster_size
+        page_has_big = np.zeros(page_values.size, dtype=bool)
+        np.logical_or.at(page_has_big, cluster_page, big)
+        keep = (size > 0) & (big | ~page_has_big[cluster_page])
+
+        # Clusters are numbered in (page, x0) order, so a running count of
+        # kept clusters minus the count before the page gives the rank.
+        kept_rank = np.cumsum(keep)
+        first_on_page = np.ones(n_clusters, dtype=bool)
+        first_on_page[1:] = cluster_page[1:] != cluster_page[:-1]
+        page_base = np.maximum.accumulate(np.where(first_on_page, kept_rank - keep, 0))
+        col_of_cluster = np.where(keep, kept_rank - page_base, 0)
 
         if DEBUG:
-            page = _get_page(chunks[0])
-            print(
-                f"    [ColumnDetector] page={page} "
-                f"raw_clusters={len(clusters)} used_clusters={len(use_clusters)}"
-            )
+            raw = np.bincount(cluster_page, minlength=page_values.size)
+            used = np.bincount(cluster_page, weights=keep, minlength=page_values.size)
+            for pg, n_raw, n_used in zip(page_values.tolist(), raw.tolist(), used.astype(int).tolist()):
+                print(
+                    f"    [ColumnDetector] page={pg} "
+                    f"raw_clusters={n_raw} used_clusters={n_used}"
+                )
+
+        return col_of_cluster
+
 
-        return chunks
\ No newline at end of file
+__all__ = [
+    "ColumnDetector",
+    "ColumnDetectorConfig",
+    "ENGINE_CHAIN",
+    "ENGINE_DENSITY",
+    "LEFT_TOLERANCE",
+    "MIN_CLUSTER_SIZE",
+]
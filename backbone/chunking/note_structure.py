@@ -0,0 +1,224 @@
+"""Structural role of a single text line: list markers and section headers.
+
+Every stage that needs to know whether a line starts a note ("1.", "A)",
+"(a)", "•") or is a section header ("GENERAL NOTES:") asks this module
+instead of running its own regexes:
+
+    role = classify_line(text)        # pure, lru-cached on the text
+    role = line_role(chunk, text)     # same, cached on the chunk
+
+:func:`classify_line` makes one pass over the line: a single compiled
+marker regex (named groups per marker kind) and, only for lines that
+contain "NOTES", the header checks. The result is an immutable
+:class:`LineRole` (a NamedTuple, cheap to build and to store) carrying the raw facts (marker kind, label, separator,
+whether whitespace follows, header flags) so each consumer can keep its own
+rule, e.g. "single-digit numbers only" or "numbers up to 3 digits followed
+by a space".
+
+:func:`line_role` stores the result in ``metadata["line_role"]`` together
+with the CRC-32 of the text it was computed from, so JSON stages further
+down the pipeline reuse the label and a stage that rewrites the text (e.g.
+stitching fragments) invalidates it automatically.
+"""
+
+from __future__ import annotations
+
+import re
+import zlib
+from functools import lru_cache
+from typing import Any, NamedTuple, Optional
+
+
+META_KEY = "line_role"
+
+# Marker kinds
+KIND_NONE = ""
+KIND_NUMBER = "number"  # "1.", "12)", "3 " (digit run + space)
+KIND_LETTER = "letter"  # "A.", "B)"
+KIND_PAREN = "paren"  # "(1)", "(a)"
+KIND_SYMBOL = "symbol"  # "•", "-", "*", "+"
+
+# Roles (coarse label for reports / overlays)
+ROLE_HEADER = "header"
+ROLE_NUMBERED = "numbered"
+ROLE_BULLET = "bullet"
+ROLE_TEXT = "text"
+
+# One pass over the start of the line; the first alternative that matches
+# names the marker kind. `gap` is set (possibly empty, at end of line) when
+# the marker is followed by whitespace or nothing.
+_MARKER_RE = re.compile(
+    r"""
+    ^\s*
+    (?:
+        \( (?P<paren>\d+|[A-Za-z]) \)
+      | (?P<number>\d+) (?: (?P<number_sep>[.)]) | (?=\ ) )
+      | (?P<letter>[A-Z]) (?P<letter_sep>[.)])
+      | (?P<symbol>[•\-*+])
+    )
+    (?P<gap>\s+|$)?
+    """,
+    re.VERBOSE,
+)
+
+_WS_RE = re.compile(r"\s+")
+
+# Header checks (only run on lines containing "NOTES")
+_NOTES_WORD_RE = re.compile(r"\bNOTES\b", re.IGNORECASE)
+_BAD_CONTEXT_RE = re.compile(r"\b(SEE|REFER TO)\b", re.IGNORECASE)
+_CONT_RE = re.compile(r"\bCONT(?:'D|INUED|\.|’D)?\b", re.IGNORECASE)
+_HEADER_SHAPE_RE = re.compile(r"^[A-Z0-9\s/&'’\-(),.:]+$")
+_HEADER_COLON_RE = re.compile(r"^[A-Z0-9\s\-\(\)\'\.\&\/]+NOTES(\s*\(CONT\'D\))?:\s*$")
+_HEADER_CAPS_RE = re.compile(r"^[A-Z0-9&/\-\s]{4,90}NOTES(?:\s*\([^)]*\))?:?$")
+
+
+class LineRole(NamedTuple):
+    # Leading list marker (KIND_* constant), its label ("12", "a", "•") and
+    # separator ("." / ")" / "" for "12 " and parenthesised / symbol markers).
+    kind: str = KIND_NONE
+    label: str = ""
+    sep: str = ""
+    # Marker followed by whitespace or end of line.
+    spaced: bool = False
+    # Header flags, strictest last:
+    #   header_candidate – mostly caps, contains the word NOTES, 2-14 words,
+    #                      header characters only, not a "SEE ... NOTES" line
+    #   header_colon     – caps line ending in "NOTES:" / "NOTES (CONT'D):"
+    #   header_caps      – >=85% caps, ends in "NOTES", optional "(...)" and ":"
+    header_candidate: bool = False
+    header_colon: bool = False
+    header_caps: bool = False
+
+    @property
+    def is_header(self) -> bool:
+        return self.header_candidate or self.header_colon or self.header_caps
+
+    @property
+    def role(self) -> str:
+        if self.is_header:
+            return ROLE_HEADER
+        if self.kind in (KIND_NUMBER, KIND_LETTER, KIND_PAREN):
+            return ROLE_NUMBERED
+        if self.kind == KIND_SYMBOL:
+            return ROLE_BULLET
+        return ROLE_TEXT
+
+
+_PLAIN = LineRole()
+
+
+def _upper_ratio(s: str) -> float:
+    letters = [c for c in s if c.isalpha()]
+    if not letters:
+        return 0.0
+    return sum(1 for c in letters if c.isupper()) / len(letters)
+
+
+# Sized for the distinct lines of a large plan set, so later stages asking
+# about lines an earlier stage classified hit the cache.
+@lru_cache(maxsize=65536)
+def classify_line(text: str) -> LineRole:
+    """Structural role of one line of text (see :class:`LineRole`)."""
+    if not text:
+        return _PLAIN
+
+    kind, label, sep, spaced = KIND_NONE, "", "", False
+    m = _MARKER_RE.match(text)
+    if m:
+        spaced = m.group("gap") is not None
+        if m.group("paren") is not None:
+            kind, label = KIND_PAREN, m.group("paren")
+        elif m.group("number") is not None:
+            kind, label, sep = KIND_NUMBER, m.group("number"), m.group("number_sep") or ""
+        elif m.group("letter") is not None:
+            kind, label, sep = KIND_LETTER, m.group("letter"), m.group("letter_sep")
+        else:
+            kind, label = KIND_SYMBOL, m.group("symbol")
+
+    candidate = colon = caps = False
+    if "NOTES" in text.upper():
+        norm = _WS_RE.sub(" ", text.strip())
+        ratio = _upper_ratio(norm)
+        colon = bool(_HEADER_COLON_RE.match(norm))
+        caps = "NOTES" in norm and ratio >= 0.85 and bool(_HEADER_CAPS_RE.match(norm))
+        candidate = _is_header_candidate(norm, ratio)
+
+    if kind == KIND_NONE and not (candidate or colon or caps):
+        return _PLAIN
+    return LineRole(kind, label, sep, spaced, candidate, colon, caps)
+
+
+def _is_header_candidate(s0: str, ratio: float) -> bool:
+    if not s0 or not _NOTES_WORD_RE.search(s0):
+        return False
+    cont = bool(_CONT_RE.search(s0))
+    # "SEE / REFER TO ... NOTES" and "(SEE ... NOTES)." are references, not headers
+    if _BAD_CONTEXT_RE.search(s0) and not cont:
+        return False
+    if s0.endswith(".") and "(" in s0 and not cont:
+        return False
+    if ratio < 0.80:
+        return False
+    wc = len(s0.split())
+    if wc < 2 or wc > 14:
+        return False
+    return bool(_HEADER_SHAPE_RE.match(s0.rstrip(" :").upper()))
+
+
+def _crc(text: str) -> int:
+    return zlib.crc32(text.encode("utf-8"))
+
+
+def line_role(chunk: Any, text: Optional[str] = None) -> LineRole:
+    """
+    :func:`classify_line` for a chunk (Chunk object or JSON dict), cached in
+    ``metadata["line_role"]``.
+
+    *text* defaults to the chunk's ``content`` / ``text``. A cached label is
+    reused only while the CRC-32 of the text still matches.
+    """
+    is_dict = isinstance(chunk, dict)
+    if text is None:
+        if is_dict:
+            text = chunk.get("text") or chunk.get("content") or ""
+        else:
+            text = getattr(chunk, "content", "") or ""
+
+    if is_dict:
+        meta = chunk.get("metadata")
+        if not isinstance(meta, dict):
+            meta = chunk["metadata"] = {}
+    else:
+        meta = chunk.metadata
+
+    crc = _crc(text)
+    cached = meta.get(META_KEY)
+    if isinstance(cached, dict) and cached.get("crc") == crc:
+        try:
+            return LineRole(*[cached[f] for f in LineRole._fields])
+        except KeyError:
+            pass  # written by an older LineRole; recompute
+
+    role = classify_line(text)
+    entry = role._asdict()
+    entry["role"] = role.role
+    entry["crc"] = crc
+    meta[META_KEY] = entry
+    return role
+
+
+__all__ = [
+    "LineRole",
+    "classify_line",
+    "line_role",
+    "META_KEY",
+    "KIND_NONE",
+    "KIND_NUMBER",
+    "KIND_LETTER",
+    "KIND_PAREN",
+    "KIND_SYMBOL",
+    "ROLE_HEADER",
+    "ROLE_NUMBERED",
+    "ROLE_BULLET",
+    "ROLE_TEXT",
+]
@@ -15,20 +15,56 @@ is aware of:
     * vertical spacing between lines
     * left‑edge alignment to keep paragraphs together
     * optional visual metadata (visual_note_id) when present
+
+With ``SemanticGrouperConfig(partition_by_column=True)`` the layout
+strategy first splits the page into columns (``visual_column_index`` from
+the visual bridge, or :class:`ColumnDetector` on the line left edges) and
+runs the sequential grouping independently inside each column, so lines of
+neighbouring columns that share a baseline no longer break each other's
+notes apart. Columns are independent, so they can be grouped in a thread
+or process pool (``workers``).
 """
 
 from __future__ import annotations
 
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from backbone.chunking.chunk import Chunk, MergedChunk
+from backbone.chunking.chunk_ids import merged_id
+from backbone.chunking.chunk_table import ChunkTable
+from backbone.chunking.column_detector import (
+    ENGINE_DENSITY,
+    ColumnDetector,
+    ColumnDetectorConfig,
+)
+from backbone.chunking.note_structure import KIND_NUMBER, KIND_SYMBOL, classify_line
 
-from backbone.chunking.chunk import MergedChunk
+
+COLUMN_SOURCE_AUTO = "auto"  # visual_column_index when present, else detector
+COLUMN_SOURCE_VISUAL = "visual"
+COLUMN_SOURCE_DETECTOR = "detector"
+COLUMN_SOURCES = (COLUMN_SOURCE_AUTO, COLUMN_SOURCE_VISUAL, COLUMN_SOURCE_DETECTOR)
 
 
 @dataclass
 class SemanticGrouperConfig:
     max_line_gap: float = 18.0
     max_indent_delta: float = 25.0
+    # Derive MergedChunk IDs from their children (see chunk_ids.merged_id)
+    # instead of a fresh uuid4.
+    deterministic_ids: bool = False
+    # Group each column separately (layout strategy only).
+    partition_by_column: bool = False
+    column_source: str = COLUMN_SOURCE_AUTO
+    column_engine: str = ENGINE_DENSITY
+    # Columns grouped in parallel when > 1; "thread" or "process" pool.
+    workers: int = 1
+    executor: str = "thread"
     debug: bool = False
 
 
@@ -37,6 +73,11 @@ class SemanticGrouper:
 
     def __init__(self, config: Optional[SemanticGrouperConfig] = None) -> None:
         self.config = config or SemanticGrouperConfig()
+        if self.config.column_source not in COLUMN_SOURCES:
+            raise ValueError(
+                f"Unknown column_source {self.config.column_source!r}; "
+                f"expected one of {COLUMN_SOURCES}"
+            )
 
     # ------------------------------------------------------------------
     def group_page_chunks(self, chunks: List[Chunk], sheet_type: str) -> List[Chunk]:
@@ -81,7 +122,11 @@ class SemanticGrouper:
                 note_chunks,
                 key=lambda c: (c.page or 0, (c.bbox or (0, 0, 0, 0))[1])
             )
-            mc = MergedChunk.from_chunks(note_chunks_sorted, merge_type="note_group")
+            mc = MergedChunk.from_chunks(
+                note_chunks_sorted,
+                merge_type="note_group",
+                id=self._merged_id([c.id for c in note_chunks_sorted]),
+            )
             mc.metadata["visual_note_id"] = note_id
             grouped.append(mc)
 
@@ -93,8 +138,12 @@ class SemanticGrouper:
     # Strategy B: purely layout + text heuristics
     # ------------------------------------------------------------------
     def _group_by_layout(self, chunks: List[Chunk]) -> List[Chunk]:
-        cfg = self.config
+        if self.config.partition_by_column:
+            return self._group_by_column(chunks)
+        return self._group_sequence(chunks)
 
+    def _group_sequence(self, chunks: List[Chunk]) -> List[Chunk]:
+        """Sequential grouping: sort by (page, y, x), split on block starts."""
         # Sort by vertical position (top of bbox), then by x.
         sorted_chunks = sorted(
             chunks,
@@ -130,10 +179,220 @@ class SemanticGrouper:
             if len(grp) == 1:
                 merged.append(grp[0])
             else:
-                mc = MergedChunk.from_chunks(grp, merge_type="note_group")
+                mc = MergedChunk.from_chunks(
+                    grp,
+                    merge_type="note_group",
+                    id=self._merged_id([c.id for c in grp]),
+                )
                 merged.append(mc)
         return merged
 
+    # ------------------------------------------------------------------
+    # Strategy B, column-partitioned
+    # ------------------------------------------------------------------
+    def _group_by_column(self, chunks: List[Chunk]) -> List[Chunk]:
+        keys = self.column_keys(chunks)
+
+        partitions: Dict[int, List[Chunk]] = {}
+        for ch, key in zip(chunks, keys):
+            partitions.setdefault(key, []).append(ch)
+        # Columns left to right; lines without a column (key 0) last.
+        parts = [partitions[k] for k in sorted(partitions, key=lambda k: (k <= 0, k))]
+
+        if self.config.debug:
+            sizes = [len(p) for p in parts]
+            print(f"    [SemanticGrouper] column partitions: {sizes}")
+
+        workers = min(max(1, int(self.config.workers or 1)), len(parts))
+        if workers == 1:
+            results = [self._group_sequence(p) for p in parts]
+        elif self.config.executor == "process":
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_group_sequence_worker, [self.config] * len(parts), parts))
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(self._group_sequence, parts))
+
+        return [ch for grouped in results for ch in grouped]
+
+    def column_keys(self, chunks: List[Chunk]) -> List[int]:
+        """Column key per chunk (1-based; 0 = no column) for partitioning."""
+        source = self.config.column_source
+        visual = [ch.metadata.get("visual_column_index") for ch in chunks]
+        has_visual = any(isinstance(v, int) and not isinstance(v, bool) for v in visual)
+
+        if source == COLUMN_SOURCE_VISUAL or (source == COLUMN_SOURCE_AUTO and has_visual):
+            return [
+                v if isinstance(v, int) and not isinstance(v, bool) and v > 0 else 0
+                for v in visual
+            ]
+
+        detector = ColumnDetector(ColumnDetectorConfig(engine=self.config.column_engine))
+        idx = [i for i, ch in enumerate(chunks) if ch.bbox and len(ch.bbox) == 4]
+        keys = [0] * len(chunks)
+        if idx:
+            pages = np.array([chunks[i].page or 0 for i in idx], dtype=np.int64)
+            x0 = np.array([float(chunks[i].bbox[0]) for i in idx], dtype=np.float64)
+            for i, col in zip(idx, detector.column_indices(pages, x0).tolist()):
+                keys[i] = col
+        return keys
+
+    # ------------------------------------------------------------------
+    # Columnar path
+    # ------------------------------------------------------------------
+    def group_table(self, table: ChunkTable, sheet_type: str) -> ChunkTable:
+        """:meth:`group_page_chunks` over a :class:`ChunkTable`.
+
+        Returns a new table with the same result as the object path. The
+        layout strategy is vectorized (sort, block starts, bbox unions);
+        the visual-note strategy goes through the object path.
+        """
+        if len(table) == 0 or sheet_type.lower() != "notes_sheet":
+            return table
+
+        roots = table.roots()
+        if table.has_meta_key("visual_note_id", roots).any():
+            return ChunkTable.from_chunks(self._group_by_visual_note(table.to_chunks()))
+
+        return self._group_table_by_layout(table, roots)
+
+    def _group_table_by_layout(self, table: ChunkTable, roots: np.ndarray) -> ChunkTable:
+        cfg = self.config
+        ends = dict(zip(roots.tolist(), table.subtree_ends().tolist()))
+
+        # Same ordering as the object path: (page or 0, y0, x0), stable;
+        # in column mode, columns left to right (unassigned last) first.
+        coords = np.nan_to_num(table.coords[roots], nan=0.0)
+        page = np.maximum(table.page[roots], 0)
+        if cfg.partition_by_column:
+            keys = self._column_keys_table(table, roots)
+            part = np.where(keys > 0, keys, np.iinfo(np.int64).max)
+            order = np.lexsort((coords[:, 0], coords[:, 1], page, part))
+            part = part[order]
+        else:
+            order = np.lexsort((coords[:, 0], coords[:, 1], page))
+        rows = roots[order]
+
+        contents = table.contents(rows.tolist())
+        nonempty = np.fromiter((bool(c) for c in contents), dtype=bool, count=rows.size)
+        rows = rows[nonempty]
+        if cfg.partition_by_column:
+            part = part[nonempty]
+        texts = [c.strip() for c, keep in zip(contents, nonempty) if keep]
+        n = rows.size
+        if n == 0:
+            return ChunkTable.from_chunks([])
+
+        # Text signals (per row) ...
+        marker = np.fromiter(
+            (self._looks_like_numbered_note(t) or self._looks_like_bullet(t) for t in texts),
+            dtype=bool,
+            count=n,
+        )
+        ends_period = np.fromiter((t.endswith(".") for t in texts), dtype=bool, count=n)
+        upper_start = np.fromiter((t[:1].isupper() for t in texts), dtype=bool, count=n)
+
+        # ... and layout signals (NaN bboxes compare False, like a missing bbox).
+        # float64 like the object path: float32 differences can round onto
+        # the max_line_gap / max_indent_delta thresholds.
+        box = table.coords[rows].astype(np.float64)
+        gap = box[1:, 1] - box[:-1, 3]
+        dx = np.abs(box[1:, 0] - box[:-1, 0])
+
+        starts = np.ones(n, dtype=bool)
+        starts[1:] = (
+            marker[1:]
+            | (ends_period[:-1] & upper_start[1:])
+            | (gap > cfg.max_line_gap)
+            | (dx > cfg.max_indent_delta)
+        )
+        if cfg.partition_by_column:
+            starts[1:] |= part[1:] != part[:-1]
+
+        group_start = np.flatnonzero(starts)
+        group_size = np.diff(np.append(group_start, n))
+
+        # Union bboxes per group (fmin/fmax skip NaN = missing bbox).
+        u_x0 = np.fmin.reduceat(box[:, 0], group_start)
+        u_y0 = np.fmin.reduceat(box[:, 1], group_start)
+        u_x1 = np.fmax.reduceat(box[:, 2], group_start)
+        u_y1 = np.fmax.reduceat(box[:, 3], group_start)
+
+        out = ChunkTable.builder()
+        rows_list = rows.tolist()
+        for g, (start, size) in enumerate(zip(group_start.tolist(), group_size.tolist())):
+            members = rows_list[start:start + size]
+            if size == 1:
+                r = members[0]
+                out.extend_table(table, range(r, ends[r]))
+                continue
+
+            first = members[0]
+            meta: Dict[str, Any] = {}
+            for r in members:
+                meta.update(table.metadata(r))
+            src = int(table.source_code[first])
+            bbox = None if np.isnan(u_x0[g]) else (
+                float(u_x0[g]), float(u_y0[g]), float(u_x1[g]), float(u_y1[g])
+            )
+            parent = out.add_row(
+                id=(
+                    self._merged_id([table.chunk_id(r) for r in members])
+                    if cfg.deterministic_ids
+                    else str(uuid.uuid4())
+                ),
+                content="\n".join(table.contents(members)),
+                type="note_group",
+                bbox=bbox,
+                page=int(table.page[first]) if table.page[first] >= 0 else None,
+                source_file=table.sources[src] if src >= 0 else None,
+                metadata=meta,
+                column=None,
+                parent=-1,
+                merged=True,
+            )
+            for r in members:
+                out.extend_table(table, range(r, ends[r]), parent=parent)
+
+        return out.build()
+
+    # ------------------------------------------------------------------
+    def _merged_id(self, child_ids: List[str]) -> Optional[str]:
+        """Stable note_group ID in deterministic mode, else None (uuid4)."""
+        if not self.config.deterministic_ids:
+            return None
+        return merged_id(child_ids, "note_group")
+
+    def _column_keys_table(self, table: ChunkTable, rows: np.ndarray) -> np.ndarray:
+        """:meth:`column_keys` for table rows."""
+        source = self.config.column_source
+        codes = table.meta_codes["visual_column_index"][rows]
+        values = table.meta_values["visual_column_index"]
+        visual_ok = np.array(
+            [isinstance(v, int) and not isinstance(v, bool) for v in values], dtype=bool
+        )
+        visual_int = np.array(
+            [v if ok else 0 for v, ok in zip(values, visual_ok.tolist())], dtype=np.int64
+        )
+        has_code = codes >= 0
+        is_visual = np.zeros(rows.size, dtype=bool)
+        is_visual[has_code] = visual_ok[codes[has_code]]
+
+        if source == COLUMN_SOURCE_VISUAL or (source == COLUMN_SOURCE_AUTO and is_visual.any()):
+            keys = np.zeros(rows.size, dtype=np.int64)
+            keys[is_visual] = visual_int[codes[is_visual]]
+            return np.maximum(keys, 0)
+
+        detector = ColumnDetector(ColumnDetectorConfig(engine=self.config.column_engine))
+        keys = np.zeros(rows.size, dtype=np.int64)
+        boxed = table.has_bbox[rows]
+        if boxed.any():
+            keys[boxed] = detector.column_indices(
+                np.maximum(table.page[rows[boxed]], 0),
+                table.x0[rows[boxed]].astype(np.float64),
+            )
+        return keys
+
     # ------------------------------------------------------------------
     def _starts_new_block(self, ch: Chunk, prev: Optional[Chunk]) -> bool:
         """Return True if *ch* should start a new semantic block."""
@@ -168,22 +427,20 @@ class SemanticGrouper:
     # ------------------------------------------------------------------
     @staticmethod
     def _looks_like_numbered_note(text: str) -> bool:
-        text = text.lstrip()
-        # e.g. "1.", "12.", "3)"
-        if len(text) >= 2 and text[0].isdigit() and text[1] in ".)":
-            return True
-        # e.g. "1 " at start of line
-        if len(text) >= 2 and text[0].isdigit() and text[1] == " ":
-            return True
-        return False
+        # e.g. "1.", "3)", "1 " – a single leading digit (see note_structure)
+        role = classify_line(text)
+        return role.kind == KIND_NUMBER and len(role.label) == 1
 
     # ------------------------------------------------------------------
     @staticmethod
     def _looks_like_bullet(text: str) -> bool:
-        text = text.lstrip()
-        if not text:
-            return False
-        return text[0] in {"•", "-", "*"}
+        role = classify_line(text)
+        return role.kind == KIND_SYMBOL and role.label in {"•", "-", "*"}
+
+
+def _group_sequence_worker(config: SemanticGrouperConfig, chunks: List[Chunk]) -> List[Chunk]:
+    """Process-pool entry point: group one column's lines."""
+    return SemanticGrouper(config)._group_sequence(chunks)
 
 
 __all__ = ["SemanticGrouper", "SemanticGrouperConfig"]
\ No newline at end of file
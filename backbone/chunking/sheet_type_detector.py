@@ -1,15 +1,186 @@
-def detect_sheet_type(page_number, chunks):
+"""Sheet type detection from a page's text lines.
+
+A page's sheet type is decided by keyword hits in its text. Keyword sets are
+configurable per sheet class, in priority order:
+
+    detector = SheetTypeDetector(EXTENDED_SHEET_CLASSES, headings_only=True)
+    detector.detect(page_chunks)   # -> "details_sheet", "notes_sheet", ...
+
+All keywords of all classes are compiled into one alternation regex and the
+page is scanned in blocks of lines (lowercased, newline-joined), so the
+search runs in the regex engine rather than per character in Python.
+
+The first class is decisive: any hit of it decides the page and stops the
+scan. The other classes are decided by their number of keyword hits over
+the whole page, ties going to the higher-priority class, so one "SEE
+DETAIL 4" on a notes sheet does not outrank its "NOTES" headings. Pages
+without a hit are "general".
+
+With *headings_only*, keywords match whole words ("detail" does not match
+"detailed") and only count on heading lines: lines that start with a
+keyword ("PLAN AND PROFILE STA 10+00") or have at most HEADING_MAX_WORDS
+words ("GENERAL NOTES:", "TYPICAL DETAILS"), and are not a cross-reference
+("SEE DETAIL 4"). Keywords inside note text ("ALL WORK PER SPECIFICATIONS
+AND DETAILS") are ignored.
+
+    >>> detector = SheetTypeDetector(EXTENDED_SHEET_CLASSES, headings_only=True)
+    >>> detector.detect_texts(["GENERAL NOTES:", "1. ALL WORK PER SPECIFICATIONS AND DETAILS",
+    ...                        "2. SEE DETAIL 4/C-501.", "DETAIL 4/C-501"])
+    'notes_sheet'
+    >>> detector.detect_texts(["DETAIL 1", "DETAIL 2", "TYPICAL DETAILS", "SEE NOTE 3"])
+    'details_sheet'
+    >>> detector.detect_texts(["INDEX OF SHEETS", "GENERAL NOTES", "PLAN AND PROFILE"])
+    'title_sheet'
+
+The default keyword set, ``{"notes_sheet": ("note",)}``, matches the
+original rule: any line containing "note" (case-insensitive) makes the page
+a notes sheet.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from backbone.chunking.chunk import Chunk
+
+
+SHEET_TYPE_GENERAL = "general"
+SHEET_TYPE_NOTES = "notes_sheet"
+
+# Class -> keywords (lowercase substrings), highest priority first.
+DEFAULT_SHEET_CLASSES: Dict[str, Tuple[str, ...]] = {
+    SHEET_TYPE_NOTES: ("note",),
+}
+
+# More sheet classes for plan sets (use with headings_only=True). Title sheets
+# list every other sheet's name, so their phrases decide the page outright;
+# the other classes win by hit count. Notes come right after the title
+# class: cross-references ("SEE DETAIL 4", "SEE NOTE 2") go both ways, and
+# on a tie the page is grouped as a notes sheet.
+EXTENDED_SHEET_CLASSES: Dict[str, Tuple[str, ...]] = {
+    "title_sheet": ("index of sheets", "sheet index", "title sheet", "cover sheet"),
+    SHEET_TYPE_NOTES: ("note", "notes"),
+    "cross_section_sheet": (
+        "cross section", "cross sections", "cross-section", "cross-sections",
+        "x-section", "x-sections",
+    ),
+    "plan_profile_sheet": ("plan and profile", "plan & profile", "plan/profile", "profile", "profiles"),
+    "details_sheet": ("details", "detail"),
+}
+
+# Lines per scanned block (one lower() + one regex search per block).
+BLOCK_LINES = 256
+
+# headings_only: lines up to this many words count as headings.
+HEADING_MAX_WORDS = 4
+
+# headings_only: cross-reference lines ("SEE DETAIL 4", "2. REFER TO NOTE 3").
+_REFERENCE_LINE = re.compile(r"^\W*(?:\w{1,3}[.)]\s+)?(?:see|refer|ref|per)\b")
+
+
+class SheetTypeDetector:
+    """Keyword-based sheet classifier (see module docstring)."""
+
+    def __init__(
+        self,
+        classes: Optional[Dict[str, Sequence[str]]] = None,
+        default: str = SHEET_TYPE_GENERAL,
+        block_lines: int = BLOCK_LINES,
+        headings_only: bool = False,
+    ) -> None:
+        self.classes = dict(classes if classes is not None else DEFAULT_SHEET_CLASSES)
+        self.default = default
+        self.block_lines = max(1, int(block_lines))
+        self.headings_only = bool(headings_only)
+
+        self._names: List[str] = list(self.classes)
+        parts = []
+        for rank, name in enumerate(self._names):
+            words = sorted({w.lower() for w in self.classes[name] if w}, key=len, reverse=True)
+            if not words:
+                continue
+            alternation = "|".join(re.escape(w) for w in words)
+            if self.headings_only:
+                alternation = rf"\b(?:{alternation})\b"
+            parts.append(f"(?P<c{rank}>{alternation})")
+        self._pattern = re.compile("|".join(parts)) if parts else None
+
+    # ------------------------------------------------------------------
+    def detect(self, chunks: Iterable[Chunk]) -> str:
+        """Sheet type of the page whose lines are *chunks*."""
+        return self.detect_texts(c.content or "" for c in chunks)
+
+    def detect_texts(self, texts: Iterable[str]) -> str:
+        """:meth:`detect` over plain line strings."""
+        if self._pattern is None:
+            return self.default
+
+        if self.headings_only:
+            texts = (t for t in texts if self._is_heading(t))
+
+        counts = [0] * len(self._names)
+        block: List[str] = []
+        for text in texts:
+            block.append(text)
+            if len(block) >= self.block_lines:
+                decided = self._scan("\n".join(block), counts)
+                block = []
+                if decided:
+                    break
+        else:
+            if block:
+                self._scan("\n".join(block), counts)
+
+        if counts[0]:
+            return self._names[0]
+        best = max(range(len(counts)), key=lambda rank: (counts[rank], -rank))
+        return self._names[best] if counts[best] else self.default
+
+    def _is_heading(self, text: str) -> bool:
+        text = text.strip().lower()
+        if _REFERENCE_LINE.match(text):
+            return False
+        return len(text.split()) <= HEADING_MAX_WORDS or self._pattern.match(text) is not None
+
+    def _scan(self, text: str, counts: List[int]) -> bool:
+        """Add the keyword hits in *text* to *counts*; True once the first class hits."""
+        text = text.lower()
+        if len(self._names) == 1:
+            if self._pattern.search(text):
+                counts[0] += 1
+                return True
+            return False
+
+        for m in self._pattern.finditer(text):
+            rank = int(m.lastgroup[1:])
+            counts[rank] += 1
+            if rank == 0:
+                return True
+        return False
+
+
+_default_detector = SheetTypeDetector()
+
+
+def detect_sheet_type(page_number, chunks, detector: Optional[SheetTypeDetector] = None):
     """
     Determine sheet type. Signature must match chunker.py caller.
 
     page_number: int
     chunks: list of Chunk objects for the page
+    detector: optional SheetTypeDetector (default: notes vs general)
     """
+    return (detector or _default_detector).detect(chunks)
 
-    # --- Minimal placeholder logic (works fine until you customize) ---
-    text_joined = " ".join((c.content or "").lower() for c in chunks)
-
-    if "note" in text_joined or "general notes" in text_joined:
-        return "notes_sheet"
 
-    return "general"
+__all__ = [
+    "SheetTypeDetector",
+    "detect_sheet_type",
+    "DEFAULT_SHEET_CLASSES",
+    "EXTENDED_SHEET_CLASSES",
+    "SHEET_TYPE_GENERAL",
+    "SHEET_TYPE_NOTES",
+    "BLOCK_LINES",
+    "HEADING_MAX_WORDS",
+]
@@ -1,64 +1,43 @@
 # structural_extractor.py
-import fitz
 from typing import List
-import re
 from backbone.chunking.chunk import Chunk
+from backbone.intake.document_pool import open_document
+from backbone.intake.page_text import PageText
+
+# Bullet / numbering / header detection for these lines lives in
+# backbone.chunking.note_structure (classify_line / line_role).
 
-BULLET_RE = re.compile(
-    r"""^(
-        \d+\.\s* |
-        \d+\)\s* |
-        [A-Z]\.\s* |
-        [A-Z]\)\s* |
-        \(\d+\)\s* |
-        \([A-Za-z]\)\s*
-    )""",
-    re.VERBOSE
-)
 
 class StructuralExtractor:
     def extract(self, pdf_path: str) -> List[Chunk]:
         print(">>> USING LINE-LEVEL EXTRACTOR <<<")
 
-        doc = fitz.open(pdf_path)
+        doc = open_document(pdf_path)
         out = []
 
-        for pnum, page in enumerate(doc, start=1):
-            raw = page.get_text("rawdict")
-            if "blocks" not in raw:
-                continue
+        for pnum in range(1, len(doc) + 1):
+            # Line text + bbox come from the shared "dict" pass; per-character
+            # rawdict data is not needed here.
+            page_text = PageText.load(pdf_path, pnum - 1)
 
-            for block in raw["blocks"]:
-                if block.get("type", None) != 0:
+            for line in page_text.lines:
+                text = line["text"].strip()
+                if not text:
                     continue
 
-                for line in block.get("lines", []):
-                    spans = line.get("spans", [])
-                    txt_parts = []
-
-                    for s in spans:
-                        if "text" in s:
-                            txt_parts.append(s["text"])
-                        elif "chars" in s:
-                            txt_parts.append("".join(c["c"] for c in s["chars"]))
-
-                    text = "".join(txt_parts).strip()
-                    if not text:
-                        continue
-
-                    # --- CRITICAL FIX: keep bullets intact ---
-                    # DO NOT SPLIT ANYTHING HERE.
-                    # Semantic grouper will split/merge later.
+                # --- CRITICAL FIX: keep bullets intact ---
+                # DO NOT SPLIT ANYTHING HERE.
+                # Semantic grouper will split/merge later.
 
-                    x0, y0, x1, y1 = line["bbox"]
+                x0, y0, x1, y1 = line["bbox"]
 
-                    out.append(
-                        Chunk(
-                            type="text_line",
-                            content=text,
-                            page=pnum,
-                            bbox=(x0, y0, x1, y1),
-                        )
+                out.append(
+                    Chunk(
+                        type="text_line",
+                        content=text,
+                        page=pnum,
+                        bbox=(x0, y0, x1, y1),
                     )
+                )
 
         return out
\ No newline at end of file
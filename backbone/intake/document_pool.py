@@ -0,0 +1,220 @@
+"""
+Process-wide PDF document / page handle pool.
+
+Every stage of the pipeline (chunker, visual integrator, fusion, box
+detectors, overlay tools) needs the same plan set open. Calling
+``fitz.open()`` in each of them means PyMuPDF re-parses the xref table and
+page tree every time, which dominates short runs on large civil sets.
+
+This module keeps one shared, LRU-bounded cache of open documents keyed by
+``(absolute path, mtime_ns, size)`` so a file that changes on disk is
+transparently reopened. Loaded pages are cached as well, in a second LRU.
+
+Usage:
+
+    from backbone.intake.document_pool import open_document, load_page
+
+    doc = open_document("test.pdf")          # cached fitz.Document
+    page = load_page("test.pdf", 3)          # cached fitz.Page (1-based)
+
+Documents handed out by the pool are shared. Callers must NOT close them
+(no ``with fitz.open(...)`` blocks around pooled handles); eviction simply
+drops the pool's reference and lets PyMuPDF release the document once the
+last user is done with it.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Iterable, List, Optional, Tuple
+
+try:
+    import fitz  # PyMuPDF
+except Exception:  # pragma: no cover - import guard
+    fitz = None
+
+
+# (absolute path, mtime_ns, size)
+DocKey = Tuple[str, int, int]
+
+DEFAULT_MAX_DOCUMENTS = 4
+DEFAULT_MAX_PAGES = 64
+
+
+def document_key(pdf_path: str) -> DocKey:
+    """Return the cache key for *pdf_path* based on its current stat()."""
+    abs_path = os.path.abspath(str(pdf_path))
+    st = os.stat(abs_path)
+    return (abs_path, int(st.st_mtime_ns), int(st.st_size))
+
+
+def select_page_indices(pages: Optional[Iterable[int]], page_count: int) -> List[int]:
+    """
+    Turn an optional collection of **1-based** page numbers into sorted,
+    de-duplicated 0-based indices. ``None`` means every page.
+    """
+    if pages is None:
+        return list(range(page_count))
+    indices = set()
+    for p in pages:
+        p = int(p)
+        if p < 1 or p > page_count:
+            raise ValueError(f"Page {p} is out of range 1..{page_count}")
+        indices.add(p - 1)
+    return sorted(indices)
+
+
+class DocumentPool:
+    """LRU cache of open ``fitz.Document`` and ``fitz.Page`` handles."""
+
+    def __init__(
+        self,
+        max_documents: int = DEFAULT_MAX_DOCUMENTS,
+        max_pages: int = DEFAULT_MAX_PAGES,
+    ) -> None:
+        self.max_documents = max(1, int(max_documents))
+        self.max_pages = max(0, int(max_pages))
+
+        self._docs: "OrderedDict[DocKey, Any]" = OrderedDict()
+        self._pages: "OrderedDict[Tuple[DocKey, int], Any]" = OrderedDict()
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------
+    # Documents
+    # ------------------------------------------------------------------
+    def get_document(self, pdf_path: str) -> "fitz.Document":
+        """Return a cached document for *pdf_path*, opening it if needed."""
+        if fitz is None:
+            raise RuntimeError("PyMuPDF (fitz) is not available; cannot open PDFs.")
+
+        key = document_key(pdf_path)
+
+        with self._lock:
+            doc = self._docs.get(key)
+            if doc is not None:
+                self._docs.move_to_end(key)
+                self.hits += 1
+                return doc
+
+            # A stale entry for the same path (file changed on disk) is
+            # dropped before the new handle is cached.
+            self._drop_path(key[0])
+
+            doc = fitz.open(key[0])
+            self.misses += 1
+            self._docs[key] = doc
+
+            while len(self._docs) > self.max_documents:
+                old_key, _ = self._docs.popitem(last=False)
+                self._drop_pages_for(old_key)
+
+            return doc
+
+    # ------------------------------------------------------------------
+    # Pages
+    # ------------------------------------------------------------------
+    def get_page(self, pdf_path: str, page_index: int) -> "fitz.Page":
+        """Return a cached page (0-based *page_index*) of *pdf_path*."""
+        doc = self.get_document(pdf_path)
+        key = document_key(pdf_path)
+        page_key = (key, int(page_index))
+
+        with self._lock:
+            page = self._pages.get(page_key)
+            if page is not None:
+                self._pages.move_to_end(page_key)
+                return page
+
+            page = doc.load_page(int(page_index))
+            if self.max_pages > 0:
+                self._pages[page_key] = page
+                while len(self._pages) > self.max_pages:
+                    self._pages.popitem(last=False)
+            return page
+
+    def release_page(self, pdf_path: str, page_index: int) -> None:
+        """Forget a cached page so PyMuPDF can free it."""
+        try:
+            key = document_key(pdf_path)
+        except OSError:
+            return
+        with self._lock:
+            self._pages.pop((key, int(page_index)), None)
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+    def clear(self) -> None:
+        """Drop every cached page and document."""
+        with self._lock:
+            self._pages.clear()
+            self._docs.clear()
+
+    def _drop_path(self, abs_path: str) -> None:
+        stale = [k for k in self._docs if k[0] == abs_path]
+        for k in stale:
+            self._docs.pop(k, None)
+            self._drop_pages_for(k)
+
+    def _drop_pages_for(self, key: DocKey) -> None:
+        stale = [pk for pk in self._pages if pk[0] == key]
+        for pk in stale:
+            self._pages.pop(pk, None)
+
+
+# ---------------------------------------------------------------------
+# Process-wide default pool
+# ---------------------------------------------------------------------
+
+_DEFAULT_POOL: Optional[DocumentPool] = None
+_DEFAULT_POOL_LOCK = threading.Lock()
+
+
+def get_document_pool() -> DocumentPool:
+    """Return the process-wide :class:`DocumentPool` (created lazily)."""
+    global _DEFAULT_POOL
+    if _DEFAULT_POOL is None:
+        with _DEFAULT_POOL_LOCK:
+            if _DEFAULT_POOL is None:
+                _DEFAULT_POOL = DocumentPool()
+    return _DEFAULT_POOL
+
+
+def reset_document_pool() -> DocumentPool:
+    """
+    Replace the process-wide pool with a fresh, empty one.
+
+    Intended for worker processes started with ``fork``: inherited handles
+    share the parent's file descriptors, so each worker must open its own.
+    The old handles are not closed (they still belong to the parent).
+    """
+    global _DEFAULT_POOL
+    with _DEFAULT_POOL_LOCK:
+        _DEFAULT_POOL = DocumentPool()
+    return _DEFAULT_POOL
+
+
+def open_document(pdf_path: str) -> "fitz.Document":
+    """Shortcut for ``get_document_pool().get_document(pdf_path)``."""
+    return get_document_pool().get_document(pdf_path)
+
+
+def load_page(pdf_path: str, page_number: int) -> "fitz.Page":
+    """Return the pooled page for a **1-based** *page_number*."""
+    return get_document_pool().get_page(pdf_path, int(page_number) - 1)
+
+
+__all__ = [
+    "DocumentPool",
+    "document_key",
+    "select_page_indices",
+    "get_document_pool",
+    "reset_document_pool",
+    "open_document",
+    "load_page",
+]
@@ -0,0 +1,213 @@
+"""
+Persistent, content-addressed cache for PyMuPDF text extraction.
+
+``page.get_text(...)`` re-parses the page content stream on every call, and
+every run of the notes pipeline calls it for every page even when the PDF
+has not changed. This cache stores the extraction output on disk, keyed by
+
+    (PDF content hash, page index, extraction mode, PyMuPDF version)
+
+so a re-run after tweaking grouping parameters never touches the content
+streams at all.
+
+Entries are pickled and zlib-compressed, one file per (pdf, page, mode):
+
+    <repo>/.cache/extraction/<key[:2]>/<key>.bin
+
+The content hash is a SHA-256 of the file bytes. It is memoized in memory
+and on disk by (path, mtime, size), so an unchanged PDF is read once, not
+once per run.
+
+Usage:
+
+    from backbone.intake.extraction_cache import get_extraction_cache
+
+    cache = get_extraction_cache()
+    blocks = cache.get_text("test.pdf", 0, "blocks")     # 0-based page index
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    import fitz  # PyMuPDF
+except Exception:  # pragma: no cover - import guard
+    fitz = None
+
+from backbone.intake.document_pool import document_key, get_document_pool
+
+
+# Bump when the on-disk entry layout changes.
+CACHE_FORMAT_VERSION = 1
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parents[2] / ".cache" / "extraction"
+
+# Environment override for the cache location (e.g. a shared scratch disk).
+CACHE_DIR_ENV = "PLAN_READER_EXTRACTION_CACHE"
+
+
+def _pymupdf_version() -> str:
+    if fitz is None:
+        return "none"
+    return str(getattr(fitz, "VersionBind", "unknown"))
+
+
+class ExtractionCache:
+    """On-disk cache of ``page.get_text(mode)`` results."""
+
+    def __init__(self, root: Optional[str] = None, enabled: bool = True) -> None:
+        self.root = Path(root or os.environ.get(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR)
+        self.enabled = enabled
+
+        self._hashes: Dict[Tuple[str, int, int], str] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+    def content_hash(self, pdf_path: str) -> str:
+        """SHA-256 of the PDF bytes (memoized by path + mtime + size)."""
+        stat_key = document_key(pdf_path)
+
+        with self._lock:
+            cached = self._hashes.get(stat_key)
+        if cached:
+            return cached
+
+        stat_file = self._stat_memo_path(stat_key)
+        digest = None
+        if self.enabled and stat_file.exists():
+            try:
+                digest = stat_file.read_text(encoding="utf-8").strip() or None
+            except OSError:
+                digest = None
+
+        if digest is None:
+            h = hashlib.sha256()
+            with open(stat_key[0], "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    h.update(block)
+            digest = h.hexdigest()
+            if self.enabled:
+                self._atomic_write(stat_file, digest.encode("utf-8"))
+
+        with self._lock:
+            self._hashes[stat_key] = digest
+        return digest
+
+    def entry_key(self, pdf_path: str, page_index: int, mode: str) -> str:
+        raw = "|".join(
+            [
+                self.content_hash(pdf_path),
+                str(int(page_index)),
+                str(mode),
+                _pymupdf_version(),
+                str(CACHE_FORMAT_VERSION),
+            ]
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+    def get_or_extract(
+        self,
+        pdf_path: str,
+        page_index: int,
+        mode: str,
+        extract: Callable[[], Any],
+    ) -> Any:
+        """Return the cached value, or call *extract()* and store its result."""
+        if not self.enabled:
+            return extract()
+
+        path = self._entry_path(self.entry_key(pdf_path, page_index, mode))
+
+        if path.exists():
+            try:
+                value = pickle.loads(zlib.decompress(path.read_bytes()))
+                self.hits += 1
+                return value
+            except Exception:
+                # Truncated / corrupt entry: fall through and rebuild it.
+                pass
+
+        value = extract()
+        self.misses += 1
+        try:
+            payload = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), 6)
+            self._atomic_write(path, payload)
+        except Exception as exc:  # pragma: no cover - defensive
+            print(f">>> EXTRACTION CACHE: could not write {path}: {exc}")
+        return value
+
+    def get_text(
+        self,
+        pdf_path: str,
+        page_index: int,
+        mode: str = "blocks",
+        flags: Optional[int] = None,
+    ) -> Any:
+        """Cached ``page.get_text(mode, flags=flags)`` for a 0-based *page_index*."""
+        pool = get_document_pool()
+
+        def _extract() -> Any:
+            page = pool.get_page(pdf_path, page_index)
+            try:
+                if flags is None:
+                    return page.get_text(mode)
+                return page.get_text(mode, flags=flags)
+            finally:
+                pool.release_page(pdf_path, page_index)
+
+        cache_mode = mode if flags is None else f"{mode}:{int(flags)}"
+        return self.get_or_extract(pdf_path, page_index, cache_mode, _extract)
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+    def _entry_path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.bin"
+
+    def _stat_memo_path(self, stat_key: Tuple[str, int, int]) -> Path:
+        raw = f"{stat_key[0]}|{stat_key[1]}|{stat_key[2]}".encode("utf-8")
+        return self.root / "hashes" / hashlib.sha1(raw).hexdigest()
+
+    @staticmethod
+    def _atomic_write(path: Path, payload: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(payload)
+        os.replace(tmp, path)
+
+
+# ---------------------------------------------------------------------
+# Process-wide default cache
+# ---------------------------------------------------------------------
+
+_DEFAULT_CACHE: Optional[ExtractionCache] = None
+
+
+def get_extraction_cache() -> ExtractionCache:
+    """Return the process-wide :class:`ExtractionCache` (created lazily)."""
+    global _DEFAULT_CACHE
+    if _DEFAULT_CACHE is None:
+        _DEFAULT_CACHE = ExtractionCache()
+    return _DEFAULT_CACHE
+
+
+__all__ = [
+    "CACHE_FORMAT_VERSION",
+    "ExtractionCache",
+    "get_extraction_cache",
+]
@@ -0,0 +1,254 @@
+"""
+Single-pass page text extraction with lazily derived views.
+
+Different parts of the pipeline used to extract the same page in different
+ways: ``get_text("blocks")`` (Chunker, pdf_extractor), ``get_text("rawdict")``
+(StructuralExtractor, per-character and the most expensive mode) and
+``get_textbox`` (visual/text fusion). :class:`PageText` calls PyMuPDF once in
+"dict" mode and derives every other view from that result on demand:
+
+    pt = PageText.load("test.pdf", 0)        # 0-based page index
+    pt.blocks      # same tuples as page.get_text("blocks")
+    pt.lines       # one dict per text line (bbox, text, spans, block/line no.)
+    pt.spans       # flat span list
+    pt.words       # word tuples, positions interpolated inside each span
+    pt.text_in_rect((x0, y0, x1, y1))
+
+The dict pass uses ``TEXTFLAGS_DICT`` without ``TEXT_PRESERVE_IMAGES`` (image
+blocks carry the decoded image bytes and nothing here reads them), which is
+exactly ``TEXTFLAGS_BLOCKS``, so ``blocks`` matches ``get_text("blocks")``.
+
+Per-character data is only produced when a consumer explicitly asks for it
+via :meth:`PageText.rawdict` or ``words_exact()``.
+
+The dict output goes through the on-disk extraction cache, so it is shared
+by every consumer of the same page, across runs.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import fitz  # PyMuPDF
+except Exception:  # pragma: no cover - import guard
+    fitz = None
+
+from backbone.intake.document_pool import get_document_pool
+from backbone.intake.extraction_cache import ExtractionCache, get_extraction_cache
+
+
+BBox = Tuple[float, float, float, float]
+
+# TEXTFLAGS_DICT minus TEXT_PRESERVE_IMAGES (== TEXTFLAGS_BLOCKS).
+DICT_FLAGS = (
+    (fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES) if fitz is not None else 0
+)
+
+
+class PageText:
+    """One page's text, extracted once in "dict" mode."""
+
+    def __init__(
+        self,
+        data: Dict[str, Any],
+        pdf_path: Optional[str] = None,
+        page_index: Optional[int] = None,
+        cache: Optional[ExtractionCache] = None,
+    ) -> None:
+        self.data = data or {}
+        self.pdf_path = pdf_path
+        self.page_index = page_index
+        self._cache = cache
+
+        self._blocks: Optional[List[tuple]] = None
+        self._lines: Optional[List[Dict[str, Any]]] = None
+        self._spans: Optional[List[Dict[str, Any]]] = None
+        self._words: Optional[List[tuple]] = None
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+    @classmethod
+    def load(
+        cls,
+        pdf_path: str,
+        page_index: int,
+        use_cache: bool = True,
+    ) -> "PageText":
+        """Extract (or fetch from the extraction cache) a 0-based page."""
+        cache = get_extraction_cache() if use_cache else None
+        if cache is not None:
+            data = cache.get_text(pdf_path, page_index, "dict", flags=DICT_FLAGS)
+        else:
+            pool = get_document_pool()
+            page = pool.get_page(pdf_path, page_index)
+            try:
+                data = page.get_text("dict", flags=DICT_FLAGS)
+            finally:
+                pool.release_page(pdf_path, page_index)
+        return cls(data, pdf_path=pdf_path, page_index=page_index, cache=cache)
+
+    @classmethod
+    def from_page(cls, page: "fitz.Page") -> "PageText":
+        """Extract directly from an already loaded ``fitz.Page`` (no cache)."""
+        return cls(page.get_text("dict", flags=DICT_FLAGS), page_index=page.number)
+
+    # ------------------------------------------------------------------
+    # Derived views
+    # ------------------------------------------------------------------
+    @property
+    def text_blocks(self) -> List[Dict[str, Any]]:
+        return [b for b in self.data.get("blocks", []) if b.get("type", 0) == 0]
+
+    @property
+    def blocks(self) -> List[tuple]:
+        """``(x0, y0, x1, y1, text, block_no, block_type)`` like get_text("blocks")."""
+        if self._blocks is None:
+            out = []
+            for blk in self.text_blocks:
+                text = "".join(
+                    "".join(s.get("text", "") for s in ln.get("spans", [])) + "\n"
+                    for ln in blk.get("lines", [])
+                )
+                x0, y0, x1, y1 = blk["bbox"]
+                out.append((x0, y0, x1, y1, text, blk.get("number", len(out)), 0))
+            self._blocks = out
+        return self._blocks
+
+    @property
+    def lines(self) -> List[Dict[str, Any]]:
+        """One entry per text line: bbox, text, spans, block_no, line_no."""
+        if self._lines is None:
+            out = []
+            for blk in self.text_blocks:
+                block_no = blk.get("number", 0)
+                for line_no, ln in enumerate(blk.get("lines", [])):
+                    spans = ln.get("spans", [])
+                    out.append(
+                        {
+                            "bbox": tuple(ln["bbox"]),
+                            "text": "".join(s.get("text", "") for s in spans),
+                            "spans": spans,
+                            "dir": ln.get("dir"),
+                            "block_no": block_no,
+                            "line_no": line_no,
+                        }
+                    )
+            self._lines = out
+        return self._lines
+
+    @property
+    def spans(self) -> List[Dict[str, Any]]:
+        if self._spans is None:
+            self._spans = [s for ln in self.lines for s in ln["spans"]]
+        return self._spans
+
+    @property
+    def words(self) -> List[tuple]:
+        """
+        ``(x0, y0, x1, y1, word, block_no, line_no, word_no)`` tuples.
+
+        Word x-extents are interpolated from the span bbox by character
+        position (no per-character data is extracted). Use
+        :meth:`words_exact` where glyph-accurate edges matter.
+        """
+        if self._words is None:
+            out = []
+            for ln in self.lines:
+                word_no = 0
+                for span in ln["spans"]:
+                    for x0, x1, word in _split_span_words(span):
+                        _, sy0, _, sy1 = span["bbox"]
+                        out.append((x0, sy0, x1, sy1, word, ln["block_no"], ln["line_no"], word_no))
+                        word_no += 1
+            self._words = out
+        return self._words
+
+    def words_exact(self) -> List[tuple]:
+        """Glyph-accurate ``get_text("words")`` output (extra extraction pass)."""
+        return self._extract_mode("words")
+
+    def rawdict(self) -> Dict[str, Any]:
+        """Per-character ``get_text("rawdict")`` output (expensive; opt-in)."""
+        return self._extract_mode("rawdict")
+
+    # ------------------------------------------------------------------
+    def text_in_rect(self, rect: BBox) -> str:
+        """
+        Text inside *rect*, one output line per text line.
+
+        Spans fully inside the rect are taken whole; spans crossing its edge
+        are clipped by interpolated character position (a character is kept
+        when its centre lies inside the rect), similar to ``get_textbox``.
+        """
+        rx0, ry0, rx1, ry1 = rect
+        out_lines: List[str] = []
+
+        for ln in self.lines:
+            lx0, ly0, lx1, ly1 = ln["bbox"]
+            if lx1 < rx0 or lx0 > rx1 or ly1 < ry0 or ly0 > ry1:
+                continue
+            cy = (ly0 + ly1) / 2.0
+            if not (ry0 <= cy <= ry1):
+                continue
+
+            parts: List[str] = []
+            for span in ln["spans"]:
+                sx0, _, sx1, _ = span["bbox"]
+                text = span.get("text", "")
+                if not text:
+                    continue
+                if sx0 >= rx0 and sx1 <= rx1:
+                    parts.append(text)
+                    continue
+                step = (sx1 - sx0) / len(text)
+                parts.append(
+                    "".join(
+                        ch
+                        for i, ch in enumerate(text)
+                        if rx0 <= sx0 + (i + 0.5) * step <= rx1
+                    )
+                )
+
+            line_text = "".join(parts)
+            if line_text:
+                out_lines.append(line_text)
+
+        return "\n".join(out_lines)
+
+    # ------------------------------------------------------------------
+    def _extract_mode(self, mode: str) -> Any:
+        if self.pdf_path is None or self.page_index is None:
+            raise ValueError(f"PageText has no source page; cannot extract {mode!r}.")
+        if self._cache is not None:
+            return self._cache.get_text(self.pdf_path, self.page_index, mode)
+        pool = get_document_pool()
+        page = pool.get_page(self.pdf_path, self.page_index)
+        try:
+            return page.get_text(mode)
+        finally:
+            pool.release_page(self.pdf_path, self.page_index)
+
+
+def _split_span_words(span: Dict[str, Any]) -> List[Tuple[float, float, str]]:
+    """Split a span into (x0, x1, word), interpolating x by character index."""
+    text = span.get("text", "")
+    if not text:
+        return []
+    sx0, _, sx1, _ = span["bbox"]
+    step = (sx1 - sx0) / len(text)
+
+    out = []
+    start = None
+    for i, ch in enumerate(text + " "):
+        if ch.isspace():
+            if start is not None:
+                out.append((sx0 + start * step, sx0 + i * step, text[start:i]))
+                start = None
+        elif start is None:
+            start = i
+    return out
+
+
+__all__ = ["DICT_FLAGS", "PageText"]
@@ -18,16 +18,19 @@ Output:
 """
 
 from __future__ import annotations
-import fitz  # PyMuPDF
-from typing import List, Dict, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from backbone.intake.document_pool import open_document, select_page_indices
+from backbone.intake.page_text import PageText
 
 
 BBox = Tuple[float, float, float, float]
 
 
-def extract_pdf_blocks(pdf_path: str) -> List[Dict]:
+def extract_pdf_blocks(pdf_path: str, pages: Optional[Iterable[int]] = None) -> List[Dict]:
     """
-    Extracts text blocks and bounding boxes for ALL pages.
+    Extracts text blocks and bounding boxes for ALL pages, or only for the
+    1-based page numbers in *pages* when given.
     Uses PyMuPDF's native PDF coordinate system.
 
     Returns:
@@ -37,16 +40,19 @@ def extract_pdf_blocks(pdf_path: str) -> List[Dict]:
             "bbox": (x0, y0, x1, y1),
             "page": int
         }
+
+    Blocks are derived from the shared single-pass PageText extraction
+    (served from the on-disk cache when the PDF is unchanged).
     """
 
-    doc = fitz.open(pdf_path)
+    doc = open_document(pdf_path)
     results: List[Dict] = []
 
-    for page_index, page in enumerate(doc):
+    for page_index in select_page_indices(pages, len(doc)):
         page_num = page_index + 1
 
         try:
-            blocks = page.get_text("blocks")
+            blocks = PageText.load(pdf_path, page_index).blocks
         except Exception as exc:
             print(f">>> PDF_EXTRACTOR ERROR on page {page_num}: {exc}")
             continue
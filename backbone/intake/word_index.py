@@ -0,0 +1,171 @@
+"""
+Per-page geometric index over words (or any boxes) for text-in-region queries.
+
+Visual/text fusion, box classification and masking all ask "which words /
+chunks lie in this rectangle?" for many rectangles on the same page.
+:class:`WordIndex` answers that from one extraction:
+
+    idx = WordIndex.load("test.pdf", 0)            # one get_text("words") call
+    idx.words_in_rect((x0, y0, x1, y1))            # word tuples, reading order
+    idx.text_in_rect((x0, y0, x1, y1))             # "LINE ONE\nLINE TWO"
+    idx.indices_in_rect(rect, mode="intersect")    # row numbers into idx.words
+
+Entries are sorted by centre y once. A query is two binary searches over
+that array plus a vectorised test on the slice in between, so a rect query
+costs microseconds instead of a scan over the page (or a ``get_textbox``
+call per rect).
+
+Any list of boxes can be indexed with :meth:`WordIndex.from_boxes`, e.g.
+the chunk boxes of a notes JSON.
+
+Query modes:
+
+    "center"    – the entry's centre lies inside the rect (edges inclusive)
+    "intersect" – the entry's box touches or overlaps the rect
+    "contain"   – the entry's box lies fully inside the rect
+"""
+
+from __future__ import annotations
+
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+BBox = Tuple[float, float, float, float]
+
+MODE_CENTER = "center"
+MODE_INTERSECT = "intersect"
+MODE_CONTAIN = "contain"
+MODES = (MODE_CENTER, MODE_INTERSECT, MODE_CONTAIN)
+
+
+class WordIndex:
+    """
+    Static index over ``(x0, y0, x1, y1, text, block_no, line_no, word_no)``
+    tuples (the ``get_text("words")`` layout).
+    """
+
+    def __init__(self, words: Sequence[tuple]) -> None:
+        self.words: List[tuple] = list(words)
+
+        coords = np.array([w[:4] for w in self.words], dtype=np.float64).reshape(-1, 4)
+        x0, y0, x1, y1 = coords.T
+        self._cx = (x0 + x1) / 2.0
+        self._lo_x = np.minimum(x0, x1)
+        self._hi_x = np.maximum(x0, x1)
+        self._lo_y = np.minimum(y0, y1)
+        self._hi_y = np.maximum(y0, y1)
+
+        cy = (y0 + y1) / 2.0
+        self._order = np.argsort(cy, kind="stable")
+        self._cy = cy[self._order]
+        # Widest reach of a box above / below its centre; bounds the slice
+        # an intersect / contain query has to look at.
+        self._reach = float((self._hi_y - self._lo_y).max() / 2.0) if len(self.words) else 0.0
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+    @classmethod
+    def load(cls, pdf_path: str, page_index: int, use_cache: bool = True) -> "WordIndex":
+        """Index a 0-based page from one ``get_text("words")`` call (extraction-cached)."""
+        # Imported here so JSON-only consumers (box classification, masking)
+        # do not load PyMuPDF.
+        from backbone.intake.document_pool import get_document_pool
+        from backbone.intake.extraction_cache import get_extraction_cache
+
+        if use_cache:
+            words = get_extraction_cache().get_text(pdf_path, page_index, "words")
+        else:
+            pool = get_document_pool()
+            page = pool.get_page(pdf_path, page_index)
+            try:
+                words = page.get_text("words")
+            finally:
+                pool.release_page(pdf_path, page_index)
+        return cls(words)
+
+    @classmethod
+    def from_page_text(cls, page_text: Any) -> "WordIndex":
+        """Index :attr:`PageText.words` (interpolated; no extra extraction)."""
+        return cls(page_text.words)
+
+    @classmethod
+    def from_boxes(
+        cls,
+        bboxes: Sequence[Sequence[float]],
+        texts: Optional[Sequence[str]] = None,
+    ) -> "WordIndex":
+        """Index arbitrary boxes; entry *i* is ``(*bboxes[i], texts[i], 0, 0, i)``."""
+        texts = texts if texts is not None else [""] * len(bboxes)
+        return cls(
+            (float(b[0]), float(b[1]), float(b[2]), float(b[3]), t, 0, 0, i)
+            for i, (b, t) in enumerate(zip(bboxes, texts))
+        )
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+    def indices_in_rect(self, rect: Sequence[float], mode: str = MODE_CENTER) -> np.ndarray:
+        """Row numbers (ascending, i.e. input order) of the entries matching *rect*."""
+        if mode not in MODES:
+            raise ValueError(f"Unknown query mode {mode!r}; expected one of {MODES}")
+        rx0, ry0, rx1, ry1 = (float(v) for v in rect)
+
+        reach = 0.0 if mode == MODE_CENTER else self._reach
+        start = np.searchsorted(self._cy, ry0 - reach, side="left")
+        stop = np.searchsorted(self._cy, ry1 + reach, side="right")
+        if stop <= start:
+            return np.empty(0, dtype=np.int64)
+
+        rows = self._order[start:stop]
+        if mode == MODE_CENTER:
+            cx = self._cx[rows]
+            hit = (cx >= rx0) & (cx <= rx1)
+        elif mode == MODE_INTERSECT:
+            hit = (
+                (self._hi_x[rows] >= rx0) & (self._lo_x[rows] <= rx1)
+                & (self._hi_y[rows] >= ry0) & (self._lo_y[rows] <= ry1)
+            )
+        else:
+            hit = (
+                (self._lo_x[rows] >= rx0) & (self._hi_x[rows] <= rx1)
+                & (self._lo_y[rows] >= ry0) & (self._hi_y[rows] <= ry1)
+            )
+        return np.sort(rows[hit])
+
+    def words_in_rect(self, rect: Sequence[float], mode: str = MODE_CENTER) -> List[tuple]:
+        """Entries matching *rect*, in input (reading) order."""
+        return [self.words[i] for i in self.indices_in_rect(rect, mode).tolist()]
+
+    def text_in_rect(self, rect: Sequence[float], mode: str = MODE_CENTER) -> str:
+        """
+        Text of the words matching *rect*: words of one text line joined by
+        a space, one output line per (block_no, line_no).
+        """
+        out_lines: List[str] = []
+        current: List[str] = []
+        line_key = None
+        for w in self.words_in_rect(rect, mode):
+            key = (w[5], w[6]) if len(w) >= 7 else None
+            if current and key != line_key:
+                out_lines.append(" ".join(current))
+                current = []
+            line_key = key
+            if w[4]:
+                current.append(w[4])
+        if current:
+            out_lines.append(" ".join(current))
+        return "\n".join(out_lines)
+
+
+__all__ = [
+    "WordIndex",
+    "MODE_CENTER",
+    "MODE_INTERSECT",
+    "MODE_CONTAIN",
+]
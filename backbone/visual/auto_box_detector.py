@@ -3,22 +3,51 @@ Image → JSON box auto-detector.
 
 Given a PDF page with color-coded rectangles, this module:
   - rasterizes the page
-  - detects connected regions of specific colors
+  - maps every pixel to its nearest palette color in one table lookup
+    and labels the regions of all colors at once (OpenCV connected
+    components), so the cost does not grow with the number of colors
   - converts them back into PDF coordinate space
   - emits a schema-compatible `page_structure` + `color_classes` dict.
 
+Coarse-to-fine mode (``coarse_dpi``): candidates are found on a low-DPI
+render, then every box edge is located exactly on full-DPI clip renders of
+narrow strips around it (``get_pixmap(clip=...)``). Large sheets are never
+rasterized whole at full DPI. A strip only trusts the one region that
+continues the candidate and runs its whole side; anything else (same-color
+boxes fused at coarse DPI or closer than a coarse pixel, nested boxes) is
+relabelled on a full-DPI window around the candidate, so boxes match the
+full-DPI result at any spacing. Only slivers thinner than a coarse pixel
+(e.g. the fragments left where boxes of other colors cross an edge) can be
+missed.
+
+Memory ceiling (``max_raster_mb``): a page whose full-DPI working set would
+exceed the ceiling is labelled in horizontal bands
+(:mod:`backbone.visual.tiled_raster`), with identical results.
+
 Designed for annotated/labeled sheets, NOT raw construction plans.
 """
 
 from __future__ import annotations
 
-from typing import Dict, List, Tuple
+import math
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from pathlib import Path
-from collections import deque
 
+import cv2
 import fitz  # PyMuPDF
+import numpy as np
 from PIL import Image
 
+from backbone.intake.document_pool import open_document, select_page_indices
+from backbone.visual.tiled_raster import (
+    exceeds_limit,
+    label_classes_banded,
+    raster_size,
+    same_class_components,
+)
+
 
 # ------------------------------------------------------------
 # Helpers
@@ -34,64 +63,369 @@ def _color_close(c1: Tuple[int, int, int], c2: Tuple[int, int, int], tol: int =
     return all(abs(a - b) <= tol for a, b in zip(c1, c2))
 
 
+def _rgb_array(img: Union[Image.Image, np.ndarray]) -> np.ndarray:
+    """(h, w, 3) uint8 RGB view of a PIL image or an (h, w, >=3) array."""
+    arr = np.asarray(img.convert("RGB") if isinstance(img, Image.Image) else img)
+    return np.ascontiguousarray(arr[:, :, :3], dtype=np.uint8)
+
+
+def _color_mask(rgb: np.ndarray, target_rgb: Tuple[int, int, int], tol: int) -> np.ndarray:
+    """uint8 mask (255 = match): every channel within *tol* of *target_rgb* (as _color_close)."""
+    lo = np.array([max(0, c - tol) for c in target_rgb], dtype=np.uint8)
+    hi = np.array([min(255, c + tol) for c in target_rgb], dtype=np.uint8)
+    return cv2.inRange(rgb, lo, hi)
+
+
+# Class-index images are uint8: 0 = no class, 1..255 = palette entry.
+MAX_PALETTE_COLORS = 255
+
+# Working set per raster pixel of one labelling pass (RGB, packed RGBA,
+# class index, int32 labels and temporaries), for the memory ceiling.
+LABEL_BYTES_PER_PIXEL = 24.0
+
+
+@lru_cache(maxsize=8)
+def _palette_lut(palette: Tuple[Tuple[int, int, int], ...], tol: int) -> np.ndarray:
+    """
+    2**24-entry table: packed color (r | g << 8 | b << 16) -> 1-based index
+    of the nearest palette color within *tol* (largest channel difference,
+    as _color_close), 0 = none. Ties go to the earlier palette entry.
+    """
+    if len(palette) > MAX_PALETTE_COLORS:
+        raise ValueError(f"At most {MAX_PALETTE_COLORS} palette colors are supported, got {len(palette)}")
+
+    lut = np.zeros(1 << 24, dtype=np.uint8)
+    dist = np.full(1 << 24, 255, dtype=np.int16)
+    for k, color in enumerate(palette, start=1):
+        axes = [np.arange(max(0, c - tol), min(255, c + tol) + 1, dtype=np.int32) for c in color]
+        r, g, b = np.meshgrid(*axes, indexing="ij", sparse=True)
+        key = (r | (g << 8) | (b << 16)).ravel()
+        d = np.maximum(np.maximum(abs(r - color[0]), abs(g - color[1])), abs(b - color[2])).ravel()
+        closer = d < dist[key]
+        lut[key[closer]] = k
+        dist[key[closer]] = d[closer]
+    return lut
+
+
+def _class_index_image(rgb: np.ndarray, palette: Tuple[Tuple[int, int, int], ...], tol: int) -> np.ndarray:
+    """(h, w) uint8 image: 1-based palette index of each pixel's color, 0 = none."""
+    lut = _palette_lut(tuple(tuple(int(v) for v in c) for c in palette), int(tol))
+    # RGBX bytes read as little-endian uint32 are r | g << 8 | b << 16 | x << 24.
+    packed = cv2.cvtColor(rgb, cv2.COLOR_RGB2RGBA).view("<u4")[:, :, 0]
+    return lut[np.bitwise_and(packed, 0xFFFFFF)]
+
+
+def _detect_regions_by_class(
+    img: Union[Image.Image, np.ndarray],
+    palette: List[Tuple[int, int, int]],
+    tol: int = 10,
+) -> List[List[Tuple[int, int, int, int]]]:
+    """
+    :func:`_detect_regions_for_color` for every palette color in one pass.
+
+    The page is mapped once to a class-index image (nearest palette color
+    within *tol*), all classes are labelled together, and only the rare
+    components where two classes touch are split again per class. The cost
+    does not grow with the number of palette colors.
+    """
+    if not palette:
+        return []
+
+    classes = _class_index_image(_rgb_array(img), tuple(palette), tol)
+    if cv2.countNonZero(classes) == 0:
+        return [[] for _ in palette]
+
+    # Label only the bounding rectangle of the matching pixels.
+    ox, oy, bw, bh = cv2.boundingRect(classes)
+    _, regions = same_class_components(classes[oy:oy + bh, ox:ox + bw])
+    regions[:, [1, 3, 5]] += oy
+    regions[:, [2, 4, 6]] += ox
+    return _boxes_by_class(regions, len(palette))
+
+
+def _boxes_by_class(regions: np.ndarray, n_classes: int) -> List[List[Tuple[int, int, int, int]]]:
+    """
+    Split :func:`~backbone.visual.tiled_raster.same_class_components` rows
+    into (x0, y0, x1, y1) boxes per 1-based class, each class in raster
+    order of its regions' first pixels.
+    """
+    out: List[List[Tuple[int, int, int, int]]] = [[] for _ in range(n_classes)]
+    regions = regions[regions[:, 0] > 0]
+    regions = regions[np.lexsort((regions[:, 6], regions[:, 5], regions[:, 0]))]
+    for k, y0, x0, y1, x1, _, _ in regions.tolist():
+        out[k - 1].append((x0, y0, x1, y1))
+    return out
+
+
 def _detect_regions_for_color(
-    img: Image.Image,
+    img: Union[Image.Image, np.ndarray],
     target_rgb: Tuple[int, int, int],
     tol: int = 10
 ) -> List[Tuple[int, int, int, int]]:
     """
     Return list of (x0, y0, x1, y1) bounding boxes for contiguous
     pixel regions matching target_rgb within tolerance.
+
+    Regions are 4-connected and listed in raster order of their first
+    pixel (top to bottom, then left to right), x1/y1 exclusive.
     """
-    w, h = img.size
-    pix = img.load()
-
-    # CORRECT: visited[y][x]
-    visited = [[False for _ in range(w)] for _ in range(h)]
-    boxes: List[Tuple[int, int, int, int]] = []
-
-    # Neighbor generator
-    def neighbors(x: int, y: int):
-        for dx, dy in ((1,0), (-1,0), (0,1), (0,-1)):
-            nx, ny = x + dx, y + dy
-            if 0 <= nx < w and 0 <= ny < h:
-                yield nx, ny
-
-    # Flood-fill through image
-    for y in range(h):
-        for x in range(w):
-            if visited[y][x]:
-                continue
-
-            if not _color_close(pix[x, y][:3], target_rgb, tol):
-                visited[y][x] = True
-                continue
-
-            # Start new region
-            q = deque([(x, y)])
-            visited[y][x] = True
-
-            min_x = max_x = x
-            min_y = max_y = y
-
-            while q:
-                cx, cy = q.popleft()
-                for nx, ny in neighbors(cx, cy):
-                    if visited[ny][nx]:
-                        continue
-                    if _color_close(pix[nx, ny][:3], target_rgb, tol):
-                        visited[ny][nx] = True
-                        q.append((nx, ny))
-                        min_x = min(min_x, nx)
-                        max_x = max(max_x, nx)
-                        min_y = min(min_y, ny)
-                        max_y = max(max_y, ny)
-                    else:
-                        visited[ny][nx] = True
-
-            boxes.append((min_x, min_y, max_x+1, max_y+1))
-
-    return boxes
+    return _detect_regions_by_class(img, [target_rgb], tol)[0]
+
+
+# ------------------------------------------------------------
+# Coarse-to-fine detection
+# ------------------------------------------------------------
+
+# Coarse pixels searched on each side of a coarse box edge when refining it.
+REFINE_MARGIN = 2
+
+
+@contextmanager
+def antialiasing_off() -> Iterator[None]:
+    """
+    Render without anti-aliasing (MuPDF global; restored on exit). At coarse
+    DPI a thin stroke covers a fraction of a pixel and anti-aliasing blends
+    it towards the background, past the color tolerance; aliased, it is
+    drawn one pixel wide in its exact color.
+    """
+    previous = fitz.TOOLS.show_aa_level()["graphics"]
+    fitz.TOOLS.set_aa_level(0)
+    try:
+        yield
+    finally:
+        fitz.TOOLS.set_aa_level(previous)
+
+
+def _render_rgb(
+    source: Union["fitz.Page", "fitz.DisplayList"],
+    zoom: float,
+    clip: Optional["fitz.Rect"] = None,
+) -> Tuple[np.ndarray, "fitz.Pixmap"]:
+    """(h, w, n) zero-copy view of a page render, and its pixmap (pix.x / pix.y = clip origin)."""
+    pix = source.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=clip, alpha=False)
+    return np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n), pix
+
+
+def _window_components(
+    display_list: "fitz.DisplayList",
+    zoom: float,
+    window: Tuple[int, int, int, int],
+    class_index: int,
+    palette: Tuple[Tuple[int, int, int], ...],
+    tol: int,
+) -> Tuple[np.ndarray, np.ndarray, Tuple[int, int], int]:
+    """
+    4-connected components of class *class_index* in the full-DPI render of
+    *window* (full-DPI pixels): (labels, stats, window origin, pixels rendered).
+    """
+    x0, y0, x1, y1 = window
+    img, pix = _render_rgb(display_list, zoom, fitz.Rect(x0 / zoom, y0 / zoom, x1 / zoom, y1 / zoom))
+    mask = (_class_index_image(_rgb_array(img), palette, tol) == class_index).view(np.uint8)
+    _, labels, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=4)
+    return labels, stats, (pix.x, pix.y), pix.width * pix.height
+
+
+def _components_in(labels: np.ndarray, origin: Tuple[int, int], rect: Tuple[int, int, int, int]) -> List[int]:
+    """Labels of the components with a pixel inside *rect* (full-DPI pixels)."""
+    ox, oy = origin
+    h, w = labels.shape
+    x0, y0 = max(0, rect[0] - ox), max(0, rect[1] - oy)
+    x1, y1 = min(w, rect[2] - ox), min(h, rect[3] - oy)
+    if x1 <= x0 or y1 <= y0:
+        return []
+    return [int(k) for k in np.unique(labels[y0:y1, x0:x1]) if k]
+
+
+# Box sides, in (x0, y0, x1, y1) order.
+LEFT, TOP, RIGHT, BOTTOM = range(4)
+
+
+def _open_sides(
+    stat: np.ndarray,
+    window_shape: Tuple[int, int],
+    origin: Tuple[int, int],
+    size: Tuple[int, int],
+) -> List[int]:
+    """Sides where a component runs into the window border (and may continue past it)."""
+    x, y, w, h = (int(v) for v in stat[:4])
+    ox, oy = origin
+    win_h, win_w = window_shape
+    sides = []
+    if x == 0 and ox > 0:
+        sides.append(LEFT)
+    if y == 0 and oy > 0:
+        sides.append(TOP)
+    if x + w == win_w and ox + win_w < size[0]:
+        sides.append(RIGHT)
+    if y + h == win_h and oy + win_h < size[1]:
+        sides.append(BOTTOM)
+    return sides
+
+
+def _grow(box: Tuple[int, int, int, int], d: int) -> Tuple[int, int, int, int]:
+    return (box[0] - d, box[1] - d, box[2] + d, box[3] + d)
+
+
+def _stat_box(stat: np.ndarray, origin: Tuple[int, int]) -> Tuple[int, int, int, int]:
+    x, y, w, h = (int(v) for v in stat[:4])
+    return (x + origin[0], y + origin[1], x + w + origin[0], y + h + origin[1])
+
+
+def _refine_window(
+    display_list: "fitz.DisplayList",
+    zoom: float,
+    box: Tuple[int, int, int, int],
+    class_index: int,
+    palette: Tuple[Tuple[int, int, int], ...],
+    tol: int,
+    margin: int,
+    slack: int,
+    size: Tuple[int, int],
+) -> Tuple[List[Tuple[int, int, int, int]], int]:
+    """
+    Full-DPI boxes of every region overlapping *box* grown by *slack*,
+    labelled on a render of *box* grown by *margin*; a side of the window
+    is pushed out (doubling) while a region runs into it. Returns (boxes,
+    pixels rendered).
+    """
+    width, height = size
+    core = _grow(box, slack)
+    grow = [margin] * 4
+    touched = 0
+    while True:
+        window = (
+            max(0, box[0] - grow[LEFT]), max(0, box[1] - grow[TOP]),
+            min(width, box[2] + grow[RIGHT]), min(height, box[3] + grow[BOTTOM]),
+        )
+        labels, stats, origin, n = _window_components(display_list, zoom, window, class_index, palette, tol)
+        touched += n
+        hits = _components_in(labels, origin, core)
+        open_sides = {side for k in hits for side in _open_sides(stats[k], labels.shape, origin, size)}
+        if not open_sides:
+            return [_stat_box(stats[k], origin) for k in hits], touched
+        for side in open_sides:
+            grow[side] *= 2
+
+
+def _refine_box(
+    display_list: "fitz.DisplayList",
+    zoom: float,
+    box: Tuple[int, int, int, int],
+    class_index: int,
+    palette: Tuple[Tuple[int, int, int], ...],
+    tol: int,
+    margin: int,
+    slack: int,
+    size: Tuple[int, int],
+) -> Tuple[List[Tuple[int, int, int, int]], int]:
+    """
+    Exact full-DPI pixel boxes of the region(s) predicted at *box* (full-DPI
+    pixels, from the coarse pass), and the number of pixels rendered.
+
+    An aliased coarse stroke can sit up to a coarse pixel off the real one,
+    so a region belongs to the candidate if it overlaps *box* grown by
+    *slack* (one coarse pixel). Each edge is searched in a strip
+    2 * *margin* pixels thick around it and taken from the one component of
+    the strip that overlaps the candidate, so the
+    edge of a same-color neighbour reaching into the strip is ignored. The
+    four components must also run the whole side of the refined box. If a
+    strip has no such component, several (regions fused at coarse DPI, a
+    region nested near the edge), one running out through the strip's outer
+    side, or a side comes up short, the candidate is ambiguous and is
+    labelled whole at full DPI instead (:func:`_refine_window`), as are
+    boxes too small for strips.
+    """
+    width, height = size
+    x0, y0, x1, y1 = box
+    if x1 - x0 <= 4 * margin or y1 - y0 <= 4 * margin:
+        return _refine_window(display_list, zoom, box, class_index, palette, tol, margin, slack, size)
+
+    core = _grow(box, slack)
+    win = (max(0, x0 - margin), max(0, y0 - margin), min(width, x1 + margin), min(height, y1 + margin))
+    strips = {
+        TOP: (win[0], win[1], win[2], min(height, y0 + margin)),
+        BOTTOM: (win[0], max(0, y1 - margin), win[2], win[3]),
+        LEFT: (win[0], win[1], min(width, x0 + margin), win[3]),
+        RIGHT: (max(0, x1 - margin), win[1], win[2], win[3]),
+    }
+
+    found: Dict[int, Tuple[int, int, int, int]] = {}
+    touched = 0
+    for side, strip in strips.items():
+        labels, stats, origin, n = _window_components(display_list, zoom, strip, class_index, palette, tol)
+        touched += n
+        hits = _components_in(labels, origin, core)
+        if len(hits) != 1 or side in _open_sides(stats[hits[0]], labels.shape, origin, size):
+            found = {}
+            break
+        found[side] = _stat_box(stats[hits[0]], origin)
+
+    if found:
+        refined = (found[LEFT][0], found[TOP][1], found[RIGHT][2], found[BOTTOM][3])
+        # One region: each edge's component runs the whole side of the box
+        # (stacked boxes fused at coarse DPI fail this on their sides).
+        if all(found[s][0] == refined[0] and found[s][2] == refined[2] for s in (TOP, BOTTOM)) and all(
+            found[s][1] == refined[1] and found[s][3] == refined[3] for s in (LEFT, RIGHT)
+        ):
+            return [refined], touched
+
+    boxes, n = _refine_window(display_list, zoom, box, class_index, palette, tol, margin, slack, size)
+    return boxes, touched + n
+
+
+def _detect_regions_coarse_to_fine(
+    page: "fitz.Page",
+    palette: List[Tuple[int, int, int]],
+    dpi: int,
+    coarse_dpi: int,
+    tol: int = 10,
+) -> Tuple[List[List[Tuple[int, int, int, int]]], Tuple[int, int], int]:
+    """
+    :func:`_detect_regions_by_class` on the full-DPI raster of *page*,
+    without rendering it: regions are found on an aliased *coarse_dpi*
+    render and their edges refined from full-DPI strips (:func:`_refine_box`).
+    The page content is interpreted once into a display list that every
+    render replays. Once refinement has rendered more pixels than the full
+    raster holds (sheets of overlapping, fragmented boxes), the page is
+    labelled whole at full DPI instead.
+
+    Returns (boxes per palette color in full-DPI pixels, full raster
+    (width, height), pixels rendered).
+    """
+    zoom = dpi / 72.0
+    full = (page.rect * fitz.Matrix(zoom, zoom)).round()
+    size = (full.width, full.height)
+
+    display_list = page.get_displaylist()
+    with antialiasing_off():
+        coarse_img, coarse_pix = _render_rgb(display_list, coarse_dpi / 72.0)
+    touched = coarse_pix.width * coarse_pix.height
+    coarse_boxes = _detect_regions_by_class(coarse_img, palette, tol)
+
+    sx = size[0] / coarse_pix.width
+    sy = size[1] / coarse_pix.height
+    slack = math.ceil(max(sx, sy))
+    margin = REFINE_MARGIN * slack
+    key = tuple(tuple(int(v) for v in c) for c in palette)
+
+    out: List[List[Tuple[int, int, int, int]]] = []
+    for k, boxes in enumerate(coarse_boxes, start=1):
+        refined = []
+        for cx0, cy0, cx1, cy1 in boxes:
+            predicted = (
+                math.floor(cx0 * sx), math.floor(cy0 * sy),
+                math.ceil(cx1 * sx), math.ceil(cy1 * sy),
+            )
+            found, n = _refine_box(display_list, zoom, predicted, k, key, tol, margin, slack, size)
+            refined.extend(found)
+            touched += n
+            if touched > size[0] * size[1]:
+                img, pix = _render_rgb(display_list, zoom)
+                return _detect_regions_by_class(img, palette, tol), size, touched + pix.width * pix.height
+        # A region reached from two candidates (window fallback) is listed
+        # once, in raster order of its first pixel as the full-DPI pass.
+        out.append(sorted(set(refined), key=lambda b: (b[1], b[0])))
+    return out, size, touched
 
 
 # ------------------------------------------------------------
@@ -104,10 +438,17 @@ def detect_boxes_from_pdf(
     dpi: int = 150,
     color_classes: Dict[str, Dict[str, str]] | None = None,
     color_tolerance: int = 10,
+    coarse_dpi: Optional[int] = None,
+    max_raster_mb: Optional[float] = None,
 ) -> Dict:
     """
     Detect color-coded boxes on a given PDF page.
 
+    With *coarse_dpi* (e.g. 36, below *dpi*) the page is searched coarse-to-
+    fine instead of being rasterized whole at *dpi*; with *max_raster_mb*
+    pages too large for the ceiling are labelled in bands (see module
+    docstring).
+
     Returns:
     {
       "metadata": {...},
@@ -127,15 +468,52 @@ def detect_boxes_from_pdf(
     if not pdf_p.exists():
         raise FileNotFoundError(pdf_path)
 
-    doc = fitz.open(str(pdf_p))
+    doc = open_document(str(pdf_p))
     if not (1 <= page_number <= len(doc)):
         raise ValueError(f"Page {page_number} out of range 1..{len(doc)}")
 
+    return _detect_boxes_on_page(
+        doc, pdf_p.name, page_number, dpi, color_classes, color_tolerance, coarse_dpi, max_raster_mb
+    )
+
+
+def detect_boxes_from_pdf_pages(
+    pdf_path: str,
+    pages: Optional[Iterable[int]] = None,
+    dpi: int = 150,
+    color_classes: Dict[str, Dict[str, str]] | None = None,
+    color_tolerance: int = 10,
+    coarse_dpi: Optional[int] = None,
+    max_raster_mb: Optional[float] = None,
+) -> Dict[int, Dict]:
+    """
+    :func:`detect_boxes_from_pdf` for several pages (1-based, ``None`` = all)
+    of one document, opened once. Returns ``{page_number: result}``.
+    """
+    pdf_p = Path(pdf_path)
+    if not pdf_p.exists():
+        raise FileNotFoundError(pdf_path)
+
+    doc = open_document(str(pdf_p))
+    return {
+        i + 1: _detect_boxes_on_page(
+            doc, pdf_p.name, i + 1, dpi, color_classes, color_tolerance, coarse_dpi, max_raster_mb
+        )
+        for i in select_page_indices(pages, len(doc))
+    }
+
+
+def _detect_boxes_on_page(
+    doc: "fitz.Document",
+    source_name: str,
+    page_number: int,
+    dpi: int,
+    color_classes: Dict[str, Dict[str, str]] | None,
+    color_tolerance: int,
+    coarse_dpi: Optional[int] = None,
+    max_raster_mb: Optional[float] = None,
+) -> Dict:
     page = doc.load_page(page_number - 1)
-    zoom = dpi / 72.0
-    mat = fitz.Matrix(zoom, zoom)
-    pix = page.get_pixmap(matrix=mat)
-    img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
 
     # Defaults (your annotated color set)
     default_color_classes = {
@@ -162,16 +540,35 @@ def detect_boxes_from_pdf(
     page_w = page.rect.width
     page_h = page.rect.height
 
+    # Detect all classes in one pass over the raster
+    palette = [_hex_to_rgb(info.get("hex", "#000000")) for info in color_classes.values()]
+    if coarse_dpi and coarse_dpi < dpi:
+        px_boxes_by_class, (raster_w, raster_h), _ = _detect_regions_coarse_to_fine(
+            page, palette, dpi, coarse_dpi, tol=color_tolerance
+        )
+    elif palette and exceeds_limit(page, dpi, LABEL_BYTES_PER_PIXEL, max_raster_mb):
+        key = tuple(palette)
+        regions = label_classes_banded(
+            page,
+            dpi,
+            lambda rgb: _class_index_image(_rgb_array(rgb), key, color_tolerance),
+            memory_limit_mb=max_raster_mb,
+            bytes_per_pixel=LABEL_BYTES_PER_PIXEL,
+        )
+        px_boxes_by_class = _boxes_by_class(regions, len(palette))
+        raster_w, raster_h = raster_size(page, dpi)
+    else:
+        img, pix = _render_rgb(page, dpi / 72.0)
+        raster_w, raster_h = pix.width, pix.height
+        px_boxes_by_class = _detect_regions_by_class(img, palette, tol=color_tolerance)
+
     def px_to_pdf(px_box):
         x0, y0, x1, y1 = px_box
-        fx = page_w / pix.width
-        fy = page_h / pix.height
+        fx = page_w / raster_w
+        fy = page_h / raster_h
         return [x0*fx, y0*fy, x1*fx, y1*fy]
 
-    # Detect by classes
-    for cls_name, color_info in color_classes.items():
-        rgb = _hex_to_rgb(color_info.get("hex", "#000000"))
-        px_boxes = _detect_regions_for_color(img, rgb, tol=color_tolerance)
+    for (cls_name, color_info), px_boxes in zip(color_classes.items(), px_boxes_by_class):
         pdf_boxes = [px_to_pdf(b) for b in px_boxes]
 
         if cls_name == "whole_sheet":
@@ -244,7 +641,7 @@ def detect_boxes_from_pdf(
 
     return {
         "metadata": {
-            "source_file": pdf_p.name,
+            "source_file": source_name,
             "version": "auto-1.0",
             "page_number": page_number,
             "notes": "Auto-generated via color-coded detection.",
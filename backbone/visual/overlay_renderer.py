@@ -0,0 +1,343 @@
+"""
+Debug overlay renderer shared by the visual pipeline tools.
+
+Draws rectangles (and optional labels) on rendered PDF pages and writes one
+PNG per page:
+
+    jobs = {3: [OverlayBox((x0, y0, x1, y1), "lime", 2), ...], ...}
+    render_overlays("test.pdf", jobs, "visual_debug", OverlayRenderConfig(dpi=150))
+
+Boxes are in PDF coordinates. Pages are rasterized at ``config.dpi``, and
+with ``clip_to_regions`` only the union of the page's boxes (plus a margin)
+is rasterized, which is much cheaper on large sheets with a few annotated
+regions.
+
+PNG encoding runs on a background writer thread, so page N is compressed
+while page N+1 renders. With ``workers > 1`` contiguous page ranges are
+fanned out to a process pool (PyMuPDF documents cannot be shared between
+threads); each worker opens its own document handle and runs its own
+writer thread.
+
+With ``max_raster_mb`` a page whose raster would exceed the ceiling is
+rendered, drawn and PNG-encoded in horizontal bands
+(:mod:`backbone.visual.tiled_raster`) and streamed to disk, so the whole
+image is never held in memory; the pixels are the same.
+"""
+
+from __future__ import annotations
+
+import os
+import queue
+import struct
+import threading
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backbone.intake.document_pool import open_document, reset_document_pool
+
+try:
+    import fitz  # PyMuPDF
+except Exception:  # pragma: no cover - import guard
+    fitz = None
+
+try:
+    from PIL import Image, ImageDraw
+except Exception:  # pragma: no cover - import guard
+    Image = None
+    ImageDraw = None
+
+
+BBox = Tuple[float, float, float, float]
+
+DEFAULT_FILENAME = "visual_page_{page}.png"
+
+# Banded pages: working set per pixel (rendered samples, PIL band, PNG
+# filter and scanline buffers), and blank rows drawn above each band so
+# boxes and labels overlapping it from above get the same non-negative
+# coordinates as on the whole image.
+BANDED_BYTES_PER_PIXEL = 12.0
+BAND_DRAW_MARGIN = 64
+
+
+class OverlayBox(NamedTuple):
+    bbox: BBox
+    # Anything PIL accepts as a color: "lime", (0, 249, 0), ...
+    color: Any
+    width: int = 3
+    label: Optional[str] = None
+
+
+@dataclass
+class OverlayRenderConfig:
+    dpi: int = 72
+    # Rasterize only the union of the page's boxes, grown by clip_margin
+    # (PDF units). Pages without boxes are rendered whole.
+    clip_to_regions: bool = False
+    clip_margin: float = 18.0
+    # > 1: render page ranges in a process pool.
+    workers: int = 1
+    # zlib level for the PNGs (PIL default: 6).
+    png_compress_level: int = 6
+    # Rendered pages waiting for the writer thread (bounds memory use).
+    writer_queue_size: int = 2
+    # Pages whose raster would exceed this (MB) are rendered in bands and
+    # streamed to disk instead (None = always whole pages).
+    max_raster_mb: Optional[float] = None
+    verbose: bool = True
+
+
+# ---------------------------------------------------------------------
+# Background PNG writer
+# ---------------------------------------------------------------------
+
+class _PngWriter:
+    """Single background thread saving PIL images as PNG, in submission order."""
+
+    def __init__(self, compress_level: int, queue_size: int, verbose: bool) -> None:
+        self.compress_level = compress_level
+        self.verbose = verbose
+        self._queue: "queue.Queue[Optional[Tuple[Any, str]]]" = queue.Queue(maxsize=max(1, queue_size))
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="overlay-png-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            img, path = item
+            if self._error is not None:
+                continue  # drain after a failure
+            try:
+                img.save(path, format="PNG", compress_level=self.compress_level)
+                if self.verbose:
+                    print(f">>> VIS-DEBUG: Saved {path}")
+            except BaseException as exc:  # pragma: no cover - surfaced in close()
+                self._error = exc
+
+    def submit(self, img: Any, path: str) -> None:
+        self._queue.put((img, path))
+
+    def close(self) -> None:
+        """Wait for every queued image; re-raise the first write error."""
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+
+class _StreamingPngWriter:
+    """RGB PNG written band by band ("Up" row filter); nothing page-sized is buffered."""
+
+    def __init__(self, path: str, width: int, height: int, compress_level: int) -> None:
+        self.width = width
+        self._file = open(path, "wb")
+        self._zip = zlib.compressobj(compress_level)
+        self._prev_row = np.zeros((1, width, 3), dtype=np.uint8)
+        self._file.write(b"\x89PNG\r\n\x1a\n")
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+
+    def _chunk(self, tag: bytes, data: bytes) -> None:
+        self._file.write(struct.pack(">I", len(data)) + tag + data)
+        self._file.write(struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF))
+
+    def write(self, rows: np.ndarray) -> None:
+        """Append (h, width, 3) uint8 rows."""
+        scanlines = np.empty((rows.shape[0], 1 + self.width * 3), dtype=np.uint8)
+        scanlines[:, 0] = 2  # filter type "Up": difference to the row above
+        np.subtract(rows, np.concatenate((self._prev_row, rows[:-1])), out=scanlines[:, 1:].reshape(rows.shape))
+        self._prev_row = rows[-1:].copy()
+        data = self._zip.compress(scanlines.tobytes())
+        if data:
+            self._chunk(b"IDAT", data)
+
+    def close(self) -> None:
+        try:
+            self._chunk(b"IDAT", self._zip.flush())
+            self._chunk(b"IEND", b"")
+        finally:
+            self._file.close()
+
+
+# ---------------------------------------------------------------------
+# Rendering
+# ---------------------------------------------------------------------
+
+def _clip_rect(page: Any, boxes: Sequence[OverlayBox], margin: float) -> Optional[Any]:
+    """Union of *boxes* grown by *margin*, within the page (None = whole page)."""
+    valid = [b.bbox for b in boxes if b.bbox and len(b.bbox) == 4]
+    if not valid:
+        return None
+    rect = fitz.Rect(
+        min(min(b[0], b[2]) for b in valid) - margin,
+        min(min(b[1], b[3]) for b in valid) - margin,
+        max(max(b[0], b[2]) for b in valid) + margin,
+        max(max(b[1], b[3]) for b in valid) + margin,
+    ) & page.rect
+    return None if rect.is_empty else rect
+
+
+def _render_page(doc: Any, page_number: int, boxes: Sequence[OverlayBox], config: OverlayRenderConfig) -> Any:
+    """PIL image of one page with its boxes drawn."""
+    page = doc[page_number - 1]
+    zoom = config.dpi / 72.0
+    clip = _clip_rect(page, boxes, config.clip_margin) if config.clip_to_regions else None
+
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=clip, alpha=False)
+    img = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+    draw = ImageDraw.Draw(img)
+
+    # PDF coords -> image coords (pix.x / pix.y: origin of a clipped pixmap)
+    _draw_boxes(draw, boxes, zoom, pix.x, pix.y)
+    return img
+
+
+def _draw_boxes(draw: Any, boxes: Sequence[OverlayBox], zoom: float, ox: float, oy: float) -> None:
+    """Draw *boxes* (PDF coords) on an image whose pixel (0, 0) is raster pixel (ox, oy)."""
+    for box in boxes:
+        if not box.bbox or len(box.bbox) != 4:
+            continue
+        x0, y0, x1, y1 = (v * zoom for v in box.bbox)
+        x0, x1 = x0 - ox, x1 - ox
+        y0, y1 = y0 - oy, y1 - oy
+        draw.rectangle([x0, y0, x1, y1], outline=box.color, width=box.width)
+        if box.label:
+            draw.text((x0 + 3, y0 + 3), box.label, fill=box.color)
+
+
+def _raster_region(page: Any, boxes: Sequence[OverlayBox], config: OverlayRenderConfig) -> Tuple[Tuple[int, int], Any]:
+    """(page raster size, pixel rect that :func:`_render_page` would render)."""
+    from backbone.visual.tiled_raster import raster_size
+
+    page_size = raster_size(page, config.dpi)
+    clip = _clip_rect(page, boxes, config.clip_margin) if config.clip_to_regions else None
+    if clip is None:
+        return page_size, fitz.IRect(0, 0, *page_size)
+    zoom = config.dpi / 72.0
+    return page_size, (clip * fitz.Matrix(zoom, zoom)).round() & fitz.IRect(0, 0, *page_size)
+
+
+def _needs_bands(page: Any, boxes: Sequence[OverlayBox], config: OverlayRenderConfig) -> bool:
+    # Banding (and its OpenCV-backed helpers) is only loaded once a ceiling
+    # is set, so plain overlays keep working without cv2.
+    if not config.max_raster_mb:
+        return False
+    _, region = _raster_region(page, boxes, config)
+    return region.width * region.height * BANDED_BYTES_PER_PIXEL > config.max_raster_mb * 2**20
+
+
+def _render_page_banded(
+    doc: Any,
+    page_number: int,
+    boxes: Sequence[OverlayBox],
+    config: OverlayRenderConfig,
+    out_path: str,
+) -> None:
+    """:func:`_render_page` + PNG save, one horizontal band at a time."""
+    from backbone.visual.tiled_raster import Band, plan_bands, render_band
+
+    page = doc[page_number - 1]
+    zoom = config.dpi / 72.0
+    page_size, region = _raster_region(page, boxes, config)
+
+    display_list = page.get_displaylist()
+    writer = _StreamingPngWriter(out_path, region.width, region.height, config.png_compress_level)
+    try:
+        for rel in plan_bands(region.width, region.height, BANDED_BYTES_PER_PIXEL, config.max_raster_mb):
+            band = Band(rel.y0 + region.y0, rel.y1 + region.y0, rel.top + region.y0, rel.bottom + region.y0)
+            rows = render_band(display_list, zoom, band, page_size, (region.x0, region.x1))
+
+            canvas = Image.new("RGB", (region.width, BAND_DRAW_MARGIN + rows.shape[0]))
+            canvas.paste(Image.frombytes("RGB", (region.width, rows.shape[0]), rows.tobytes()), (0, BAND_DRAW_MARGIN))
+            _draw_boxes(ImageDraw.Draw(canvas), boxes, zoom, region.x0, band.top - BAND_DRAW_MARGIN)
+            writer.write(np.asarray(canvas)[BAND_DRAW_MARGIN:])
+    finally:
+        writer.close()
+    if config.verbose:
+        print(f">>> VIS-DEBUG: Saved {out_path} (banded)")
+
+
+def _render_range(
+    pdf_path: str,
+    jobs: List[Tuple[int, List[OverlayBox], str]],
+    config: OverlayRenderConfig,
+) -> List[str]:
+    """Render *jobs* (page_number, boxes, out_path) in order; returns the written paths."""
+    doc = open_document(pdf_path)
+    writer = _PngWriter(config.png_compress_level, config.writer_queue_size, config.verbose)
+    written: List[str] = []
+    try:
+        for page_number, boxes, out_path in jobs:
+            if config.verbose:
+                print(f">>> VIS-DEBUG: Rendering page {page_number}")
+            if _needs_bands(doc[page_number - 1], boxes, config):
+                _render_page_banded(doc, page_number, boxes, config, out_path)
+            else:
+                writer.submit(_render_page(doc, page_number, boxes, config), out_path)
+            written.append(out_path)
+    finally:
+        writer.close()
+    return written
+
+
+def render_overlays(
+    pdf_path: str,
+    pages: Dict[int, Sequence[OverlayBox]],
+    output_dir: str,
+    config: Optional[OverlayRenderConfig] = None,
+    filename: str = DEFAULT_FILENAME,
+) -> List[str]:
+    """
+    Draw *pages* (1-based page number -> boxes) onto *pdf_path* and write
+    ``output_dir/filename.format(page=N)`` for each page in the document.
+
+    Returns the written paths in page order.
+    """
+    config = config or OverlayRenderConfig()
+    if fitz is None or Image is None or ImageDraw is None:
+        print(">>> VIS-DEBUG: Overlays disabled (PyMuPDF / Pillow not available).")
+        return []
+
+    os.makedirs(output_dir, exist_ok=True)
+    n_pages = len(open_document(pdf_path))
+    jobs = [
+        (int(page_number), list(boxes), os.path.join(output_dir, filename.format(page=int(page_number))))
+        for page_number, boxes in sorted(pages.items())
+        if 1 <= int(page_number) <= n_pages
+    ]
+    if not jobs:
+        return []
+
+    workers = min(max(1, int(config.workers or 1)), len(jobs))
+    if workers == 1:
+        return _render_range(pdf_path, jobs, config)
+
+    # Contiguous ranges, a couple per worker so uneven pages balance out.
+    n_ranges = min(len(jobs), workers * 2)
+    step = -(-len(jobs) // n_ranges)
+    ranges = [jobs[start:start + step] for start in range(0, len(jobs), step)]
+
+    written: List[str] = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [pool.submit(_render_range, pdf_path, r, config) for r in ranges]
+        for fut in futures:
+            written.extend(fut.result())
+    return written
+
+
+def _init_worker() -> None:
+    # Forked workers inherit the parent's pooled handles; open their own.
+    reset_document_pool()
+
+
+__all__ = [
+    "DEFAULT_FILENAME",
+    "OverlayBox",
+    "OverlayRenderConfig",
+    "render_overlays",
+]
@@ -0,0 +1,405 @@
+"""
+Banded, bounded-memory page rasterization for large sheets.
+
+A 36x48 in sheet at 200 DPI is 7200x9600 px, about 200 MB as RGB, before
+any grayscale copy, edge map or label image. The helpers here render a page
+as full-width horizontal bands (overlapping by a *halo* where a filter needs
+neighbouring rows), sized so that the band's working set stays under a
+memory ceiling, and merge the per-band results across the seams exactly:
+
+    for band, rgb in iter_bands(page, dpi=200, bytes_per_pixel=24, memory_limit_mb=128):
+        ...                                   # rgb covers rows band.top..band.bottom
+
+    rows = label_classes_banded(page, 200, classify, memory_limit_mb=128)
+    edges = canny_banded(page, 200, smooth, 50, 150, memory_limit_mb=128)
+
+``label_classes_banded`` returns the same connected components (same
+class, 4-connected) as labelling the whole raster, and ``canny_banded`` the
+same map as ``cv2.Canny`` on the whole image: components and edge chains
+crossing a seam are joined with a union-find over the seam rows.
+
+*bytes_per_pixel* is the caller's estimate of its per-pixel working set
+(raster + temporaries); a band is never smaller than one core row plus its
+halos, so very low ceilings are approximate.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+import cv2
+import fitz  # PyMuPDF
+import numpy as np
+
+
+DEFAULT_MEMORY_LIMIT_MB = 256.0
+
+# Rows of context a band needs for a 5x5 blur + Canny (Sobel and
+# non-maximum suppression): 2 + 1 + 1, rounded up.
+CANNY_HALO = 8
+
+
+class Band(NamedTuple):
+    y0: int      # first core row (page raster coordinates)
+    y1: int      # end of the core rows (exclusive)
+    top: int     # first rendered row (y0 minus the halo, clipped to the page)
+    bottom: int  # end of the rendered rows
+
+
+# ---------------------------------------------------------------------
+# Planning / rendering
+# ---------------------------------------------------------------------
+
+def raster_size(page: "fitz.Page", dpi: int) -> Tuple[int, int]:
+    """(width, height) in pixels of ``page.get_pixmap`` at *dpi*."""
+    zoom = dpi / 72.0
+    irect = (page.rect * fitz.Matrix(zoom, zoom)).round()
+    return irect.width, irect.height
+
+
+def raster_bytes(page: "fitz.Page", dpi: int, bytes_per_pixel: float) -> float:
+    """Estimated working set of processing *page* at *dpi* in one piece."""
+    width, height = raster_size(page, dpi)
+    return float(width) * height * bytes_per_pixel
+
+
+def exceeds_limit(page: "fitz.Page", dpi: int, bytes_per_pixel: float, memory_limit_mb: Optional[float]) -> bool:
+    """True when a memory ceiling is set and a whole-page raster would exceed it."""
+    return bool(memory_limit_mb) and raster_bytes(page, dpi, bytes_per_pixel) > memory_limit_mb * 2**20
+
+
+def plan_bands(
+    width: int,
+    height: int,
+    bytes_per_pixel: float,
+    memory_limit_mb: float = DEFAULT_MEMORY_LIMIT_MB,
+    halo: int = 0,
+) -> List[Band]:
+    """Split *height* rows into bands whose rendered rows fit the ceiling."""
+    budget_rows = int(memory_limit_mb * 2**20 // max(1.0, width * bytes_per_pixel))
+    core = max(1, budget_rows - 2 * halo)
+    return [
+        Band(y0, min(height, y0 + core), max(0, y0 - halo), min(height, y0 + core + halo))
+        for y0 in range(0, height, core)
+    ]
+
+
+def render_band(
+    source: Union["fitz.Page", "fitz.DisplayList"],
+    zoom: float,
+    band: Band,
+    page_size: Tuple[int, int],
+    columns: Optional[Tuple[int, int]] = None,
+) -> np.ndarray:
+    """
+    Pixels of rows ``band.top .. band.bottom`` (and *columns* x0..x1, default
+    the full width) of the page raster of size *page_size*, identical to the
+    same pixels of a whole-page render.
+    """
+    width, height = page_size
+    x0, x1 = columns or (0, width)
+    # One extra pixel each side absorbs rounding of the clip rectangle.
+    top, bottom = max(0, band.top - 1), min(height, band.bottom + 1)
+    left, right = max(0, x0 - 1), min(width, x1 + 1)
+    clip = fitz.Rect(left / zoom, top / zoom, right / zoom, bottom / zoom)
+    pix = source.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=clip, alpha=False)
+    if pix.x > x0 or pix.x + pix.width < x1 or pix.y > band.top or pix.y + pix.height < band.bottom:
+        raise RuntimeError(
+            f"Band render {tuple(pix.irect)} does not cover {(x0, band.top, x1, band.bottom)}"
+        )
+    img = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+    img = img[band.top - pix.y:band.bottom - pix.y, x0 - pix.x:x1 - pix.x]
+    return img if img.flags.c_contiguous else np.ascontiguousarray(img)
+
+
+def iter_bands(
+    page: "fitz.Page",
+    dpi: int,
+    bytes_per_pixel: float,
+    memory_limit_mb: float = DEFAULT_MEMORY_LIMIT_MB,
+    halo: int = 0,
+) -> Iterator[Tuple[Band, np.ndarray]]:
+    """Render *page* band by band (page content interpreted once, as a display list)."""
+    zoom = dpi / 72.0
+    width, height = raster_size(page, dpi)
+    display_list = page.get_displaylist()
+    for band in plan_bands(width, height, bytes_per_pixel, memory_limit_mb, halo):
+        yield band, render_band(display_list, zoom, band, (width, height))
+
+
+# ---------------------------------------------------------------------
+# Union-find over seam rows
+# ---------------------------------------------------------------------
+
+class _UnionFind:
+    def __init__(self) -> None:
+        self.parent: List[int] = []
+
+    def add(self, n: int) -> None:
+        self.parent.extend(range(len(self.parent), len(self.parent) + n))
+
+    def find(self, i: int) -> int:
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union_pairs(self, a: np.ndarray, b: np.ndarray) -> None:
+        if a.size == 0:
+            return
+        for i, j in np.unique(np.stack((a, b), axis=1), axis=0).tolist():
+            ri, rj = self.find(i), self.find(j)
+            if ri != rj:
+                # Smaller id wins: keeps roots in the earliest band.
+                self.parent[max(ri, rj)] = min(ri, rj)
+
+    def roots(self) -> np.ndarray:
+        """Root of every element (pointer jumping until the array is stable)."""
+        roots = np.array(self.parent, dtype=np.int64)
+        while True:
+            jumped = roots[roots]
+            if np.array_equal(jumped, roots):
+                return roots
+            roots = jumped
+
+
+# ---------------------------------------------------------------------
+# Same-class connected components
+# ---------------------------------------------------------------------
+
+def _label_components(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    4-connected components of a non-zero *mask*: (labels, stats, first) with
+    label 0 (background) removed from *stats*, and *first* the flat index of
+    each component's first pixel in raster order.
+    """
+    n, labels, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=4)
+    flat = labels.ravel()
+    nz = np.flatnonzero(flat)
+    found, idx = np.unique(flat[nz], return_index=True)
+    first = np.empty(n - 1, dtype=np.int64)
+    first[found - 1] = nz[idx]
+    return labels, stats[1:], first
+
+
+def same_class_components(classes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    4-connected components of equal non-zero values in *classes* (uint8).
+
+    Returns ``(labels, rows)``: an int32 label image (0 = background) and
+    one row per label ``label - 1``:
+    ``(class, y0, x0, y1, x1, first_y, first_x)`` with exclusive y1 / x1 and
+    the component's first pixel in raster order. All classes are labelled
+    in one pass; only components where two classes touch are split again.
+    Rows of split components keep class 0 and have no pixels left.
+    """
+    labels, stats, first = _label_components(classes)
+    n = stats.shape[0] + 1
+    w = classes.shape[1]
+
+    # Class of each component, or 0 when it mixes classes.
+    flat = labels.ravel()
+    flat_cls = classes.ravel()
+    nz = np.flatnonzero(flat_cls)
+    comp_cls = flat_cls[first].astype(np.int64)
+    mixed = np.zeros(n, dtype=bool)
+    mixed[flat[nz][flat_cls[nz] != comp_cls[flat[nz] - 1]]] = True
+    comp_cls[mixed[1:]] = 0
+
+    rows = [
+        np.column_stack((
+            comp_cls,
+            stats[:, cv2.CC_STAT_TOP],
+            stats[:, cv2.CC_STAT_LEFT],
+            stats[:, cv2.CC_STAT_TOP] + stats[:, cv2.CC_STAT_HEIGHT],
+            stats[:, cv2.CC_STAT_LEFT] + stats[:, cv2.CC_STAT_WIDTH],
+            first // w,
+            first % w,
+        ))
+    ]
+    next_label = n
+    for i in np.flatnonzero(mixed[1:]).tolist():
+        x, y, bw, bh = stats[i, :4].tolist()
+        window = labels[y:y + bh, x:x + bw]
+        inside = window == i + 1
+        sub_cls = np.where(inside, classes[y:y + bh, x:x + bw], 0)
+        for k in np.unique(sub_cls[inside]).tolist():
+            sub_labels, sub_stats, sub_first = _label_components((sub_cls == k).view(np.uint8))
+            m = sub_stats.shape[0] + 1
+            rows.append(np.column_stack((
+                np.full(m - 1, k, dtype=np.int64),
+                sub_stats[:, cv2.CC_STAT_TOP] + y,
+                sub_stats[:, cv2.CC_STAT_LEFT] + x,
+                sub_stats[:, cv2.CC_STAT_TOP] + sub_stats[:, cv2.CC_STAT_HEIGHT] + y,
+                sub_stats[:, cv2.CC_STAT_LEFT] + sub_stats[:, cv2.CC_STAT_WIDTH] + x,
+                sub_first // bw + y,
+                sub_first % bw + x,
+            )))
+            sub_mask = sub_labels > 0
+            window[sub_mask] = sub_labels[sub_mask] + (next_label - 1)
+            next_label += m - 1
+
+    return labels, np.concatenate(rows)
+
+
+def label_classes_banded(
+    page: "fitz.Page",
+    dpi: int,
+    classify: Callable[[np.ndarray], np.ndarray],
+    memory_limit_mb: float = DEFAULT_MEMORY_LIMIT_MB,
+    bytes_per_pixel: float = 24.0,
+) -> np.ndarray:
+    """
+    :func:`same_class_components` rows for the whole *dpi* raster of *page*,
+    computed band by band. *classify* maps a band's (h, w, n) pixels to an
+    (h, w) uint8 class image (0 = none); it must be per-pixel.
+
+    Components split by a seam are merged (union-find on vertically
+    adjacent seam pixels of the same class), so the rows, and their order,
+    equal those of labelling the whole raster.
+    """
+    width, _ = raster_size(page, dpi)
+    uf = _UnionFind()
+    parts: List[np.ndarray] = []
+    prev: Optional[Tuple[np.ndarray, np.ndarray, int]] = None  # (labels, classes) of the last row, id offset
+
+    for band, img in iter_bands(page, dpi, bytes_per_pixel, memory_limit_mb):
+        classes = classify(img)
+        labels, rows = same_class_components(classes)
+        rows[:, [1, 3, 5]] += band.y0
+        offset = len(uf.parent)
+        uf.add(len(rows))
+        parts.append(rows)
+
+        if prev is not None:
+            prev_labels, prev_classes, prev_offset = prev
+            joined = (prev_classes == classes[0]) & (prev_classes > 0)
+            uf.union_pairs(
+                prev_labels[joined].astype(np.int64) + prev_offset - 1,
+                labels[0][joined].astype(np.int64) + offset - 1,
+            )
+        prev = (labels[-1].copy(), classes[-1].copy(), offset)
+        del img, classes, labels
+
+    if not parts:
+        return np.empty((0, 7), dtype=np.int64)
+
+    rows = np.concatenate(parts)
+    roots = uf.roots()
+    merged = rows[roots == np.arange(len(rows))].copy()
+    # Fold every component into its root: union of boxes, earliest first pixel.
+    slot = np.full(len(rows), -1, dtype=np.int64)
+    slot[roots == np.arange(len(rows))] = np.arange(len(merged))
+    target = slot[roots]
+    np.minimum.at(merged[:, 1], target, rows[:, 1])
+    np.minimum.at(merged[:, 2], target, rows[:, 2])
+    np.maximum.at(merged[:, 3], target, rows[:, 3])
+    np.maximum.at(merged[:, 4], target, rows[:, 4])
+    first = np.full(len(merged), np.iinfo(np.int64).max, dtype=np.int64)
+    np.minimum.at(first, target, rows[:, 5] * width + rows[:, 6])
+    merged[:, 5], merged[:, 6] = first // width, first % width
+    return merged
+
+
+# ---------------------------------------------------------------------
+# Canny edge map
+# ---------------------------------------------------------------------
+
+def canny_banded(
+    page: "fitz.Page",
+    dpi: int,
+    smooth: Callable[[np.ndarray], np.ndarray],
+    threshold1: float,
+    threshold2: float,
+    memory_limit_mb: float = DEFAULT_MEMORY_LIMIT_MB,
+    bytes_per_pixel: float = 16.0,
+    halo: int = CANNY_HALO,
+) -> np.ndarray:
+    """
+    ``cv2.Canny(smooth(page raster), threshold1, threshold2)`` for the
+    whole *dpi* raster of *page*, computed band by band. Only the resulting
+    1-byte edge map is page-sized.
+
+    *smooth* maps a band's (h, w, n) pixels to the single-channel image
+    Canny runs on (e.g. grayscale + 5x5 blur); *halo* rows of context must
+    cover its footprint plus the 2 rows Canny needs.
+
+    Canny's hysteresis is not local: an edge pixel between the thresholds
+    is kept if it is 8-connected to one above *threshold2* through other
+    such pixels, anywhere on the page. Each band therefore yields the
+    candidate map (Canny with both thresholds at *threshold1*) and the
+    strong map (both at *threshold2*); candidate chains are joined across
+    seams with a union-find, and a second pass over the stored map drops
+    chains without a strong pixel.
+    """
+    low, high = sorted((threshold1, threshold2))
+    width, height = raster_size(page, dpi)
+    edges = np.zeros((height, width), dtype=np.uint8)
+    bands: List[Band] = []
+
+    uf = _UnionFind()
+    strong: List[np.ndarray] = []
+    prev: Optional[Tuple[np.ndarray, int]] = None
+
+    for band, img in iter_bands(page, dpi, bytes_per_pixel, memory_limit_mb, halo):
+        smoothed = smooth(img)
+        core = slice(band.y0 - band.top, band.y1 - band.top)
+        candidates = cv2.Canny(smoothed, low, low)[core]
+        above = cv2.Canny(smoothed, high, high)[core]
+        del img, smoothed
+
+        edges[band.y0:band.y1] = candidates
+        bands.append(band)
+        n, labels = cv2.connectedComponents(candidates, connectivity=8, ltype=cv2.CV_32S)
+        offset = len(uf.parent)
+        uf.add(n - 1)
+        has_strong = np.zeros(n, dtype=bool)
+        has_strong[labels[above > 0]] = True
+        strong.append(has_strong[1:])
+
+        if prev is not None:
+            prev_labels, prev_offset = prev
+            for dx in (-1, 0, 1):
+                a = prev_labels[max(0, -dx):width - max(0, dx)]
+                b = labels[0][max(0, dx):width - max(0, -dx)]
+                joined = (a > 0) & (b > 0)
+                uf.union_pairs(
+                    a[joined].astype(np.int64) + prev_offset - 1,
+                    b[joined].astype(np.int64) + offset - 1,
+                )
+        prev = (labels[-1].copy(), offset)
+
+    if not bands:
+        return edges
+
+    roots = uf.roots()
+    keep = np.zeros(len(roots), dtype=bool)
+    np.logical_or.at(keep, roots, np.concatenate(strong))
+    keep = keep[roots]
+
+    # Second pass: relabelling the stored rows reproduces pass-one labels.
+    offset = 0
+    for band in bands:
+        rows = edges[band.y0:band.y1]
+        n, labels = cv2.connectedComponents(rows, connectivity=8, ltype=cv2.CV_32S)
+        band_keep = np.concatenate(([False], keep[offset:offset + n - 1]))
+        rows[~band_keep[labels]] = 0
+        offset += n - 1
+    return edges
+
+
+__all__ = [
+    "DEFAULT_MEMORY_LIMIT_MB",
+    "CANNY_HALO",
+    "Band",
+    "raster_size",
+    "raster_bytes",
+    "exceeds_limit",
+    "plan_bands",
+    "render_band",
+    "iter_bands",
+    "same_class_components",
+    "label_classes_banded",
+    "canny_banded",
+]
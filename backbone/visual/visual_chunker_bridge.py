@@ -12,11 +12,17 @@ A chunk may receive the following metadata keys:
     - visual_column_id    : ID of the column region (if applicable)
     - visual_column_index : 1‑based index of the column
     - visual_confidence   : float in [0, 1] indicating alignment confidence
+
+Regions are matched through a per-page :class:`RegionIndex` (uniform grid
+over the region boxes), so a chunk is only tested against the regions
+sharing its grid cells instead of every region on the page.
 """
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional, Tuple
+import heapq
+import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from backbone.chunking.chunk import Chunk
 
@@ -24,6 +30,21 @@ BBox = Tuple[float, float, float, float]
 
 INTERSECT_PAD = 4.0
 
+# Grid cell size of RegionIndex (PDF units), and the most cells one box may
+# cover before it is kept in a list checked on every query instead.
+GRID_CELL = 64.0
+MAX_BOX_CELLS = 4096
+
+# Region classes in match priority order (first class wins).
+REGION_CLASSES: Tuple[Tuple[str, str], ...] = (
+    ("note", "notes"),
+    ("column", "columns"),
+    ("legend", "legend"),
+    ("sheet_info", "sheet_info"),
+    ("special_note", "special_note"),
+    ("xenoglyph", "xenoglyph"),
+)
+
 
 def _point_inside(px: float, py: float, box: BBox) -> bool:
     x0, y0, x1, y1 = box
@@ -47,6 +68,103 @@ def _boxes_intersect(a: BBox, b: BBox, pad: float = INTERSECT_PAD) -> bool:
     return True
 
 
+class RegionIndex:
+    """
+    Uniform-grid spatial index over a page's visual regions.
+
+    *regions* is a list of ``(class_name, region)`` pairs in priority order.
+    Queries return the first region in that order that matches, exactly as
+    a linear scan with :func:`_point_inside` / :func:`_boxes_intersect`
+    would, but only test the regions registered in the query's grid cells.
+    """
+
+    def __init__(
+        self,
+        regions: List[Tuple[str, Dict[str, Any]]],
+        cell: float = GRID_CELL,
+    ) -> None:
+        self.regions = regions
+        self.cell = float(cell)
+        self._bboxes: List[Any] = []
+        self._grid: Dict[Tuple[int, int], List[int]] = {}
+        # Regions too large (or too odd) to bucket; checked on every query.
+        self._wide: List[int] = []
+
+        for rank, (_, reg) in enumerate(regions):
+            bbox = reg.get("bbox")
+            self._bboxes.append(bbox)
+            if not bbox:
+                continue
+            cells = self._cell_range(bbox, 0.0)
+            if cells is None:
+                self._wide.append(rank)
+                continue
+            ix0, iy0, ix1, iy1 = cells
+            for ix in range(ix0, ix1 + 1):
+                for iy in range(iy0, iy1 + 1):
+                    # Ranks are appended in priority order, so every cell
+                    # list stays sorted.
+                    self._grid.setdefault((ix, iy), []).append(rank)
+
+    # ------------------------------------------------------------------
+    def _cell_range(self, bbox: Any, pad: float) -> Optional[Tuple[int, int, int, int]]:
+        """Inclusive cell range covered by *bbox* grown by *pad*, or None if too large."""
+        try:
+            x0, y0, x1, y1 = (float(v) for v in bbox)
+        except (TypeError, ValueError):
+            return None
+        lo_x, hi_x = min(x0, x1) - pad, max(x0, x1) + pad
+        lo_y, hi_y = min(y0, y1) - pad, max(y0, y1) + pad
+        if not all(math.isfinite(v) for v in (lo_x, hi_x, lo_y, hi_y)):
+            return None
+        ix0, ix1 = math.floor(lo_x / self.cell), math.floor(hi_x / self.cell)
+        iy0, iy1 = math.floor(lo_y / self.cell), math.floor(hi_y / self.cell)
+        if (ix1 - ix0 + 1) * (iy1 - iy0 + 1) > MAX_BOX_CELLS:
+            return None
+        return ix0, iy0, ix1, iy1
+
+    def _ordered(self, ranks: Iterable[int]) -> Iterable[int]:
+        """Candidate ranks (sorted) merged with the wide regions, in priority order."""
+        if not self._wide:
+            return ranks
+        return heapq.merge(ranks, self._wide)
+
+    # ------------------------------------------------------------------
+    def first_containing(self, px: float, py: float) -> Optional[int]:
+        """Rank of the first region whose box contains the point."""
+        try:
+            key = (math.floor(px / self.cell), math.floor(py / self.cell))
+        except (ValueError, OverflowError):  # NaN / inf centre
+            candidates: Iterable[int] = range(len(self.regions))
+        else:
+            candidates = self._ordered(self._grid.get(key, ()))
+
+        for rank in candidates:
+            region_bbox = self._bboxes[rank]
+            if region_bbox and _point_inside(px, py, region_bbox):
+                return rank
+        return None
+
+    def first_intersecting(self, bbox: BBox, pad: float = INTERSECT_PAD) -> Optional[int]:
+        """Rank of the first region whose box intersects *bbox* grown by *pad*."""
+        cells = self._cell_range(bbox, pad)
+        if cells is None:
+            candidates: Iterable[int] = range(len(self.regions))
+        else:
+            ix0, iy0, ix1, iy1 = cells
+            found = set()
+            for ix in range(ix0, ix1 + 1):
+                for iy in range(iy0, iy1 + 1):
+                    found.update(self._grid.get((ix, iy), ()))
+            candidates = self._ordered(sorted(found))
+
+        for rank in candidates:
+            region_bbox = self._bboxes[rank]
+            if region_bbox and _boxes_intersect(bbox, region_bbox, pad):
+                return rank
+        return None
+
+
 class VisualChunkerBridge:
     """Attach visual metadata to a page's chunks."""
 
@@ -85,21 +203,13 @@ class VisualChunkerBridge:
         if not chunks or not visual_page:
             return
 
-        notes = visual_page.get("notes") or []
-        columns = visual_page.get("columns") or []
-        legends = visual_page.get("legend") or []
-        infos = visual_page.get("sheet_info") or []
-        specials = visual_page.get("special_note") or []
-        xenos = visual_page.get("xenoglyph") or []
-
-        all_regions = {
-            "note": notes,
-            "column": columns,
-            "legend": legends,
-            "sheet_info": infos,
-            "special_note": specials,
-            "xenoglyph": xenos,
-        }
+        # (class, region) pairs in priority order
+        regions = [
+            (cls_name, reg)
+            for cls_name, page_key in REGION_CLASSES
+            for reg in visual_page.get(page_key) or []
+        ]
+        index = RegionIndex(regions)
 
         for ch in chunks:
             if not ch.bbox:
@@ -112,27 +222,12 @@ class VisualChunkerBridge:
             best_class: Optional[str] = None
 
             # 1. Primary: center point inside a region
-            for cls_name, region_list in all_regions.items():
-                for reg in region_list:
-                    bbox = reg.get("bbox")
-                    if bbox and _point_inside(cx, cy, bbox):
-                        best_match = reg
-                        best_class = cls_name
-                        break
-                if best_match:
-                    break
-
             # 2. Fallback: bbox intersection
-            if not best_match:
-                for cls_name, region_list in all_regions.items():
-                    for reg in region_list:
-                        bbox = reg.get("bbox")
-                        if bbox and _boxes_intersect(ch.bbox, bbox):
-                            best_match = reg
-                            best_class = cls_name
-                            break
-                    if best_match:
-                        break
+            rank = index.first_containing(cx, cy)
+            if rank is None:
+                rank = index.first_intersecting(ch.bbox)
+            if rank is not None:
+                best_class, best_match = regions[rank]
 
             # 3. Attach metadata
             if best_match:
@@ -24,6 +24,18 @@ Scoring Model:
 from typing import Dict, Any, Optional
 import math
 
+from backbone.chunking.note_structure import (
+    KIND_LETTER,
+    KIND_NUMBER,
+    KIND_PAREN,
+    classify_line,
+)
+
+# Markers that count as a bullet (label of "N.", "(N)", "L.")
+_BULLET_NUMBERS = frozenset(str(i) for i in range(1, 11))
+_BULLET_PARENS = frozenset(str(i) for i in range(1, 8))
+_BULLET_LETTERS = frozenset("ABCDEFG")
+
 # ---------------------------------------------------------------------------
 # Helper scoring functions
 # ---------------------------------------------------------------------------
@@ -43,20 +55,17 @@ def score_text_presence(text: Optional[str]) -> float:
 
 
 def score_bullet_pattern(text: Optional[str]) -> float:
-    """Return 1.0 if text starts with a bullet pattern."""
+    """Return 1.0 if text starts with a bullet pattern ("1."-"10.", "(1)"-"(7)", "A."-"G.")."""
     if not text:
         return 0.0
 
-    bullets = (
-        "1.","2.","3.","4.","5.","6.","7.","8.","9.","10.",
-        "(1)","(2)","(3)","(4)","(5)","(6)","(7)",
-        "A.","B.","C.","D.","E.","F.","G."
-    )
-
-    t = text.strip()
-    for b in bullets:
-        if t.startswith(b):
-            return 1.0
+    role = classify_line(text)
+    if role.kind == KIND_NUMBER and role.sep == ".":
+        return 1.0 if role.label in _BULLET_NUMBERS else 0.0
+    if role.kind == KIND_PAREN:
+        return 1.0 if role.label in _BULLET_PARENS else 0.0
+    if role.kind == KIND_LETTER and role.sep == ".":
+        return 1.0 if role.label in _BULLET_LETTERS else 0.0
     return 0.0
 
 
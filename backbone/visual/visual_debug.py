@@ -6,11 +6,11 @@ Draws color-coded bounding boxes from the visual schema onto rendered PDF
 pages, saving PNGs for manual inspection.
 """
 
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 
-import fitz  # PyMuPDF
-from PIL import Image, ImageDraw
+from backbone.intake.document_pool import open_document
+from backbone.visual.overlay_renderer import OverlayBox, OverlayRenderConfig, render_overlays
 
 
 def _hex_to_rgb(h: str) -> Tuple[int, int, int]:
@@ -23,9 +23,16 @@ def draw_visual_debug_images(
     schema: Dict,
     output_dir: str,
     dpi: int = 150,
+    workers: int = 1,
+    clip_to_regions: bool = False,
+    max_raster_mb: Optional[float] = None,
 ) -> None:
     """Generate debug PNGs with all labeled boxes drawn.
 
+    Rendering goes through :func:`backbone.visual.overlay_renderer.render_overlays`
+    (*workers* > 1: process pool; *clip_to_regions*: rasterize only the
+    labeled area of each page; *max_raster_mb*: draw larger pages in bands).
+
     Expects schema with keys:
         - color_classes
         - page_structure: {
@@ -78,42 +85,41 @@ def draw_visual_debug_images(
     legend_by_page = group_by_page(legend_boxes)
     xeno_by_page   = group_by_page(xenoglyphs)
 
-    doc = fitz.open(str(pdf_p))
-    zoom = dpi / 72.0
+    n_pages = len(open_document(str(pdf_p)))
+    jobs: Dict[int, List[OverlayBox]] = {}
 
-    for page_index, page in enumerate(doc, start=1):
-        print(f">>> VIS-DEBUG: Rendering page {page_index}")
-        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
-        img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-        draw = ImageDraw.Draw(img)
+    for page_index in range(1, n_pages + 1):
+        boxes: List[OverlayBox] = []
 
-        def draw_boxes(entries, rgb, label: str):
+        def add_boxes(entries, rgb, label: str):
             for e in entries:
                 bbox = e.get("bbox")
                 if not bbox or len(bbox) != 4:
                     continue
-                x0, y0, x1, y1 = bbox
-                # PDF coords -> image coords
-                x0 *= zoom
-                y0 *= zoom
-                x1 *= zoom
-                y1 *= zoom
-                draw.rectangle([x0, y0, x1, y1], outline=rgb, width=3)
-                draw.text((x0 + 3, y0 + 3), label, fill=rgb)
+                boxes.append(OverlayBox(tuple(bbox), rgb, 3, label))
 
         # whole sheet & sheet info are optional single boxes
         if whole_sheet and whole_sheet.get("page_number", 1) == page_index:
-            draw_boxes([whole_sheet], class_colors["whole_sheet"], "WHOLE")
+            add_boxes([whole_sheet], class_colors["whole_sheet"], "WHOLE")
 
         if sheet_info and sheet_info.get("page_number", 1) == page_index:
-            draw_boxes([sheet_info], class_colors["sheet_info"], "SHEET_INFO")
-
-        draw_boxes(col_by_page.get(page_index, []),    class_colors["column"],        "COL")
-        draw_boxes(hdr_by_page.get(page_index, []),    class_colors["column_header"], "HDR")
-        draw_boxes(note_by_page.get(page_index, []),   class_colors["note"],          "NOTE")
-        draw_boxes(legend_by_page.get(page_index, []), class_colors["legend"],        "LEGEND")
-        draw_boxes(xeno_by_page.get(page_index, []),   class_colors["xenoglyph"],     "XENO")
-
-        out_path = out_dir / f"visual_page_{page_index}.png"
-        img.save(str(out_path))
-        print(f">>> VIS-DEBUG: Saved {out_path}")
+            add_boxes([sheet_info], class_colors["sheet_info"], "SHEET_INFO")
+
+        add_boxes(col_by_page.get(page_index, []),    class_colors["column"],        "COL")
+        add_boxes(hdr_by_page.get(page_index, []),    class_colors["column_header"], "HDR")
+        add_boxes(note_by_page.get(page_index, []),   class_colors["note"],          "NOTE")
+        add_boxes(legend_by_page.get(page_index, []), class_colors["legend"],        "LEGEND")
+        add_boxes(xeno_by_page.get(page_index, []),   class_colors["xenoglyph"],     "XENO")
+        jobs[page_index] = boxes
+
+    render_overlays(
+        str(pdf_p),
+        jobs,
+        str(out_dir),
+        OverlayRenderConfig(
+            dpi=dpi,
+            clip_to_regions=clip_to_regions,
+            workers=workers,
+            max_raster_mb=max_raster_mb,
+        ),
+    )
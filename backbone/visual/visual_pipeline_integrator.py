@@ -51,16 +51,30 @@ result = {
     },
     "fused_notes": [list of all note dicts across pages]
 }
+
+The annotation and schema JSON are parsed once per process (memoized by
+file stat), and the converted result is cached in memory keyed by their
+content hashes, the selected pages' PDF sizes and the scoring option, so
+repeated runs return a fresh copy without re-aligning anything.
 """
 
 from __future__ import annotations
 
+import copy
+import hashlib
 import json
 import os
+import pickle
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from backbone.intake.document_pool import document_key, open_document
 
 from .visual_alignment import VisualAlignment  # NEW: alignment layer
+from .overlay_renderer import OverlayBox, OverlayRenderConfig, render_overlays
+from .visual_chunker_bridge import RegionIndex
 
 try:
     import fitz  # PyMuPDF
@@ -76,6 +90,61 @@ except Exception:  # pragma: no cover - import guard
 
 BBox = Tuple[float, float, float, float]
 
+# Converted results kept in memory (pickled, so every hit hands out fresh
+# objects), keyed by annotation / schema content, page sizes and options.
+RESULT_CACHE_SIZE = 16
+
+_result_cache: "OrderedDict[str, bytes]" = OrderedDict()
+_json_cache: Dict[Tuple[str, int, int], Tuple[str, Any]] = {}
+_cache_lock = threading.Lock()
+
+
+def _load_json_file(path: str) -> Tuple[str, Any]:
+    """(SHA-256 of the file bytes, parsed JSON), memoized by path + mtime + size."""
+    key = document_key(path)
+    with _cache_lock:
+        hit = _json_cache.get(key)
+    if hit is not None:
+        return hit
+
+    with open(key[0], "rb") as f:
+        raw = f.read()
+    entry = (hashlib.sha256(raw).hexdigest(), json.loads(raw.decode("utf-8")))
+    with _cache_lock:
+        _json_cache[key] = entry
+    return entry
+
+
+def clear_visual_cache() -> None:
+    """Forget every cached annotation, schema and converted result."""
+    with _cache_lock:
+        _result_cache.clear()
+        _json_cache.clear()
+
+
+def _expected_note_hex(schema_data: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Lower-cased color of the schema's "note" class (None if absent or unreadable)."""
+    if not schema_data:
+        return None
+    try:
+        classes = schema_data.get("classes") or schema_data.get("color_classes") or []
+        expected_note_hex = None
+        if isinstance(classes, list):
+            for cls in classes:
+                if str(cls.get("name")).lower() == "note":
+                    expected_note_hex = str(cls.get("color_hex") or cls.get("hex"))
+                    break
+        elif isinstance(classes, dict):
+            note_cfg = classes.get("note") or {}
+            expected_note_hex = note_cfg.get("hex") or note_cfg.get("color_hex")
+
+        if expected_note_hex:
+            return expected_note_hex.strip().lower()
+    except Exception:
+        # Stay robust even if schema doesn't match expectations
+        pass
+    return None
+
 
 @dataclass
 class VisualPipelineConfig:
@@ -90,7 +159,16 @@ class VisualPipelineConfig:
     schema_path: Optional[str] = None
     make_debug_overlays: bool = False
     debug_output_dir: str = "visual_debug"
+    # Debug overlay rendering (see backbone.visual.overlay_renderer)
+    debug_overlay_dpi: int = 72
+    debug_overlay_clip: bool = False
+    debug_overlay_workers: int = 1
+    # Pages whose overlay raster would exceed this (MB) are drawn in bands.
+    debug_overlay_max_raster_mb: Optional[float] = None
     enable_note_scoring: bool = True
+    # Reuse the converted per-page structure across runs in this process
+    # while the annotation, schema and PDF page sizes are unchanged.
+    cache_results: bool = True
 
 
 class VisualPipelineIntegrator:
@@ -128,6 +206,7 @@ print('Total fused notes:', len(r['fused_notes']))"
         score_notes: bool = True,
         make_debug_overlays: Optional[bool] = None,
         debug_output_dir: Optional[str] = None,
+        pages: Optional[Iterable[int]] = None,
     ) -> Dict[str, Any]:
         """
         Run the visual pipeline on the given PDF.
@@ -152,6 +231,10 @@ print('Total fused notes:', len(r['fused_notes']))"
             pages. If omitted, the value from the config is used.
         debug_output_dir:
             Folder where debug PNGs are written.
+        pages:
+            Optional collection of 1-based page numbers. Annotation pages
+            outside this set are skipped before alignment, so a single-sheet
+            run only aligns, scores and renders that sheet.
 
         Returns
         -------
@@ -182,22 +265,54 @@ print('Total fused notes:', len(r['fused_notes']))"
             return result
 
         # Load JSON files ------------------------------------------------
-        with open(annotation_path, "r", encoding="utf-8") as f:
-            ann_data = json.load(f)
+        ann_digest, ann_data = _load_json_file(annotation_path)
+        # Shallow copy: "pages" is replaced below, the cached parse is not touched.
+        ann_data = dict(ann_data)
 
+        schema_digest = ""
         schema_data: Optional[Dict[str, Any]] = None
         if schema_path and os.path.exists(schema_path):
             try:
-                with open(schema_path, "r", encoding="utf-8") as f:
-                    schema_data = json.load(f)
+                schema_digest, schema_data = _load_json_file(schema_path)
             except Exception as exc:  # pragma: no cover
                 print(f">>> VISUAL PIPELINE: Failed to load schema: {exc}")
 
-        result["metadata"] = ann_data.get("metadata", {})
+        if pages is not None:
+            wanted = {int(p) for p in pages}
+            ann_data["pages"] = [
+                entry for entry in (ann_data.get("pages") or [])
+                if int(entry.get("page_index", 0)) + 1 in wanted
+            ]
+
+        result["metadata"] = copy.deepcopy(ann_data.get("metadata", {}))
         image_meta = result["metadata"].get("image_size_px", {})
         img_w = float(image_meta.get("width") or 0.0)
         img_h = float(image_meta.get("height") or 0.0)
 
+        if fitz is None:
+            print(">>> VISUAL PIPELINE: PyMuPDF (fitz) is not available; "
+                  "cannot align annotation to PDF coordinates.")
+            return result
+
+        doc = open_document(pdf_path)
+
+        cache_key = None
+        if cfg.cache_results:
+            cache_key = self._cache_key(ann_digest, schema_digest, doc, ann_data, score_notes)
+            with _cache_lock:
+                cached = _result_cache.get(cache_key)
+                if cached is not None:
+                    _result_cache.move_to_end(cache_key)
+            if cached is not None:
+                result = pickle.loads(cached)
+                if make_debug_overlays:
+                    self._render_debug_overlays(
+                        pdf_path=pdf_path,
+                        pages_result=result["pages"],
+                        output_dir=debug_output_dir,
+                    )
+                return result
+
         # --------------------------------------------------------------
         # ALIGN RAW ANNOTATION BOXES IN IMAGE COORDINATES
         # --------------------------------------------------------------
@@ -213,22 +328,20 @@ print('Total fused notes:', len(r['fused_notes']))"
                 aligned_pages.append(new_entry)
             ann_data["pages"] = aligned_pages
 
-        if fitz is None:
-            print(">>> VISUAL PIPELINE: PyMuPDF (fitz) is not available; "
-                  "cannot align annotation to PDF coordinates.")
-            return result
-
-        doc = fitz.open(pdf_path)
+        expected_note_hex = _expected_note_hex(schema_data)
 
         pages_result: Dict[int, Dict[str, Any]] = {}
         fused_notes: List[Dict[str, Any]] = []
 
-        pages = ann_data.get("pages", [])
-        if not pages:
-            print(">>> VISUAL PIPELINE: No 'pages' array found in annotation JSON.")
+        ann_pages = ann_data.get("pages", [])
+        if not ann_pages:
+            if pages is not None:
+                print(">>> VISUAL PIPELINE: No annotated pages in the requested page set.")
+            else:
+                print(">>> VISUAL PIPELINE: No 'pages' array found in annotation JSON.")
             return result
 
-        for page_entry in pages:
+        for page_entry in ann_pages:
             page_index = int(page_entry.get("page_index", 0))
             page_number = page_index + 1  # convert zero-based to 1-based
 
@@ -316,20 +429,17 @@ print('Total fused notes:', len(r['fused_notes']))"
             for idx, col in enumerate(page_struct["columns"], start=1):
                 col["column_index"] = idx
 
-            # Attach note -> column mapping
+            # Attach note -> column mapping (first column, in order, that
+            # contains the note's centre)
+            column_index = RegionIndex([("column", col) for col in page_struct["columns"]])
             for note in page_struct["notes"]:
                 bbox = note["bbox"]
                 cx = (bbox[0] + bbox[2]) / 2.0
                 cy = (bbox[1] + bbox[3]) / 2.0
 
-                best_col: Optional[Dict[str, Any]] = None
-                for col in page_struct["columns"]:
-                    x0, y0, x1, y1 = col["bbox"]
-                    if x0 <= cx <= x1 and y0 <= cy <= y1:
-                        best_col = col
-                        break
-
-                if best_col is not None:
+                rank = column_index.first_containing(cx, cy)
+                if rank is not None:
+                    best_col = page_struct["columns"][rank]
                     note["column_id"] = best_col.get("id")
                     note["column_index"] = best_col.get("column_index")
                 else:
@@ -338,11 +448,19 @@ print('Total fused notes:', len(r['fused_notes']))"
 
             # Apply simple heuristic note confidence if requested
             if score_notes and page_struct["notes"]:
+                # Tallest column per id
+                column_heights: Dict[Any, float] = {}
+                for col in page_struct["columns"]:
+                    cb = col.get("bbox")
+                    if cb:
+                        cid = col.get("id")
+                        column_heights[cid] = max(column_heights.get(cid, 0.0), cb[3] - cb[1])
+
                 for note in page_struct["notes"]:
                     note["confidence"] = self._simple_note_confidence(
                         note,
-                        page_struct["columns"],
-                        schema_data=schema_data,
+                        column_heights,
+                        expected_note_hex=expected_note_hex,
                     )
             else:
                 for note in page_struct["notes"]:
@@ -354,6 +472,13 @@ print('Total fused notes:', len(r['fused_notes']))"
         result["pages"] = pages_result
         result["fused_notes"] = fused_notes
 
+        if cache_key is not None:
+            payload = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+            with _cache_lock:
+                _result_cache[cache_key] = payload
+                while len(_result_cache) > RESULT_CACHE_SIZE:
+                    _result_cache.popitem(last=False)
+
         if make_debug_overlays:
             self._render_debug_overlays(
                 pdf_path=pdf_path,
@@ -366,20 +491,41 @@ print('Total fused notes:', len(r['fused_notes']))"
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
+    @staticmethod
+    def _cache_key(
+        ann_digest: str,
+        schema_digest: str,
+        doc: Any,
+        ann_data: Dict[str, Any],
+        score_notes: bool,
+    ) -> str:
+        """Result cache key: annotation + schema content, selected pages and their PDF sizes."""
+        sizes = []
+        for entry in ann_data.get("pages") or []:
+            page_index = int(entry.get("page_index", 0))
+            if 0 <= page_index < len(doc):
+                rect = doc[page_index].rect
+                sizes.append((page_index, float(rect.width), float(rect.height)))
+            else:
+                sizes.append((page_index, None, None))
+        raw = repr((ann_digest, schema_digest, sizes, bool(score_notes)))
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
     def _simple_note_confidence(
         self,
         note: Dict[str, Any],
-        columns: List[Dict[str, Any]],
-        schema_data: Optional[Dict[str, Any]] = None,
+        column_heights: Dict[Any, float],
+        expected_note_hex: Optional[str] = None,
     ) -> float:
         """
         Very lightweight heuristic for note confidence.
 
         Factors considered:
         - Whether the note is assigned to a column.
-        - How tall the note is relative to the column.
+        - How tall the note is relative to the column (*column_heights*:
+          tallest column height per column id).
         - Whether a color is present (matching the configured "note" color
-          in the schema, if provided).
+          in the schema, if provided; see :func:`_expected_note_hex`).
 
         Returns a float in [0.0, 1.0].
         """
@@ -391,38 +537,16 @@ print('Total fused notes:', len(r['fused_notes']))"
         bbox = note.get("bbox")
         height = (bbox[3] - bbox[1]) if bbox else 0.0
 
-        col_height = 0.0
-        for col in columns:
-            if col.get("id") == note.get("column_id"):
-                cb = col.get("bbox")
-                if cb:
-                    col_height = max(col_height, cb[3] - cb[1])
+        col_height = column_heights.get(note.get("column_id"), 0.0)
         if col_height > 0:
             ratio = max(0.0, min(1.0, height / col_height))
             base += 0.2 * ratio
 
         # Optional color check
-        if schema_data:
-            try:
-                classes = schema_data.get("classes") or schema_data.get("color_classes") or []
-                expected_note_hex = None
-                if isinstance(classes, list):
-                    for cls in classes:
-                        if str(cls.get("name")).lower() == "note":
-                            expected_note_hex = str(cls.get("color_hex") or cls.get("hex"))
-                            break
-                elif isinstance(classes, dict):
-                    note_cfg = classes.get("note") or {}
-                    expected_note_hex = note_cfg.get("hex") or note_cfg.get("color_hex")
-
-                if expected_note_hex:
-                    expected_hex = expected_note_hex.strip().lower()
-                    actual_hex = str(note.get("color_hex") or "").strip().lower()
-                    if actual_hex == expected_hex:
-                        base += 0.1
-            except Exception:
-                # Stay robust even if schema doesn't match expectations
-                pass
+        if expected_note_hex:
+            actual_hex = str(note.get("color_hex") or "").strip().lower()
+            if actual_hex == expected_note_hex:
+                base += 0.1
 
         return float(max(0.0, min(1.0, base)))
 
@@ -443,53 +567,33 @@ print('Total fused notes:', len(r['fused_notes']))"
                   "(required libraries not available).")
             return
 
-        os.makedirs(output_dir, exist_ok=True)
-        doc = fitz.open(pdf_path)
-
-        for page_number, page_struct in pages_result.items():
-            if page_number - 1 >= len(doc):
-                continue
+        # (page_struct key, outline color, line width)
+        styles = (
+            ("columns", "cyan", 3),
+            ("notes", "lime", 2),
+            ("legend", "orange", 3),
+            ("sheet_info", "blue", 3),
+            ("xenoglyph", "magenta", 3),
+        )
+        jobs = {
+            page_number: [
+                OverlayBox(item["bbox"], color, width)
+                for key, color, width in styles
+                for item in page_struct.get(key, [])
+                if item.get("bbox")
+            ]
+            for page_number, page_struct in pages_result.items()
+        }
 
-            pdf_page = doc[page_number - 1]
-            pix = pdf_page.get_pixmap()
-            img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-            draw = ImageDraw.Draw(img)
-
-            print(f">>> VIS-DEBUG: Rendering page {page_number}")
-
-            # Columns: thin rectangles
-            for col in page_struct.get("columns", []):
-                bbox = col.get("bbox")
-                if not bbox:
-                    continue
-                draw.rectangle(bbox, outline="cyan", width=3)
-
-            # Notes: slightly thicker rectangles
-            for note in page_struct.get("notes", []):
-                bbox = note.get("bbox")
-                if not bbox:
-                    continue
-                draw.rectangle(bbox, outline="lime", width=2)
-
-            # Legend / sheet info / xenoglyphs
-            for legend in page_struct.get("legend", []):
-                bbox = legend.get("bbox")
-                if not bbox:
-                    continue
-                draw.rectangle(bbox, outline="orange", width=3)
-
-            for info in page_struct.get("sheet_info", []):
-                bbox = info.get("bbox")
-                if not bbox:
-                    continue
-                draw.rectangle(bbox, outline="blue", width=3)
-
-            for xen in page_struct.get("xenoglyph", []):
-                bbox = xen.get("bbox")
-                if not bbox:
-                    continue
-                draw.rectangle(bbox, outline="magenta", width=3)
-
-            out_name = os.path.join(output_dir, f"visual_page_{page_number}.png")
-            img.save(out_name)
-            print(f">>> VIS-DEBUG: Saved {out_name}")
+        cfg = self.config
+        render_overlays(
+            pdf_path,
+            jobs,
+            output_dir,
+            OverlayRenderConfig(
+                dpi=cfg.debug_overlay_dpi,
+                clip_to_regions=cfg.debug_overlay_clip,
+                workers=cfg.debug_overlay_workers,
+                max_raster_mb=cfg.debug_overlay_max_raster_mb,
+            ),
+        )
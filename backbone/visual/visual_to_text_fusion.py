@@ -1,19 +1,26 @@
 # visual_to_text_fusion.py
-from typing import Dict, List
-import fitz  # PyMuPDF
+from typing import Dict, List, Optional
 
-def extract_text_for_bbox(pdf_path: str, bbox, page_number: int) -> str:
-    doc = fitz.open(pdf_path)
-    page = doc.load_page(page_number-1)
-    rect = fitz.Rect(*bbox)
-    return page.get_textbox(rect)
+from backbone.intake.word_index import WordIndex
+
+def extract_text_for_bbox(pdf_path: str, bbox, page_number: int,
+                          word_index: Optional[WordIndex] = None) -> str:
+    # One cached get_text("words") extraction per page, shared by every note bbox on it.
+    if word_index is None:
+        word_index = WordIndex.load(pdf_path, page_number - 1)
+    return word_index.text_in_rect(tuple(bbox))
 
 def fuse_visual_and_text(schema: Dict, pdf_path: str) -> List[Dict]:
     result = []
+    word_indexes: Dict[int, WordIndex] = {}
     for note in schema.get("page_structure", {}).get("notes", []):
         bbox = note.get("bbox")
         page = note.get("page_number", 1)
-        text = extract_text_for_bbox(pdf_path, bbox, page) if bbox else ""
+        text = ""
+        if bbox:
+            if page not in word_indexes:
+                word_indexes[page] = WordIndex.load(pdf_path, page - 1)
+            text = extract_text_for_bbox(pdf_path, bbox, page, word_indexes[page])
         merged = {"bbox": bbox, "page": page, "text": text}
         result.append(merged)
     return result
@@ -9,6 +9,7 @@ import os
 import fitz  # PyMuPDF
 from PIL import Image, ImageDraw
 from backbone.chunking import Chunker
+from backbone.intake.document_pool import open_document
 
 PDF_NAME = "test.pdf"
 OUTPUT_DIR = "note_visuals"
@@ -32,7 +33,7 @@ def draw_note_boxes():
     for note in notes:
         pages.setdefault(note.page_number, []).append(note)
 
-    doc = fitz.open(PDF_NAME)
+    doc = open_document(PDF_NAME)
 
     zoom = DPI / 72.0
     matrix = fitz.Matrix(zoom, zoom)
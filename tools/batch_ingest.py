@@ -0,0 +1,591 @@
+#!/usr/bin/env python3
+"""
+tools/batch_ingest.py
+
+Unattended batch front end: ingest a directory (or manifest) of plan sets.
+
+For every PDF the worker runs the same stages as export_notes_json.py:
+  1. visual pipeline, only for PDFs with an annotation JSON (--annotation
+     for every PDF, or an "annotation" per entry of a JSON manifest);
+     otherwise skipped and noted in the PDF's log and manifest record
+  2. Chunker extraction + visual attach + grouping (streamed page by page)
+  3. JSON export (written incrementally, one file per PDF)
+
+Scheduling
+----------
+- At most --workers PDFs are processed at once (process pool, spawn context,
+  workers are recycled every --tasks-per-worker PDFs to cap leaks overnight).
+- Each PDF is charged an estimated memory cost (base + size-proportional).
+  A PDF is only admitted while the sum of in-flight estimates stays within
+  --estimated-memory-budget-mb; one PDF is always admitted so an oversized
+  set still runs (alone). This is admission control on estimates only:
+  actual RSS is not measured or enforced.
+- Failures are isolated: an exception is recorded for that PDF only. If a
+  worker process dies, its in-flight PDFs are retried once on a fresh pool.
+
+Outputs (under --out, default exports/Batches/<YYYYMMDD_HHMMSS>/)
+-------
+  results/<stem>__<hash8>.json   per-PDF export (same shape as export_notes_json)
+  logs/<stem>__<hash8>.log       per-PDF stdout/stderr + tracebacks
+  batch_manifest.json            per-PDF status, pages, seconds, pages/sec,
+                                 batch totals; rewritten after every PDF.
+                                 worker_peak_rss_mb is the peak RSS of the
+                                 worker process so far, over the
+                                 worker_pdfs PDFs it has run (not this
+                                 PDF alone; POSIX only)
+
+--resume reuses an existing --out folder and skips PDFs that already
+finished "ok" with an unchanged file (size + mtime) and annotation.
+
+Usage (from project root):
+  py tools\\batch_ingest.py --input-dir D:\\PlanSets --workers 4 --estimated-memory-budget-mb 8000
+  py tools\\batch_ingest.py --manifest sets.txt --out exports\\Batches\\nightly --resume
+
+JSON manifest entries are paths or {"pdf": ..., "annotation": ...} objects
+(relative paths resolve against the manifest's folder):
+  {"pdfs": ["A101.pdf", {"pdf": "S201.pdf", "annotation": "S201_annotation.json"}]}
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+TOOLS_DIR = Path(__file__).resolve().parent
+
+# Ensure project root (and tools/, for spawned workers) are importable.
+for _p in (ROOT, TOOLS_DIR):
+    if str(_p) not in sys.path:
+        sys.path.insert(0, str(_p))
+
+
+MANIFEST_NAME = "batch_manifest.json"
+
+# Memory estimate per PDF: fixed interpreter/PyMuPDF overhead plus a
+# multiple of the file size (decoded content streams, fonts, chunk objects).
+BASE_MEMORY_MB = 250.0
+MEMORY_PER_FILE_MB = 6.0
+
+
+# -----------------------------------------------------------------------------
+# Task / result types
+# -----------------------------------------------------------------------------
+
+
+@dataclass
+class IngestOptions:
+    notes_only: bool = False
+    # Allow the visual stage; it still needs an annotation per PDF (the
+    # integrator's built-in default annotation belongs to test.pdf).
+    visual: bool = True
+    annotation_path: Optional[str] = None
+    schema_path: Optional[str] = None
+
+
+@dataclass
+class PdfTask:
+    pdf_path: str
+    key: str
+    size: int
+    mtime_ns: int
+    estimate_mb: float
+    annotation_path: Optional[str] = None
+    attempts: int = 0
+
+
+def _now_iso_utc() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _task_key(pdf_path: Path) -> str:
+    digest = hashlib.sha1(str(pdf_path.resolve()).encode("utf-8")).hexdigest()[:8]
+    return f"{pdf_path.stem}__{digest}"
+
+
+def estimate_memory_mb(size_bytes: int) -> float:
+    return BASE_MEMORY_MB + MEMORY_PER_FILE_MB * (size_bytes / (1024.0 * 1024.0))
+
+
+# -----------------------------------------------------------------------------
+# Worker side (module-level so it pickles under spawn)
+# -----------------------------------------------------------------------------
+
+
+# PDFs run by this worker process so far (the span worker_peak_rss_mb covers).
+_WORKER_PDFS = 0
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Peak RSS of this process over its lifetime (not per PDF)."""
+    try:
+        import resource  # POSIX only
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return round(peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0, 1)
+
+
+def ingest_one(
+    pdf_path: str,
+    out_dir: str,
+    key: str,
+    options: IngestOptions,
+    annotation_path: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Run visual → chunk → export for one PDF. Never raises."""
+    global _WORKER_PDFS
+    _WORKER_PDFS += 1
+    out_root = Path(out_dir)
+    result_path = out_root / "results" / f"{key}.json"
+    log_path = out_root / "logs" / f"{key}.log"
+    result_path.parent.mkdir(parents=True, exist_ok=True)
+    log_path.parent.mkdir(parents=True, exist_ok=True)
+
+    record: Dict[str, Any] = {
+        "pdf_path": pdf_path,
+        "status": "error",
+        "output": str(result_path.relative_to(out_root)),
+        "log": str(log_path.relative_to(out_root)),
+        "pages": 0,
+        "chunks": 0,
+        "seconds": 0.0,
+        "pages_per_sec": 0.0,
+        "visual_annotation": None,
+        "error": None,
+    }
+
+    t0 = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log, \
+            contextlib.redirect_stdout(log), contextlib.redirect_stderr(log):
+        try:
+            from backbone.chunking import Chunker, ChunkerConfig
+            from backbone.intake.document_pool import get_document_pool
+            from backbone.visual.visual_chunker_bridge import VisualChunkerBridge
+            from backbone.visual.visual_pipeline_integrator import VisualPipelineIntegrator
+            from export_notes_json import stream_export
+
+            page_count = len(get_document_pool().get_document(pdf_path))
+
+            visual_pages: Dict[int, Any] = {}
+            if options.visual and annotation_path:
+                integrator = VisualPipelineIntegrator()
+                visual_pages = integrator.run(
+                    pdf_path=pdf_path,
+                    annotation_path=annotation_path,
+                    schema_path=options.schema_path,
+                    make_debug_overlays=False,
+                ).get("pages", {})
+                record["visual_annotation"] = annotation_path
+            elif options.visual:
+                print(">>> BATCH: Visual stage skipped (no annotation for this PDF).")
+
+            chunker = Chunker(
+                ChunkerConfig(debug=True),
+                visual_pages=visual_pages,
+                visual_bridge=VisualChunkerBridge() if visual_pages else None,
+            )
+            summary = stream_export(
+                pdf_path=pdf_path,
+                output_path=result_path,
+                pages=chunker.iter_pages(pdf_path),
+                page=None,
+                notes_only=options.notes_only,
+                sheet_type_filter=None,
+                min_confidence=None,
+            )
+
+            record["status"] = "ok"
+            record["pages"] = page_count
+            record["chunks"] = summary.get("total_exported_chunks", 0)
+        except Exception as exc:
+            record["error"] = f"{type(exc).__name__}: {exc}"
+            traceback.print_exc()
+        finally:
+            # Drop this PDF's handles before the worker takes the next one.
+            try:
+                from backbone.intake.document_pool import get_document_pool
+                get_document_pool().clear()
+            except Exception:
+                pass
+
+    elapsed = time.perf_counter() - t0
+    record["seconds"] = round(elapsed, 3)
+    if record["pages"] and elapsed > 0:
+        record["pages_per_sec"] = round(record["pages"] / elapsed, 2)
+    record["worker_peak_rss_mb"] = _peak_rss_mb()
+    record["worker_pdfs"] = _WORKER_PDFS
+    return record
+
+
+# -----------------------------------------------------------------------------
+# Input discovery
+# -----------------------------------------------------------------------------
+
+
+def discover_pdfs(
+    input_dir: Optional[str],
+    manifest: Optional[str],
+    recursive: bool,
+) -> List[Tuple[Path, Optional[Path]]]:
+    """(pdf, annotation JSON or None) pairs, de-duplicated by PDF."""
+    paths: List[Tuple[Path, Optional[Path]]] = []
+
+    if input_dir:
+        base = Path(input_dir)
+        if not base.is_dir():
+            raise SystemExit(f"ERROR: input dir not found: {base}")
+        pattern = "**/*" if recursive else "*"
+        paths.extend(
+            (p, None) for p in base.glob(pattern) if p.is_file() and p.suffix.lower() == ".pdf"
+        )
+
+    if manifest:
+        mpath = Path(manifest)
+        if not mpath.exists():
+            raise SystemExit(f"ERROR: manifest not found: {mpath}")
+        text = mpath.read_text(encoding="utf-8")
+        if mpath.suffix.lower() == ".json":
+            data = json.loads(text)
+            entries = data.get("pdfs", []) if isinstance(data, dict) else data
+        else:
+            entries = [ln.strip() for ln in text.splitlines()]
+        for entry in entries:
+            annotation = None
+            if isinstance(entry, dict):
+                annotation = entry.get("annotation")
+                entry = entry.get("pdf")
+            if not entry or str(entry).startswith("#"):
+                continue
+            p = Path(entry)
+            if not p.is_absolute():
+                p = mpath.parent / p
+            a = Path(annotation) if annotation else None
+            if a is not None and not a.is_absolute():
+                a = mpath.parent / a
+            paths.append((p, a))
+
+    # De-duplicate (an entry with an annotation wins), keep a stable order.
+    seen: Dict[Path, int] = {}
+    unique: List[Tuple[Path, Optional[Path]]] = []
+    for p, a in sorted(paths, key=lambda x: str(x[0]).lower()):
+        rp = p.resolve()
+        if rp in seen:
+            if a is not None and unique[seen[rp]][1] is None:
+                unique[seen[rp]] = (unique[seen[rp]][0], a)
+            continue
+        seen[rp] = len(unique)
+        unique.append((p, a))
+    return unique
+
+
+# -----------------------------------------------------------------------------
+# Manifest
+# -----------------------------------------------------------------------------
+
+
+def _write_manifest(out_dir: Path, manifest: Dict[str, Any]) -> None:
+    results = manifest["pdfs"].values()
+    ok = [r for r in results if r.get("status") == "ok"]
+    pages = sum(int(r.get("pages") or 0) for r in ok)
+    busy_seconds = sum(float(r.get("seconds") or 0.0) for r in ok)
+    wall = max(time.time() - manifest["_started_epoch"], 1e-9)
+    # Throughput only counts PDFs processed by this invocation (not resumed).
+    session_pages = sum(
+        int(manifest["pdfs"][k].get("pages") or 0)
+        for k in manifest["_session"]
+        if manifest["pdfs"][k].get("status") == "ok"
+    )
+
+    manifest["updated_utc"] = _now_iso_utc()
+    manifest["totals"] = {
+        "pdfs": len(manifest["pdfs"]),
+        "ok": len(ok),
+        "error": sum(1 for r in results if r.get("status") == "error"),
+        "pages": pages,
+        "chunks": sum(int(r.get("chunks") or 0) for r in ok),
+        "worker_seconds": round(busy_seconds, 3),
+        "wall_seconds": round(wall, 3),
+        "pages_this_run": session_pages,
+        "pages_per_sec": round(session_pages / wall, 2),
+    }
+
+    data = {k: v for k, v in manifest.items() if not k.startswith("_")}
+    path = out_dir / MANIFEST_NAME
+    tmp = path.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _load_previous(out_dir: Path) -> Dict[str, Any]:
+    path = out_dir / MANIFEST_NAME
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding="utf-8")).get("pdfs", {})
+    except Exception:
+        return {}
+
+
+# -----------------------------------------------------------------------------
+# Scheduler
+# -----------------------------------------------------------------------------
+
+
+def _new_pool(workers: int, tasks_per_worker: int) -> ProcessPoolExecutor:
+    ctx = multiprocessing.get_context("spawn")
+    kwargs: Dict[str, Any] = {"max_workers": workers, "mp_context": ctx}
+    if tasks_per_worker > 0 and sys.version_info >= (3, 11):
+        kwargs["max_tasks_per_child"] = tasks_per_worker
+    return ProcessPoolExecutor(**kwargs)
+
+
+def run_batch(
+    tasks: List[PdfTask],
+    out_dir: Path,
+    options: IngestOptions,
+    workers: int,
+    memory_budget_mb: float,
+    tasks_per_worker: int,
+    manifest: Dict[str, Any],
+) -> None:
+    queue = list(tasks)
+    total = len(queue)
+    done = 0
+    reserved_mb = 0.0
+    in_flight: Dict[Future, PdfTask] = {}
+    pool = _new_pool(workers, tasks_per_worker)
+
+    def admit() -> None:
+        nonlocal reserved_mb
+        while queue and len(in_flight) < workers:
+            task = queue[0]
+            if in_flight and reserved_mb + task.estimate_mb > memory_budget_mb:
+                # Over budget: wait for something to finish. The smallest
+                # queued PDF is tried first so big sets don't block small ones.
+                smaller = [t for t in queue if reserved_mb + t.estimate_mb <= memory_budget_mb]
+                if not smaller:
+                    return
+                task = smaller[0]
+            queue.remove(task)
+            task.attempts += 1
+            fut = pool.submit(ingest_one, task.pdf_path, str(out_dir), task.key, options, task.annotation_path)
+            in_flight[fut] = task
+            reserved_mb += task.estimate_mb
+
+    try:
+        admit()
+        while in_flight:
+            finished, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+            broken = False
+
+            for fut in finished:
+                task = in_flight.pop(fut)
+                reserved_mb -= task.estimate_mb
+                try:
+                    record = fut.result()
+                except BrokenProcessPool:
+                    broken = True
+                    if task.attempts < 2:
+                        queue.insert(0, task)
+                        continue
+                    record = {
+                        "pdf_path": task.pdf_path,
+                        "status": "error",
+                        "error": "worker process died (retried once)",
+                        "pages": 0,
+                        "chunks": 0,
+                        "seconds": 0.0,
+                    }
+                except Exception as exc:  # pragma: no cover - defensive
+                    record = {
+                        "pdf_path": task.pdf_path,
+                        "status": "error",
+                        "error": f"{type(exc).__name__}: {exc}",
+                        "pages": 0,
+                        "chunks": 0,
+                        "seconds": 0.0,
+                    }
+
+                record["size"] = task.size
+                record["mtime_ns"] = task.mtime_ns
+                record["estimate_mb"] = round(task.estimate_mb, 1)
+                record["finished_utc"] = _now_iso_utc()
+                manifest["pdfs"][task.key] = record
+                manifest["_session"].add(task.key)
+                done += 1
+
+                _write_manifest(out_dir, manifest)
+                totals = manifest["totals"]
+                print(
+                    f"[{done}/{total}] {record['status']:<5} {Path(task.pdf_path).name} "
+                    f"{record.get('pages', 0)} pages {record.get('seconds', 0.0):.1f}s "
+                    f"| overall {totals['pages_per_sec']:.2f} pages/s"
+                    + (f" | {record.get('error')}" if record.get("error") else "")
+                )
+
+            if broken:
+                # Every future on a broken pool fails; requeue and start over.
+                for fut, task in list(in_flight.items()):
+                    reserved_mb -= task.estimate_mb
+                    if task.attempts < 2:
+                        queue.insert(0, task)
+                in_flight.clear()
+                pool.shutdown(wait=False, cancel_futures=True)
+                print("[warn] Worker process died; restarting pool.")
+                pool = _new_pool(workers, tasks_per_worker)
+
+            admit()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+# -----------------------------------------------------------------------------
+# CLI
+# -----------------------------------------------------------------------------
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Batch-ingest a directory or manifest of plan sets.")
+    src = ap.add_argument_group("input (at least one)")
+    src.add_argument("--input-dir", default=None, help="Folder of PDFs.")
+    src.add_argument("--manifest", default=None, help="Text file (one path per line) or JSON list / {'pdfs': [...]}.")
+    ap.add_argument("--recursive", action="store_true", help="Recurse into --input-dir.")
+    ap.add_argument("--out", default=None, help="Output folder (default: exports/Batches/<timestamp>).")
+    ap.add_argument("--workers", type=int, default=max(1, min(4, (os.cpu_count() or 2) - 1)),
+                    help="Max PDFs processed concurrently.")
+    ap.add_argument("--estimated-memory-budget-mb", "--memory-budget-mb", dest="memory_budget_mb",
+                    type=float, default=4096.0,
+                    help="Sum of per-PDF memory estimates (from file size) allowed in flight. "
+                         "Admission only; actual RSS is not checked.")
+    ap.add_argument("--tasks-per-worker", type=int, default=20,
+                    help="Recycle each worker process after this many PDFs (0 = never).")
+    ap.add_argument("--notes-only", action="store_true", help="Only export note-like chunks.")
+    ap.add_argument("--no-visual", action="store_true", help="Skip the visual pipeline / bridge.")
+    ap.add_argument("--annotation", default=None,
+                    help="Annotation JSON for the visual pipeline, used for every PDF without its own "
+                         "manifest annotation. Without one the visual stage is skipped.")
+    ap.add_argument("--schema", default=None, help="Schema JSON for the visual pipeline.")
+    ap.add_argument("--resume", action="store_true",
+                    help="Skip PDFs already finished 'ok' in --out (unchanged size/mtime).")
+    return ap.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    if not args.input_dir and not args.manifest:
+        print("ERROR: give --input-dir and/or --manifest")
+        return 2
+
+    pdfs = discover_pdfs(args.input_dir, args.manifest, args.recursive)
+    if not pdfs:
+        print("ERROR: no PDFs found.")
+        return 2
+
+    if args.out:
+        out_dir = Path(args.out)
+    else:
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+        out_dir = ROOT / "exports" / "Batches" / stamp
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    options = IngestOptions(
+        notes_only=args.notes_only,
+        visual=not args.no_visual,
+        annotation_path=args.annotation,
+        schema_path=args.schema,
+    )
+
+    previous = _load_previous(out_dir) if args.resume else {}
+    manifest: Dict[str, Any] = {
+        "started_utc": _now_iso_utc(),
+        "_started_epoch": time.time(),
+        "_session": set(),
+        "settings": {
+            "workers": args.workers,
+            "estimated_memory_budget_mb": args.memory_budget_mb,
+            "tasks_per_worker": args.tasks_per_worker,
+            **asdict(options),
+        },
+        "pdfs": {},
+    }
+
+    tasks: List[PdfTask] = []
+    skipped = 0
+    for p, annotation in pdfs:
+        annotation = annotation or (Path(args.annotation) if args.annotation else None)
+        annotation_path = str(annotation) if annotation and options.visual else None
+        if not p.exists():
+            key = _task_key(p)
+            manifest["pdfs"][key] = {"pdf_path": str(p), "status": "error", "error": "file not found"}
+            continue
+        st = p.stat()
+        key = _task_key(p)
+        prev = previous.get(key)
+        if (
+            prev
+            and prev.get("status") == "ok"
+            and prev.get("size") == st.st_size
+            and prev.get("mtime_ns") == st.st_mtime_ns
+            and prev.get("visual_annotation") == annotation_path
+            and (out_dir / prev.get("output", "")).exists()
+        ):
+            manifest["pdfs"][key] = prev
+            skipped += 1
+            continue
+        tasks.append(
+            PdfTask(
+                pdf_path=str(p),
+                key=key,
+                size=st.st_size,
+                mtime_ns=st.st_mtime_ns,
+                estimate_mb=estimate_memory_mb(st.st_size),
+                annotation_path=annotation_path,
+            )
+        )
+
+    print(f">>> BATCH: {len(pdfs)} PDF(s), {len(tasks)} to process, {skipped} resumed")
+    print(f">>> BATCH: workers={args.workers} estimated memory budget={args.memory_budget_mb:.0f} MB")
+    if options.visual:
+        with_visual = sum(1 for t in tasks if t.annotation_path)
+        print(f">>> BATCH: visual stage for {with_visual} PDF(s) with an annotation, "
+              f"skipped for {len(tasks) - with_visual}")
+    print(f">>> BATCH: output -> {out_dir}")
+
+    _write_manifest(out_dir, manifest)
+    run_batch(
+        tasks,
+        out_dir,
+        options,
+        workers=max(1, args.workers),
+        memory_budget_mb=args.memory_budget_mb,
+        tasks_per_worker=args.tasks_per_worker,
+        manifest=manifest,
+    )
+    _write_manifest(out_dir, manifest)
+
+    totals = manifest["totals"]
+    print(
+        f"\n>>> BATCH DONE: {totals['ok']} ok, {totals['error']} error, "
+        f"{totals['pages_this_run']} pages in {totals['wall_seconds']:.1f}s "
+        f"({totals['pages_per_sec']:.2f} pages/s)"
+    )
+    return 0 if totals["error"] == 0 else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,199 @@
+# benchmark_chunk_table.py
+# Parity check + micro-benchmark for the ChunkTable grouping path.
+#
+# Usage example (from project root):
+#
+#   py tools\benchmark_chunk_table.py
+#
+#   py tools\benchmark_chunk_table.py --lines 50000 --pages 100 --repeat 5
+#
+# This will:
+#   1. Generate --lines note-sheet text lines spread over --pages pages,
+#      with float32-exact coordinates like PyMuPDF output (so ChunkTable
+#      stores them as float32)
+#   2. Add boundary pages: line gaps and indents a few float32 steps
+#      either side of max_line_gap / max_indent_delta
+#   3. Group with SemanticGrouper.group_page_chunks (object path) and
+#      group_table(...).to_chunks() (columnar path), with and without
+#      partition_by_column, and check both give the same tree
+#   4. Time both paths (per page, tables built beforehand; the table
+#      path includes converting the result back to Chunks)
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, List, Optional
+
+import numpy as np
+
+# ---------------------------------------------------------------------
+# Project root / imports
+# ---------------------------------------------------------------------
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Ensure project root is on sys.path so imports work when running from tools/
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backbone.chunking.chunk import Chunk
+from backbone.chunking.chunk_table import ChunkTable
+from backbone.chunking.column_detector import ColumnDetector
+from backbone.chunking.semantic_grouper import SemanticGrouper, SemanticGrouperConfig
+
+
+WORDS = ("PROVIDE", "CONCRETE", "PER", "SPEC", "curb", "joint", "and", "see", "detail", "EXISTING")
+
+
+def f32(value: float) -> float:
+    return float(np.float32(value))
+
+
+# ---------------------------------------------------------------------
+# Synthetic data
+# ---------------------------------------------------------------------
+
+def make_lines(n_lines: int, n_pages: int, seed: int = 0) -> List[Chunk]:
+    """Numbered notes in 2-4 columns per page, wrapped over 1-4 lines."""
+    rng = np.random.default_rng(seed)
+    chunks: List[Chunk] = []
+    per_page = max(1, n_lines // max(1, n_pages))
+    for page in range(1, n_pages + 1):
+        lefts = 72.0 + 560.0 * np.arange(rng.integers(2, 5))
+        y = {x: 72.0 for x in lefts.tolist()}
+        note = 0
+        count = 0
+        while count < per_page:
+            x = float(rng.choice(lefts))
+            note += 1
+            for k in range(int(rng.integers(1, 5))):
+                words = " ".join(rng.choice(WORDS, size=int(rng.integers(3, 9))))
+                text = f"{note}. {words}" if k == 0 else words
+                if rng.random() < 0.3:
+                    text += "."
+                indent = 0.0 if k == 0 else float(rng.choice([0.0, 12.0, 24.0, 30.0]))
+                x0 = x + indent + rng.normal(0.0, 0.5)
+                y0 = y[x] + (float(rng.choice([2.0, 4.0, 17.5, 18.5, 24.0])) if k else 14.0)
+                chunks.append(Chunk(
+                    content=text,
+                    type="text_line",
+                    bbox=(f32(x0), f32(y0), f32(x0 + 8.0 * len(text)), f32(y0 + 10.0)),
+                    page=page,
+                ))
+                y[x] = y0 + 10.0
+                count += 1
+    return chunks
+
+
+def _step(value: float, steps: int) -> float:
+    """*value* moved *steps* float32 ulps (negative = down)."""
+    out = np.float32(value)
+    for _ in range(abs(steps)):
+        out = np.nextafter(out, np.float32(np.inf if steps > 0 else -np.inf))
+    return float(out)
+
+
+def boundary_lines(config: SemanticGrouperConfig, first_page: int, n_pages: int = 100, seed: int = 0) -> List[Chunk]:
+    """
+    One line pair per page whose gap / indent is within a few float32 steps
+    of the thresholds, near the page origin. Subtracting a small float32
+    coordinate from a larger one rounds, so in float32 these differences
+    land on the threshold (e.g. y1=f32(0.1), y0=f32(18.1): exact gap
+    18.00000038, float32 gap 18.0); both paths only agree in float64.
+    """
+    rng = np.random.default_rng(seed)
+    chunks: List[Chunk] = []
+    for page in range(first_page, first_page + n_pages):
+        top = f32(rng.uniform(0.01, 2.0))
+        x0 = f32(rng.uniform(0.01, 2.0))
+        y1 = _step(top + config.max_line_gap, int(rng.integers(-3, 4)))
+        x1 = _step(x0 + config.max_indent_delta, int(rng.integers(-3, 4)))
+        chunks.append(Chunk(content="continued text", type="text_line",
+                            bbox=(x0, 0.0, f32(x0 + 200.0), top), page=page))
+        chunks.append(Chunk(content="more text", type="text_line",
+                            bbox=(x1, y1, f32(x1 + 200.0), f32(y1 + 10.0)), page=page))
+    return chunks
+
+
+# ---------------------------------------------------------------------
+# Comparison / timing
+# ---------------------------------------------------------------------
+
+def canon(ch: Chunk) -> Any:
+    return (
+        ch.type, ch.id, ch.content, ch.bbox, ch.page, ch.metadata,
+        getattr(ch, "column", None), [canon(c) for c in ch.children],
+    )
+
+
+def best_of(repeat: int, fn: Callable[[], Any]):
+    best = None
+    result = None
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+# ---------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Check and benchmark the ChunkTable grouping path.")
+    parser.add_argument("--lines", type=int, default=20000, help="Total text lines (default: 20000).")
+    parser.add_argument("--pages", type=int, default=40, help="Pages to spread them over (default: 40).")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per variant; best time is reported.")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    ok = True
+
+    for by_column in (False, True):
+        config = SemanticGrouperConfig(deterministic_ids=True, partition_by_column=by_column)
+        grouper = SemanticGrouper(config)
+        chunks = make_lines(args.lines, args.pages, args.seed)
+        chunks += boundary_lines(config, args.pages + 1, seed=args.seed)
+        if by_column:
+            ColumnDetector().assign_columns(chunks)
+        pages = sorted({c.page for c in chunks})
+        by_page = {p: [c for c in chunks if c.page == p] for p in pages}
+        tables = {p: ChunkTable.from_chunks(by_page[p]) for p in pages}
+
+        def object_path():
+            return [
+                canon(g) for p in pages for g in grouper.group_page_chunks(by_page[p], "notes_sheet")
+            ]
+
+        def table_path():
+            return [
+                canon(g)
+                for p in pages
+                for g in grouper.group_table(tables[p], "notes_sheet").to_chunks()
+            ]
+
+        label = "partition_by_column" if by_column else "sequential"
+        dtype = tables[pages[0]].coords.dtype
+        print(f">>> {len(chunks)} lines over {len(pages)} pages, {label} (coords {dtype})")
+        t_obj, ref = best_of(args.repeat, object_path)
+        t_tab, got = best_of(args.repeat, table_path)
+        same = ref == got
+        ok = ok and same
+        print(f"    object path  {t_obj * 1e3:9.1f} ms  groups={len(ref)}")
+        print(f"    table path   {t_tab * 1e3:9.1f} ms  groups={len(got)}  x{t_obj / t_tab:.1f}")
+        print(f"    same result: {'yes' if same else 'NO'}\n")
+
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
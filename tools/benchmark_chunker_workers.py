@@ -0,0 +1,155 @@
+# benchmark_chunker_workers.py
+# Time Chunker.process serially vs. with ChunkerConfig(workers=N).
+#
+# Usage example (from project root):
+#
+#   py tools\benchmark_chunker_workers.py --pdf test.pdf --workers 1 2 4 8
+#
+#   py tools\benchmark_chunker_workers.py --pdf big_set.pdf --workers 1 4 --repeat 3
+#
+# For each worker count this will:
+#   1. Run the Chunker on the whole PDF (debug off)
+#   2. Record the best wall-clock time over --repeat runs
+#   3. Check the output is identical to the serial (workers=1) run
+#      (chunk IDs are random UUIDs and are excluded from the comparison)
+#   4. Print a small table with pages/sec and speedup vs. serial
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+# ---------------------------------------------------------------------
+# Project root / imports
+# ---------------------------------------------------------------------
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Ensure project root is on sys.path so imports work when running from tools/
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backbone.chunking import Chunker, ChunkerConfig
+from backbone.intake.document_pool import get_document_pool
+
+
+# ---------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------
+
+def output_digest(chunks) -> str:
+    """Stable hash of chunker output, ignoring the random chunk IDs."""
+    rows = []
+    for ch in chunks:
+        rows.append(
+            [
+                ch.type,
+                ch.page,
+                ch.content,
+                list(ch.bbox) if ch.bbox else None,
+                sorted((str(k), repr(v)) for k, v in (ch.metadata or {}).items()),
+            ]
+        )
+    payload = json.dumps(rows, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def time_run(pdf_path: str, workers: int, repeat: int, use_cache: bool = False):
+    best = None
+    digest = None
+    for _ in range(max(1, repeat)):
+        # Cold document handle each run so serial and parallel pay the same
+        # open cost.
+        get_document_pool().clear()
+
+        chunker = Chunker(
+            ChunkerConfig(debug=False, workers=workers, use_extraction_cache=use_cache)
+        )
+        t0 = time.perf_counter()
+        chunks = chunker.process(pdf_path)
+        elapsed = time.perf_counter() - t0
+
+        digest = output_digest(chunks)
+        best = elapsed if best is None else min(best, elapsed)
+    return best, digest
+
+
+# ---------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark Chunker.process with different worker counts."
+    )
+    parser.add_argument("--pdf", required=True, help="Path to the PDF plan set.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4],
+        help="Worker counts to time (default: 1 2 4). 1 is always included.",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="Runs per worker count; the best time is reported (default: 1).",
+    )
+    parser.add_argument(
+        "--use-cache",
+        action="store_true",
+        help="Allow the on-disk extraction cache (off by default so every "
+             "run pays the real PyMuPDF extraction cost).",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+
+    pdf_path = args.pdf
+    if not Path(pdf_path).exists():
+        print(f"ERROR: PDF not found: {pdf_path}")
+        sys.exit(1)
+
+    page_count = len(get_document_pool().get_document(pdf_path))
+    worker_counts = sorted(set([1] + [max(1, w) for w in args.workers]))
+
+    print(f">>> Benchmarking {pdf_path} ({page_count} pages)")
+
+    serial_time = None
+    serial_digest = None
+    mismatches = 0
+
+    print(f"\n{'workers':>8} {'seconds':>10} {'pages/s':>10} {'speedup':>8}  output")
+    for workers in worker_counts:
+        elapsed, digest = time_run(pdf_path, workers, args.repeat, args.use_cache)
+        if workers == 1:
+            serial_time, serial_digest = elapsed, digest
+
+        same = digest == serial_digest
+        if not same:
+            mismatches += 1
+
+        pps = page_count / elapsed if elapsed > 0 else float("inf")
+        speedup = serial_time / elapsed if elapsed > 0 else float("inf")
+        print(
+            f"{workers:>8} {elapsed:>10.3f} {pps:>10.1f} {speedup:>7.2f}x  "
+            f"{'identical' if same else 'DIFFERS'}"
+        )
+
+    if mismatches:
+        print("\nERROR: parallel output differs from the serial path.")
+        sys.exit(1)
+
+    print("\n>>> DONE.")
+
+
+if __name__ == "__main__":
+    main()
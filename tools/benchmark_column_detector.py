@@ -0,0 +1,185 @@
+# benchmark_column_detector.py
+# Micro-benchmark for ColumnDetector engines on synthetic plan-sheet lines.
+#
+# Usage example (from project root):
+#
+#   py tools\benchmark_column_detector.py
+#
+#   py tools\benchmark_column_detector.py --lines 50000 --pages 100 --repeat 5
+#
+# This will:
+#   1. Generate --lines text-line left edges spread over --pages pages
+#      (a few real columns per page, jittered edges, indented / centred
+#      lines between the columns)
+#   2. Time the original pure-Python chaining loop (per page), the NumPy
+#      "chain" engine (per page and batched over all pages) and the
+#      "density" engine (batched)
+#   3. Check the "chain" engine matches the original loop exactly, and
+#      report the share of pages where each engine finds the true number
+#      of columns
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+# ---------------------------------------------------------------------
+# Project root / imports
+# ---------------------------------------------------------------------
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Ensure project root is on sys.path so imports work when running from tools/
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backbone.chunking.column_detector import (
+    ENGINE_CHAIN,
+    ENGINE_DENSITY,
+    LEFT_TOLERANCE,
+    MIN_CLUSTER_SIZE,
+    ColumnDetector,
+    ColumnDetectorConfig,
+)
+
+
+# ---------------------------------------------------------------------
+# Synthetic data
+# ---------------------------------------------------------------------
+
+def make_lines(n_lines: int, n_pages: int, seed: int = 0):
+    """(pages, x0, true column count per line): 3-5 columns per page plus indented / stray lines."""
+    rng = np.random.default_rng(seed)
+    pages = np.sort(rng.integers(1, n_pages + 1, size=n_lines))
+    x0 = np.empty(n_lines, dtype=np.float64)
+
+    n_cols = rng.integers(3, 6, size=n_pages + 1)
+    col_left = {p: 72.0 + 560.0 * np.arange(n_cols[p]) for p in range(1, n_pages + 1)}
+
+    kind = rng.random(n_lines)
+    for i, p in enumerate(pages.tolist()):
+        lefts = col_left[p]
+        base = lefts[rng.integers(0, lefts.size)]
+        if kind[i] < 0.75:
+            x0[i] = base + rng.normal(0.0, 1.5)  # column edge
+        elif kind[i] < 0.95:
+            x0[i] = base + rng.choice([18.0, 36.0, 54.0])  # sub-items / indents
+        else:
+            x0[i] = base + rng.uniform(60.0, 500.0)  # centred titles, strays
+    return pages, x0, n_cols[pages]
+
+
+# ---------------------------------------------------------------------
+# Reference: the original pure-Python chaining loop (single page)
+# ---------------------------------------------------------------------
+
+def legacy_chain(x0: List[float]) -> List[int]:
+    left_edges = sorted((x, i) for i, x in enumerate(x0))
+    clusters: List[List[int]] = []
+    current: List[int] = []
+    last_x: Optional[float] = None
+    for x, i in left_edges:
+        if last_x is None or abs(x - last_x) <= LEFT_TOLERANCE:
+            current.append(i)
+        else:
+            if current:
+                clusters.append(current)
+            current = [i]
+        last_x = x
+    if current:
+        clusters.append(current)
+
+    big = [cl for cl in clusters if len(cl) >= MIN_CLUSTER_SIZE]
+    use = big if big else clusters
+    out = [0] * len(x0)
+    for col, cl in enumerate(use, start=1):
+        for i in cl:
+            out[i] = col
+    return out
+
+
+def per_page(pages: np.ndarray, x0: np.ndarray, fn: Callable[[np.ndarray], np.ndarray]) -> np.ndarray:
+    out = np.zeros(x0.size, dtype=np.int64)
+    bounds = np.flatnonzero(np.diff(pages)) + 1
+    for idx in np.split(np.arange(x0.size), bounds):
+        out[idx] = fn(x0[idx])
+    return out
+
+
+def best_of(repeat: int, fn: Callable[[], np.ndarray]):
+    best = None
+    result = None
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+# ---------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark ColumnDetector engines.")
+    parser.add_argument("--lines", type=int, default=50000, help="Total text lines (default: 50000).")
+    parser.add_argument("--pages", type=int, default=100, help="Pages to spread them over (default: 100).")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per variant; best time is reported.")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    pages, x0, truth = make_lines(args.lines, args.pages, args.seed)
+
+    chain = ColumnDetector(ColumnDetectorConfig(engine=ENGINE_CHAIN))
+    density = ColumnDetector(ColumnDetectorConfig(engine=ENGINE_DENSITY))
+    zeros = lambda a: np.zeros(a.size, dtype=np.int64)
+
+    variants: Dict[str, Callable[[], np.ndarray]] = {
+        "python chain (per page)": lambda: per_page(
+            pages, x0, lambda a: np.asarray(legacy_chain(a.tolist()))
+        ),
+        "numpy chain (per page)": lambda: per_page(
+            pages, x0, lambda a: chain.column_indices(zeros(a), a)
+        ),
+        "numpy chain (batched)": lambda: chain.column_indices(pages, x0),
+        "numpy density (batched)": lambda: density.column_indices(pages, x0),
+    }
+
+    print(f">>> {args.lines} lines over {args.pages} pages (best of {args.repeat})\n")
+    print(f"{'variant':<28} {'ms':>9} {'lines/s':>12} {'correct':>8}")
+
+    results = {}
+    baseline = None
+    for name, fn in variants.items():
+        elapsed, cols = best_of(args.repeat, fn)
+        results[name] = cols
+        baseline = baseline or elapsed
+        correct = np.mean(
+            [cols[pages == p].max(initial=0) == truth[pages == p][0] for p in np.unique(pages)]
+        )
+        print(
+            f"{name:<28} {elapsed * 1e3:9.1f} {args.lines / elapsed:12,.0f} "
+            f"{correct:8.0%}   x{baseline / elapsed:.1f}"
+        )
+
+    ref = results["python chain (per page)"]
+    ok = all(
+        np.array_equal(ref, results[k])
+        for k in ("numpy chain (per page)", "numpy chain (batched)")
+    )
+    print(f"\n>>> chain engine matches original loop: {'yes' if ok else 'NO'}")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
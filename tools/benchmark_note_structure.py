@@ -0,0 +1,255 @@
+# benchmark_note_structure.py
+# Micro-benchmark for the shared line classifier (backbone.chunking.note_structure).
+#
+# Usage example (from project root):
+#
+#   py tools\benchmark_note_structure.py
+#
+#   py tools\benchmark_note_structure.py --json exports\<run>\notes.json --repeat 5
+#
+# This will:
+#   1. Collect text lines from --json (any notes / stage JSON; every string
+#      "text" / "content" field, recursively) or generate --lines synthetic
+#      plan-note lines
+#   2. Time the per-stage checks this classifier replaced (grouper numbered /
+#      bullet tests, fix_split BULLET_RE, visual_confidence bullet tuple scan,
+#      the three header regex rules) against one classify_line() pass, cold
+#      and warm (the cache primed by an earlier stage's pass over the same
+#      lines), and line_role() reusing labels cached on chunks
+#   3. Check every stage's decision is unchanged
+#
+# The warm figure only holds while the document's distinct lines fit the
+# classify_line cache; past that the LRU evicts every line before the next
+# stage asks for it again, so it is reported as not applicable.
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# ---------------------------------------------------------------------
+# Project root / imports
+# ---------------------------------------------------------------------
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Ensure project root is on sys.path so imports work when running from tools/
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backbone.chunking.note_structure import (
+    KIND_LETTER,
+    KIND_NUMBER,
+    KIND_PAREN,
+    KIND_SYMBOL,
+    LineRole,
+    classify_line,
+    line_role,
+)
+
+
+# ---------------------------------------------------------------------
+# Reference: the per-stage checks before note_structure
+# ---------------------------------------------------------------------
+
+_FIX_BULLET_RE = re.compile(r"^\s*(?:\d{1,3}[\.)]|[A-Z][\.)]|[-*•+])(?:\s+|$)", flags=re.UNICODE)
+_VC_BULLETS = (
+    "1.", "2.", "3.", "4.", "5.", "6.", "7.", "8.", "9.", "10.",
+    "(1)", "(2)", "(3)", "(4)", "(5)", "(6)", "(7)",
+    "A.", "B.", "C.", "D.", "E.", "F.", "G.",
+)
+_NOTES_RE = re.compile(r"\bNOTES\b", re.IGNORECASE)
+_BAD_CONTEXT_RE = re.compile(r"\b(SEE|REFER TO)\b", re.IGNORECASE)
+_CONT_RE = re.compile(r"\bCONT(?:'D|INUED|\.|’D)?\b", re.IGNORECASE)
+_HEADER_SHAPE_RE = re.compile(r"^[A-Z0-9\s/&'’\-(),.:]+$")
+_PROMOTE_RE = re.compile(r"^[A-Z0-9\s\-\(\)\'\.\&\/]+NOTES(\s*\(CONT\'D\))?:\s*$")
+_VIS_RE = re.compile(r"^[A-Z0-9&/\-\s]{4,90}NOTES(?:\s*\([^)]*\))?:?$")
+
+
+def _ratio(s: str) -> float:
+    letters = [c for c in s if c.isalpha()]
+    return sum(1 for c in letters if c.isupper()) / len(letters) if letters else 0.0
+
+
+def legacy_flags(text: str) -> tuple:
+    t = text.lstrip()
+    numbered = len(t) >= 2 and t[0].isdigit() and t[1] in ".) "
+    bullet = bool(t) and t[0] in {"•", "-", "*"}
+    fix = bool(_FIX_BULLET_RE.match(text))
+    ts = text.strip()
+    vc = any(ts.startswith(b) for b in _VC_BULLETS)
+
+    s0 = re.sub(r"\s+", " ", text.strip())
+    cand = bool(s0) and bool(_NOTES_RE.search(s0))
+    if cand and _BAD_CONTEXT_RE.search(s0) and not _CONT_RE.search(s0):
+        cand = False
+    if cand and s0.endswith(".") and "(" in s0 and not _CONT_RE.search(s0):
+        cand = False
+    if cand:
+        wc = len(s0.split())
+        cand = (
+            _ratio(s0) >= 0.80
+            and 2 <= wc <= 14
+            and bool(_HEADER_SHAPE_RE.match(s0.rstrip(" :").upper()))
+        )
+    colon = bool(_PROMOTE_RE.match(s0))
+    caps = "NOTES" in s0 and _ratio(s0) >= 0.85 and bool(_VIS_RE.match(s0))
+    return numbered, bullet, fix, vc, cand, colon, caps
+
+
+_VC_NUMBERS = frozenset(str(i) for i in range(1, 11))
+_VC_PARENS = frozenset("1234567")
+_VC_LETTERS = frozenset("ABCDEFG")
+
+
+def role_flags(r: LineRole) -> tuple:
+    numbered = r.kind == KIND_NUMBER and len(r.label) == 1
+    bullet = r.kind == KIND_SYMBOL and r.label in {"•", "-", "*"}
+    fix = r.spaced and (
+        r.kind in (KIND_LETTER, KIND_SYMBOL)
+        or (r.kind == KIND_NUMBER and bool(r.sep) and len(r.label) <= 3)
+    )
+    vc = (
+        (r.kind == KIND_NUMBER and r.sep == "." and r.label in _VC_NUMBERS)
+        or (r.kind == KIND_PAREN and r.label in _VC_PARENS)
+        or (r.kind == KIND_LETTER and r.sep == "." and r.label in _VC_LETTERS)
+    )
+    return numbered, bullet, fix, bool(vc), r.header_candidate, r.header_colon, r.header_caps
+
+
+# ---------------------------------------------------------------------
+# Input lines
+# ---------------------------------------------------------------------
+
+def lines_from_json(path: Path) -> List[str]:
+    out: List[str] = []
+
+    def walk(obj: Any) -> None:
+        if isinstance(obj, dict):
+            for k, v in obj.items():
+                if k in ("text", "content") and isinstance(v, str):
+                    out.append(v)
+                else:
+                    walk(v)
+        elif isinstance(obj, list):
+            for v in obj:
+                walk(v)
+
+    walk(json.loads(path.read_text(encoding="utf-8")))
+    return out
+
+
+def make_lines(n_lines: int, seed: int = 0) -> List[str]:
+    """Plan-note-like lines: numbered / lettered / bulleted notes, continuations, headers."""
+    rng = random.Random(seed)
+    words = "ALL WORK SHALL CONFORM TO THE CITY STANDARDS CONTRACTOR PIPE INLET GRADE".split()
+    heads = ["GENERAL NOTES:", "SITE UTILITY NOTES (CONT'D):", "GRADING NOTES", "(SEE DRAINAGE NOTES)."]
+    out = []
+    for _ in range(n_lines):
+        body = " ".join(rng.choice(words) for _ in range(rng.randint(3, 12)))
+        k = rng.random()
+        if k < 0.25:
+            out.append(f"{rng.randint(1, 40)}. {body}")
+        elif k < 0.30:
+            out.append(f"{rng.choice('ABCDEFGH')}) {body}")
+        elif k < 0.35:
+            out.append(f"({rng.randint(1, 9)}) {body}")
+        elif k < 0.40:
+            out.append(f"{rng.choice('•-*')} {body}")
+        elif k < 0.44:
+            out.append(rng.choice(heads))
+        else:
+            out.append(body.lower() if rng.random() < 0.3 else body)
+    return out
+
+
+def best_of(repeat: int, fn: Callable[[], Any], setup: Optional[Callable[[], None]] = None):
+    best = None
+    result = None
+    for _ in range(max(1, repeat)):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+# ---------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the shared note-structure classifier.")
+    parser.add_argument("--json", default=None, help="Notes / stage JSON to take lines from.")
+    parser.add_argument(
+        "--lines", type=int, default=20000,
+        help="Synthetic lines when --json is not given (default: 20000, a large plan set).",
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per variant; best time is reported.")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    texts = lines_from_json(Path(args.json)) if args.json else make_lines(args.lines, args.seed)
+    n = len(texts)
+    chunks: List[Dict[str, Any]] = [{"text": t, "metadata": {}} for t in texts]
+    distinct = len(set(texts))
+    cache_size = classify_line.cache_parameters()["maxsize"]
+    fits = cache_size is None or distinct <= cache_size
+
+    def prime() -> None:
+        # An earlier stage has already classified every line of the document.
+        classify_line.cache_clear()
+        for t in texts:
+            classify_line(t)
+
+    variants = {
+        "per-stage regexes": (lambda: [legacy_flags(t) for t in texts], None),
+        "classify_line (cold)": (
+            lambda: [role_flags(classify_line(t)) for t in texts],
+            classify_line.cache_clear,
+        ),
+        "classify_line (warm)": (lambda: [role_flags(classify_line(t)) for t in texts], prime),
+        "line_role (cached on chunk)": (
+            lambda: [role_flags(line_role(c)) for c in chunks],
+            classify_line.cache_clear,
+        ),
+    }
+
+    # Seed the per-chunk labels so the last variant measures reuse.
+    for c in chunks:
+        line_role(c)
+
+    print(f">>> {n} lines, {distinct} distinct, classify_line cache {cache_size} (best of {args.repeat})\n")
+    print(f"{'variant':<30} {'ms':>9} {'lines/s':>12}")
+
+    results = {}
+    baseline = None
+    for name, (fn, setup) in variants.items():
+        elapsed, flags = best_of(args.repeat, fn, setup)
+        results[name] = flags
+        baseline = baseline or elapsed
+        if name == "classify_line (warm)" and not fits:
+            print(f"{name:<30} {'n/a':>9}   (distinct lines exceed the cache; every lookup misses)")
+            continue
+        print(f"{name:<30} {elapsed * 1e3:9.1f} {n / max(elapsed, 1e-9):12,.0f}   x{baseline / elapsed:.1f}")
+
+    ref = results["per-stage regexes"]
+    ok = all(results[k] == ref for k in results)
+    print(f"\n>>> every stage's decision unchanged: {'yes' if ok else 'NO'}")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -35,9 +35,19 @@ from __future__ import annotations
 
 import argparse
 import json
+import sys
 from dataclasses import dataclass, field
+from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+ROOT = Path(__file__).resolve().parents[1]
+
+# Ensure project root is on sys.path so imports work when running from tools/
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backbone.intake.word_index import MODE_CENTER, WordIndex
+
 
 # ---------------------------------------------------------------------
 # Basic geometry helpers
@@ -339,16 +349,13 @@ def classify_boxes_for_page(
     # Index chunks by idx for quick lookup
     chunks_by_idx: Dict[int, Chunk] = {c.idx: c for c in page_chunks}
 
-    # Attach chunks to boxes (by center point)
+    # Attach chunks to boxes (by center point), through one index per page
+    chunk_index = WordIndex.from_boxes(
+        [(c.bbox.x0, c.bbox.y0, c.bbox.x1, c.bbox.y1) for c in page_chunks]
+    )
     for b in boxes:
-        b.chunk_indices.clear()
-
-    for ch in page_chunks:
-        cx = ch.bbox.cx
-        cy = ch.bbox.cy
-        for b in boxes:
-            if b.bbox.contains_point(cx, cy, margin=0.0):
-                b.chunk_indices.append(ch.idx)
+        rows = chunk_index.indices_in_rect((b.bbox.x0, b.bbox.y0, b.bbox.x1, b.bbox.y1), MODE_CENTER)
+        b.chunk_indices[:] = [page_chunks[i].idx for i in rows.tolist()]
 
     # First-pass classification
     for b in boxes:
@@ -20,10 +20,12 @@ from typing import Any, Dict, List, Optional
 
 from pathlib import Path
 
+import stage_binary
+
 
 def parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser(description="Debug-dump chunks for a page.")
-    p.add_argument("--json", required=True, help="Notes JSON file.")
+    p.add_argument("--json", required=True, help="Notes JSON (or binary .stage) file.")
     p.add_argument("--page", type=int, required=True, help="1-based page number.")
     p.add_argument(
         "--limit",
@@ -85,22 +87,46 @@ def load_chunks(path: str) -> List[Dict[str, Any]]:
     raise ValueError("Unsupported JSON structure")
 
 
-def main() -> None:
-    args = parse_args()
-    chunks = load_chunks(args.json)
-
-    # Filter by page
-    page_chunks: List[Dict[str, Any]] = []
-    for idx, ch in enumerate(chunks):
-        page_no = ch.get("page") or ch.get("page_number") or ch.get("page_index")
-        try:
-            page_no = int(page_no)
-        except Exception:
-            continue
-        if page_no == args.page:
+def chunk_page(ch: Dict[str, Any]) -> Optional[int]:
+    """Page number of a chunk ("page", else "page_number", else "page_index")."""
+    page_no = ch.get("page") or ch.get("page_number") or ch.get("page_index")
+    try:
+        return int(page_no)
+    except Exception:
+        return None
+
+
+def load_page_chunks(path: str, page: int) -> List[Dict[str, Any]]:
+    """Chunks on *page* with their "_global_index" in the full chunk list."""
+    page_chunks = []
+    if stage_binary.is_stage_file(path):
+        # Binary stage: read only the pages that can resolve to *page*. The
+        # index is keyed by str(chunk["page"]); a non-zero integer key is
+        # that page, anything else ("None", "0", "3.0", ...) is resolved per
+        # chunk like the JSON path does.
+        with stage_binary.StageFile(path) as sf:
+            for key in sf.page_keys():
+                if key.isdigit() and int(key) and int(key) != page:
+                    continue
+                indices = sf.original_indices(key).tolist()
+                for idx, ch in zip(indices, sf.read_page(key)):
+                    if isinstance(ch, dict) and chunk_page(ch) == page:
+                        ch["_global_index"] = idx
+                        page_chunks.append(ch)
+        page_chunks.sort(key=lambda ch: ch["_global_index"])
+        return page_chunks
+
+    for idx, ch in enumerate(load_chunks(path)):
+        if chunk_page(ch) == page:
             ch = dict(ch)
             ch["_global_index"] = idx
             page_chunks.append(ch)
+    return page_chunks
+
+
+def main() -> None:
+    args = parse_args()
+    page_chunks = load_page_chunks(args.json, args.page)
 
     # Sort by y0 then index
     def sort_key(ch: Dict[str, Any]):
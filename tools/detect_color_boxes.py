@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+"""
+detect_color_boxes.py
+
+Run the color-coded box auto-detector (backbone.visual.auto_box_detector)
+over one or more pages of an annotated/labeled PDF.
+
+The document is opened once for the whole batch, and every page is labelled
+for all color classes in a single pass over its raster. With --coarse-dpi
+the pages are searched coarse-to-fine instead of rasterized whole at --dpi;
+with --max-raster-mb pages too large for the ceiling are labelled in bands.
+
+Output JSON shape:
+
+{
+  "pdf_path": "labeled.pdf",
+  "dpi": 150,
+  "pages": {
+    "3": { "metadata": {...}, "color_classes": {...}, "page_structure": {...} },
+    ...
+  }
+}
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Ensure project root is on sys.path so imports work when running from tools/
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backbone.visual.auto_box_detector import detect_boxes_from_pdf_pages
+
+
+# ---------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Detect color-coded annotation boxes on PDF pages."
+    )
+    parser.add_argument(
+        "--pdf",
+        required=True,
+        help="Path to the annotated PDF.",
+    )
+    parser.add_argument(
+        "--out",
+        required=True,
+        help="Path to output JSON (e.g. exports/color_boxes.json).",
+    )
+    parser.add_argument(
+        "--pages",
+        nargs="*",
+        type=int,
+        default=None,
+        help="Optional list of 1-based page numbers to process; "
+             "if omitted, all pages are processed.",
+    )
+    parser.add_argument(
+        "--dpi",
+        type=int,
+        default=150,
+        help="Rasterization DPI for detection (default: 150).",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=int,
+        default=10,
+        help="Per-channel color tolerance (default: 10).",
+    )
+    parser.add_argument(
+        "--coarse-dpi",
+        type=int,
+        default=None,
+        help="Find boxes at this DPI (e.g. 36) and refine their edges on "
+             "full-DPI clips instead of rasterizing whole pages at --dpi.",
+    )
+    parser.add_argument(
+        "--max-raster-mb",
+        type=float,
+        default=None,
+        help="Memory ceiling per page (MB); larger pages are processed in "
+             "horizontal bands with identical results.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+
+    pdf_path = Path(args.pdf)
+    out_path = Path(args.out)
+
+    if not pdf_path.is_file():
+        raise FileNotFoundError(f"PDF not found: {pdf_path}")
+
+    t0 = time.perf_counter()
+    results = detect_boxes_from_pdf_pages(
+        str(pdf_path),
+        pages=args.pages,
+        dpi=args.dpi,
+        color_tolerance=args.tolerance,
+        coarse_dpi=args.coarse_dpi,
+        max_raster_mb=args.max_raster_mb,
+    )
+    elapsed = time.perf_counter() - t0
+
+    payload = {
+        "pdf_path": str(pdf_path),
+        "dpi": args.dpi,
+        "pages": {str(page_num): result for page_num, result in results.items()},
+    }
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with out_path.open("w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+
+    print(f"Wrote color boxes for {len(results)} page(s) to {out_path} ({elapsed:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
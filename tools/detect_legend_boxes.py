@@ -16,6 +16,9 @@ Changes in this version:
       its bounding rectangle
     * softer area and aspect-ratio filters
 - This is meant to "just find the big wide box" near the bottom-right.
+- --max-raster-mb: pages whose full-DPI working set would exceed the
+  ceiling are rendered and edge-detected in horizontal bands
+  (backbone.visual.tiled_raster), with identical results.
 
 Output JSON shape:
 
@@ -32,6 +35,7 @@ from __future__ import annotations
 
 import argparse
 import json
+import sys
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
@@ -39,9 +43,25 @@ import fitz  # PyMuPDF
 import cv2
 import numpy as np
 
+ROOT = Path(__file__).resolve().parents[1]
+
+# Ensure project root is on sys.path so imports work when running from tools/
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backbone.intake.document_pool import open_document
+from backbone.visual.tiled_raster import canny_banded, exceeds_limit
+
 
 LegendBox = Tuple[float, float, float, float]
 
+CANNY_LOW = 50
+CANNY_HIGH = 150
+
+# Working set per raster pixel of the edge pipeline (raster, grayscale,
+# blurred, Canny buffers, labels), for the --max-raster-mb ceiling.
+EDGE_BYTES_PER_PIXEL = 16.0
+
 
 # ---------------------------------------------------------------------
 # PDF → image
@@ -109,13 +129,31 @@ def detect_legend_box_on_image(
     Returns:
         (x0, y0, x1, y1) in pixel coordinates, or None if none found.
     """
-    h, w, _ = img_bgr.shape
-    page_area = float(h * w)
+    edges = cv2.Canny(smooth_gray(img_bgr), threshold1=CANNY_LOW, threshold2=CANNY_HIGH)
 
+    return detect_legend_box_on_edges(
+        edges,
+        min_area_frac=min_area_frac,
+        max_area_frac=max_area_frac,
+        min_aspect_ratio=min_aspect_ratio,
+    )
+
+
+def smooth_gray(img_bgr: np.ndarray) -> np.ndarray:
+    """Grayscale, lightly blurred image that Canny runs on."""
     gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
-    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+    return cv2.GaussianBlur(gray, (5, 5), 0)
 
-    edges = cv2.Canny(blurred, threshold1=50, threshold2=150)
+
+def detect_legend_box_on_edges(
+    edges: np.ndarray,
+    min_area_frac: float = 0.005,
+    max_area_frac: float = 0.60,
+    min_aspect_ratio: float = 1.5,
+) -> Optional[Tuple[int, int, int, int]]:
+    """:func:`detect_legend_box_on_image` on a precomputed Canny edge map."""
+    h, w = edges.shape[:2]
+    page_area = float(h * w)
 
     # Focus on bottom ~60% of the page
     y_start = int(h * 0.4)
@@ -219,6 +257,7 @@ def detect_legend_boxes_for_pdf(
     pdf_path: Path,
     pages: Optional[List[int]] = None,
     dpi: int = 200,
+    max_raster_mb: Optional[float] = None,
 ) -> Dict[int, LegendBox]:
     """
     Detect legend boxes for selected pages of a PDF.
@@ -228,36 +267,56 @@ def detect_legend_boxes_for_pdf(
         pages: list of 1-based page numbers to process. If None,
                process all pages.
         dpi: rasterization resolution for detection.
+        max_raster_mb: memory ceiling per page; larger pages are rendered
+                       and edge-detected in bands.
 
     Returns:
         Dict mapping page_number (1-based) -> LegendBox (x0,y0,x1,y1 in PDF coords).
     """
     result: Dict[int, LegendBox] = {}
 
-    with fitz.open(pdf_path) as doc:
-        num_pages = doc.page_count
+    doc = open_document(pdf_path)
+    num_pages = doc.page_count
 
-        if pages is None:
-            target_indices = list(range(num_pages))
+    if pages is None:
+        target_indices = list(range(num_pages))
+    else:
+        target_indices = []
+        for p in pages:
+            if p < 1 or p > num_pages:
+                raise ValueError(f"Page {p} is out of range 1..{num_pages}")
+            target_indices.append(p - 1)
+
+    for page_index in target_indices:
+        page_num = page_index + 1
+
+        if exceeds_limit(doc[page_index], dpi, EDGE_BYTES_PER_PIXEL, max_raster_mb):
+            page_rect = doc[page_index].rect
+            edges = canny_banded(
+                doc[page_index],
+                dpi,
+                smooth_gray,
+                CANNY_LOW,
+                CANNY_HIGH,
+                memory_limit_mb=max_raster_mb,
+                bytes_per_pixel=EDGE_BYTES_PER_PIXEL,
+            )
+            img_shape = (edges.shape[0], edges.shape[1], 3)
+            pixel_box = detect_legend_box_on_edges(edges)
+            del edges
         else:
-            target_indices = []
-            for p in pages:
-                if p < 1 or p > num_pages:
-                    raise ValueError(f"Page {p} is out of range 1..{num_pages}")
-                target_indices.append(p - 1)
-
-        for page_index in target_indices:
-            page_num = page_index + 1
             img_bgr, page_rect = render_page_to_bgr_array(doc, page_index, dpi=dpi)
-
+            img_shape = img_bgr.shape
             pixel_box = detect_legend_box_on_image(img_bgr)
-            if pixel_box is None:
-                print(f"[warn] No legend box detected on page {page_num}")
-                continue
+            del img_bgr
 
-            pdf_box = transform_pixel_box_to_pdf(pixel_box, page_rect, img_bgr.shape)
-            result[page_num] = pdf_box
-            print(f"[info] Page {page_num}: legend box (PDF coords) = {pdf_box}")
+        if pixel_box is None:
+            print(f"[warn] No legend box detected on page {page_num}")
+            continue
+
+        pdf_box = transform_pixel_box_to_pdf(pixel_box, page_rect, img_shape)
+        result[page_num] = pdf_box
+        print(f"[info] Page {page_num}: legend box (PDF coords) = {pdf_box}")
 
     return result
 
@@ -295,6 +354,13 @@ def parse_args() -> argparse.Namespace:
         default=200,
         help="Rasterization DPI for detection (default: 200).",
     )
+    parser.add_argument(
+        "--max-raster-mb",
+        type=float,
+        default=None,
+        help="Memory ceiling per page (MB); larger pages are rendered and "
+             "edge-detected in horizontal bands with identical results.",
+    )
     return parser.parse_args()
 
 
@@ -307,7 +373,12 @@ def main() -> None:
     if not pdf_path.is_file():
         raise FileNotFoundError(f"PDF not found: {pdf_path}")
 
-    legend_boxes = detect_legend_boxes_for_pdf(pdf_path, pages=args.pages, dpi=args.dpi)
+    legend_boxes = detect_legend_boxes_for_pdf(
+        pdf_path,
+        pages=args.pages,
+        dpi=args.dpi,
+        max_raster_mb=args.max_raster_mb,
+    )
 
     payload = {
         "pdf_path": str(pdf_path),
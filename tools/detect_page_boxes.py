@@ -11,6 +11,26 @@ title blocks, note boxes, etc. We DO NOT try to classify them here.
 Output JSON is designed to be consumed by later stages that will do
 semantic classification (legend vs table vs title block, etc.).
 
+With --coarse-dpi (e.g. 36) candidates are found on a low-DPI render and
+each box edge is then located on full-DPI clip renders of narrow strips
+around it, so large sheets are never rasterized whole at --dpi. A candidate
+is only snapped when every strip shows one unbroken frame line running its
+whole side (or the same number of them on all sides, for concentric
+borders); a snapped frame lies within the thickness of its frame line (a
+few pixels) of a full-pass frame. Candidates that are ambiguous, such as
+frames a few points apart fused at coarse DPI, table rows, or broken sides,
+get the full-DPI contour pass on a window around them instead. Only small
+text-blob candidates near the size threshold can still be missed, since
+text merges into larger blobs at coarse DPI. Where the strip and window
+renders would cost more pixels than the page itself (ordinary dense sheets,
+estimated from the coarse boxes before any strip is rendered), the page is
+simply rendered whole, so --coarse-dpi only pays off on sparse sheets.
+
+With --max-raster-mb, pages whose full-DPI working set would exceed the
+ceiling are rendered and edge-detected in horizontal bands
+(backbone.visual.tiled_raster); the edge map, and so the boxes, are
+identical to the whole-page pass.
+
 Example output structure:
 
 {
@@ -39,6 +59,8 @@ from __future__ import annotations
 
 import argparse
 import json
+import math
+import sys
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -46,6 +68,16 @@ import cv2
 import fitz  # PyMuPDF
 import numpy as np
 
+ROOT = Path(__file__).resolve().parents[1]
+
+# Ensure project root is on sys.path so imports work when running from tools/
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backbone.intake.document_pool import open_document
+from backbone.visual.auto_box_detector import antialiasing_off
+from backbone.visual.tiled_raster import CANNY_HALO, canny_banded, exceeds_limit
+
 
 # ---------------------------------------------------------------------
 # Types
@@ -56,6 +88,34 @@ BoxPx = Tuple[int, int, int, int]  # x0, y0, x1, y1 in pixel space
 BoxPdf = Tuple[float, float, float, float]  # x0, y0, x1, y1 in PDF coords
 
 
+# Coarse-to-fine: coarse pixels searched on each side of a coarse box edge
+# (blur + dilation put coarse contours up to ~3 coarse pixels off the line),
+# and the share of the edge's length a strip row / column must cover with
+# edge pixels to count as the frame line.
+REFINE_MARGIN = 4
+LINE_FILL_FRAC = 0.5
+
+# Line rows of a strip closer than this (PDF points) are one frame line.
+LINE_JOIN_PT = 4.0
+
+# Rows / columns at the cut sides of a clip render whose edge map differs
+# from the whole page's: Canny context (blur, Sobel, suppression) + dilation.
+EDGE_WINDOW_HALO = CANNY_HALO + 1
+
+# Share of the page's pixels the edge strips may cost before the page is
+# rendered whole instead. Long thin clip renders cost about twice as much
+# per pixel as the whole page, and ambiguous candidates still need their
+# windows on top, so strips past half the page never pay off.
+STRIP_BUDGET_FRAC = 0.5
+
+CANNY_LOW = 50
+CANNY_HIGH = 150
+
+# Working set per raster pixel of the edge pipeline (raster, grayscale,
+# blurred, Canny buffers, labels), for the --max-raster-mb ceiling.
+EDGE_BYTES_PER_PIXEL = 16.0
+
+
 # ---------------------------------------------------------------------
 # PDF → image
 # ---------------------------------------------------------------------
@@ -80,15 +140,17 @@ def render_page_to_bgr_array(
     mat = fitz.Matrix(zoom, zoom)
     pix = page.get_pixmap(matrix=mat, alpha=False)
 
+    return pixmap_to_bgr_array(pix), page_rect
+
+
+def pixmap_to_bgr_array(pix: fitz.Pixmap) -> np.ndarray:
+    """View a pixmap as an (H, W, 3) image (OpenCV format)."""
     img = np.frombuffer(pix.samples, dtype=np.uint8)
     img = img.reshape(pix.height, pix.width, pix.n)
 
     if pix.n == 4:
-        img_bgr = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
-    else:
-        img_bgr = img
-
-    return img_bgr, page_rect
+        return cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
+    return img
 
 
 # ---------------------------------------------------------------------
@@ -116,25 +178,36 @@ def detect_boxes_on_image(
     Returns:
         List of tuples: (bbox_px, area_frac, is_page_border_hint)
     """
-    h, w, _ = img_bgr.shape
-    page_area = float(h * w)
+    return detect_boxes_on_edge_map(
+        edge_map(img_bgr),
+        min_area_frac=min_area_frac,
+        min_size_px=min_size_px,
+    )
 
-    gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
-    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
 
-    # Edge detection
-    edges = cv2.Canny(blurred, threshold1=50, threshold2=150)
+def detect_boxes_on_edge_map(
+    edges: np.ndarray,
+    min_area_frac: float = 0.0005,
+    min_size_px: int = 12,
+) -> List[Tuple[BoxPx, float, bool]]:
+    """:func:`detect_boxes_on_image` on a precomputed :func:`edge_map`."""
+    h, w = edges.shape[:2]
+    boxes = filter_frame_boxes(contour_boxes(edges), (w, h), min_area_frac, min_size_px)
 
-    # Light dilation to close tiny gaps in lines
-    kernel = np.ones((3, 3), np.uint8)
-    edges = cv2.dilate(edges, kernel, iterations=1)
+    # Sort by area descending so larger frames get lower IDs (more stable)
+    boxes.sort(key=lambda item: item[1], reverse=True)
+
+    return boxes
 
+
+def contour_boxes(edges: np.ndarray) -> List[BoxPx]:
+    """Bounding boxes of the (polygon-approximated) contours of an edge map."""
     # Find contours. RETR_LIST = all contours, no hierarchy assumptions.
     contours, _ = cv2.findContours(
         edges, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE
     )
 
-    boxes: List[Tuple[BoxPx, float, bool]] = []
+    boxes: List[BoxPx] = []
 
     for cnt in contours:
         if cv2.contourArea(cnt) < 10:
@@ -144,6 +217,28 @@ def detect_boxes_on_image(
         approx = cv2.approxPolyDP(cnt, epsilon, True)
 
         x, y, w_box, h_box = cv2.boundingRect(approx)
+        boxes.append((x, y, x + w_box, y + h_box))
+
+    return boxes
+
+
+def filter_frame_boxes(
+    boxes_px: List[BoxPx],
+    size: Tuple[int, int],
+    min_area_frac: float,
+    min_size_px: int,
+) -> List[Tuple[BoxPx, float, bool]]:
+    """
+    Keep the boxes large enough to be frames on a *size* (width, height)
+    raster, as (bbox_px, area_frac, is_page_border_hint).
+    """
+    w, h = size
+    page_area = float(w * h)
+
+    boxes: List[Tuple[BoxPx, float, bool]] = []
+
+    for x0, y0, x1, y1 in boxes_px:
+        w_box, h_box = x1 - x0, y1 - y0
 
         if w_box < min_size_px or h_box < min_size_px:
             # Too small; likely noise or tiny grid cell
@@ -154,8 +249,6 @@ def detect_boxes_on_image(
         if area_frac < min_area_frac:
             continue
 
-        x0, y0, x1, y1 = x, y, x + w_box, y + h_box
-
         # Heuristic: is this basically the full page border?
         is_page_border = (
             w_box > 0.95 * w and h_box > 0.95 * h
@@ -163,12 +256,319 @@ def detect_boxes_on_image(
 
         boxes.append(((x0, y0, x1, y1), area_frac, is_page_border))
 
-    # Sort by area descending so larger frames get lower IDs (more stable)
-    boxes.sort(key=lambda item: item[1], reverse=True)
-
     return boxes
 
 
+def smooth_gray(img_bgr: np.ndarray) -> np.ndarray:
+    """Grayscale, lightly blurred image that Canny runs on."""
+    gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
+    return cv2.GaussianBlur(gray, (5, 5), 0)
+
+
+def edge_map(img_bgr: np.ndarray) -> np.ndarray:
+    """Binary edge image (255 = edge) that box contours are traced on."""
+    # Edge detection
+    edges = cv2.Canny(smooth_gray(img_bgr), threshold1=CANNY_LOW, threshold2=CANNY_HIGH)
+
+    # Light dilation to close tiny gaps in lines
+    kernel = np.ones((3, 3), np.uint8)
+    return cv2.dilate(edges, kernel, iterations=1)
+
+
+def edge_map_banded(
+    page: fitz.Page,
+    dpi: int,
+    max_raster_mb: float,
+) -> np.ndarray:
+    """
+    :func:`edge_map` of the *dpi* render of *page*, rendered and edge-
+    detected in horizontal bands under *max_raster_mb*. Identical to the
+    whole-page result; only the 1-byte edge map itself is page-sized.
+    """
+    edges = canny_banded(
+        page,
+        dpi,
+        smooth_gray,
+        CANNY_LOW,
+        CANNY_HIGH,
+        memory_limit_mb=max_raster_mb,
+        bytes_per_pixel=EDGE_BYTES_PER_PIXEL,
+    )
+    kernel = np.ones((3, 3), np.uint8)
+    return cv2.dilate(edges, kernel, dst=edges, iterations=1)
+
+
+# ---------------------------------------------------------------------
+# Coarse-to-fine detection
+# ---------------------------------------------------------------------
+
+
+def render_edge_window(
+    display_list: fitz.DisplayList,
+    zoom: float,
+    window: BoxPx,
+) -> Tuple[np.ndarray, Tuple[int, int]]:
+    """:func:`edge_map` of the full-DPI render of *window* (pixels), and its origin."""
+    x0, y0, x1, y1 = window
+    clip = fitz.Rect(x0 / zoom, y0 / zoom, x1 / zoom, y1 / zoom)
+    pix = display_list.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=clip, alpha=False)
+    return edge_map(pixmap_to_bgr_array(pix)), (pix.x, pix.y)
+
+
+def line_runs(profile: np.ndarray, span: int, join: int) -> List[np.ndarray]:
+    """
+    Strip rows (columns) where at least LINE_FILL_FRAC of *span* are edge
+    pixels, grouped into lines: rows less than *join* apart belong to one
+    line (the two Canny edges of a stroke, dilated).
+    """
+    rows = np.flatnonzero(profile >= LINE_FILL_FRAC * span)
+    if rows.size == 0:
+        return []
+    return np.split(rows, np.flatnonzero(np.diff(rows) >= join) + 1)
+
+
+def refine_box_edges(
+    display_list: fitz.DisplayList,
+    zoom: float,
+    box_px: BoxPx,
+    margin: int,
+    size: Tuple[int, int],
+) -> Tuple[Optional[BoxPx], int]:
+    """
+    Snap each edge of *box_px* (full-DPI pixels, predicted from the coarse
+    pass) to the frame line around it, found on a full-DPI render of a
+    strip 2 * *margin* pixels thick around the edge.
+
+    A strip row (column) is a line candidate when at least LINE_FILL_FRAC
+    of the box width (height) are edge pixels (:func:`line_runs`); it is a
+    frame line when its edge pixels also run unbroken along the side (text
+    rows do not). Concentric frames (a sheet border and its trim line) put
+    the same number of frame lines in all four strips; they are paired from
+    the outside in, each rectangle must have its lines reach its corners,
+    and the one nearest the prediction is kept, each edge snapped to the
+    line row nearest it. Anything else (no frame line on a side, a table
+    row or neighbouring frame on one side only, a side broken in two by
+    frames fused at coarse DPI) is ambiguous and returns None.
+
+    Returns (box or None, pixels rendered).
+    """
+    width, height = size
+    x0, y0, x1, y1 = box_px
+    join = math.ceil(LINE_JOIN_PT * zoom)
+    # Allowance at the ends of a side for corners rounded by blur/dilation.
+    corner = math.ceil(margin / REFINE_MARGIN)
+    touched = 0
+
+    def along(edges: np.ndarray, rows: np.ndarray, axis: int) -> np.ndarray:
+        """Per position along the side: any edge pixel in the line's rows."""
+        return np.any(edges[rows, :], axis=0) if axis == 1 else np.any(edges[:, rows], axis=1)
+
+    def strip_lines(sx0: int, sy0: int, sx1: int, sy1: int, axis: int, outer_first: bool):
+        """(edge map, origin, frame lines outermost first) of a strip."""
+        nonlocal touched
+        sx0, sy0 = max(0, sx0), max(0, sy0)
+        sx1, sy1 = min(width, sx1), min(height, sy1)
+        if sx1 <= sx0 or sy1 <= sy0:
+            return None, (sx0, sy0), []
+        edges, origin = render_edge_window(display_list, zoom, (sx0, sy0, sx1, sy1))
+        touched += edges.shape[0] * edges.shape[1]
+        # axis=1: edge pixels per row (horizontal lines); axis=0: per column.
+        span = x1 - x0 if axis == 1 else y1 - y0
+        # The middle of the side; its ends belong to the crossing strips.
+        mid = slice(margin, max(margin, span - margin))
+        lines = [
+            rows for rows in line_runs(np.count_nonzero(edges, axis=axis), span, join)
+            if np.all(along(edges, rows, axis)[mid])
+        ]
+        return edges, origin, lines if outer_first else lines[::-1]
+
+    top = strip_lines(x0, y0 - margin, x1, y0 + margin, axis=1, outer_first=True)
+    bottom = strip_lines(x0, y1 - margin, x1, y1 + margin, axis=1, outer_first=False)
+    left = strip_lines(x0 - margin, y0, x0 + margin, y1, axis=0, outer_first=True)
+    right = strip_lines(x1 - margin, y0, x1 + margin, y1, axis=0, outer_first=False)
+
+    n_lines = len(top[2])
+    if n_lines == 0 or any(len(side[2]) != n_lines for side in (bottom, left, right)):
+        return None, touched
+
+    def snap(predicted: int, side, i: int, axis: int, exclusive: bool) -> int:
+        _, origin, lines = side
+        rows = lines[i] + origin[1 if axis == 1 else 0] + (1 if exclusive else 0)
+        return int(rows[np.argmin(np.abs(rows - predicted))])
+
+    def reaches_corners(side, i: int, axis: int, refined: BoxPx) -> bool:
+        edges, (ox, oy), lines = side
+        lo, hi = (refined[0] - ox, refined[2] - ox) if axis == 1 else (refined[1] - oy, refined[3] - oy)
+        covered = along(edges, lines[i], axis)
+        return bool(np.all(covered[max(0, lo + corner):min(covered.size, hi - corner)]))
+
+    best: Optional[BoxPx] = None
+    for i in range(n_lines):
+        refined = (
+            snap(x0, left, i, 0, exclusive=False),
+            snap(y0, top, i, 1, exclusive=False),
+            snap(x1, right, i, 0, exclusive=True),
+            snap(y1, bottom, i, 1, exclusive=True),
+        )
+        if not all(
+            reaches_corners(side, i, axis, refined)
+            for side, axis in ((top, 1), (bottom, 1), (left, 0), (right, 0))
+        ):
+            return None, touched
+        if best is None or sum(map(abs, np.subtract(refined, box_px))) < sum(map(abs, np.subtract(best, box_px))):
+            best = refined
+    return best, touched
+
+
+def _clipped_area(box: BoxPx, size: Tuple[int, int]) -> int:
+    width, height = size
+    x0, y0, x1, y1 = box
+    return max(0, min(width, x1) - max(0, x0)) * max(0, min(height, y1) - max(0, y0))
+
+
+def strip_pixels(box_px: BoxPx, margin: int, size: Tuple[int, int]) -> int:
+    """Pixels :func:`refine_box_edges` renders for *box_px* (its four strips)."""
+    x0, y0, x1, y1 = box_px
+    return sum(
+        _clipped_area(strip, size)
+        for strip in (
+            (x0, y0 - margin, x1, y0 + margin),
+            (x0, y1 - margin, x1, y1 + margin),
+            (x0 - margin, y0, x0 + margin, y1),
+            (x1 - margin, y0, x1 + margin, y1),
+        )
+    )
+
+
+def window_contour_boxes(
+    display_list: fitz.DisplayList,
+    zoom: float,
+    box_px: BoxPx,
+    pad: int,
+    size: Tuple[int, int],
+) -> Tuple[List[BoxPx], int]:
+    """
+    The full-DPI contour pass (:func:`contour_boxes`) on *box_px* grown by
+    *pad*. Only contours at least EDGE_WINDOW_HALO pixels clear of the
+    window's cut sides are kept: there the window's edge map is the page's.
+    Returns (boxes, pixels rendered).
+    """
+    width, height = size
+    window = (
+        max(0, box_px[0] - pad), max(0, box_px[1] - pad),
+        min(width, box_px[2] + pad), min(height, box_px[3] + pad),
+    )
+    edges, (ox, oy) = render_edge_window(display_list, zoom, window)
+    win_h, win_w = edges.shape
+
+    lo_x = EDGE_WINDOW_HALO if ox > 0 else 0
+    lo_y = EDGE_WINDOW_HALO if oy > 0 else 0
+    hi_x = win_w - (EDGE_WINDOW_HALO if ox + win_w < width else 0)
+    hi_y = win_h - (EDGE_WINDOW_HALO if oy + win_h < height else 0)
+
+    boxes = [
+        (bx0 + ox, by0 + oy, bx1 + ox, by1 + oy)
+        for bx0, by0, bx1, by1 in contour_boxes(edges)
+        if bx0 >= lo_x and by0 >= lo_y and bx1 <= hi_x and by1 <= hi_y
+    ]
+    return boxes, win_w * win_h
+
+
+def detect_boxes_coarse_to_fine(
+    page: fitz.Page,
+    dpi: int,
+    coarse_dpi: int,
+    min_area_frac: float = 0.0005,
+    min_size_px: int = 12,
+) -> Tuple[List[Tuple[BoxPx, float, bool]], Tuple[int, int], int]:
+    """
+    :func:`detect_boxes_on_image` for the *dpi* raster of *page*, without
+    rendering it: candidates come from an aliased *coarse_dpi* render and
+    their edges are refined with :func:`refine_box_edges`. Candidates it
+    rejects as ambiguous get the full-DPI contour pass on a window around
+    them (:func:`window_contour_boxes`).
+
+    The page is rendered whole instead as soon as the clip renders would
+    cost more pixels than the page itself: before any strip is rendered
+    when the candidates' strips alone (:func:`strip_pixels`, known from
+    the coarse boxes) would cost more than ``STRIP_BUDGET_FRAC`` of it,
+    which is the case on ordinary dense sheets, else as soon as the strips rendered plus the windows queued
+    for ambiguous candidates do. The page content is interpreted once into
+    a display list that every render replays.
+
+    Returns (boxes in full-DPI pixels, full raster (width, height), pixels
+    rendered).
+    """
+    zoom = dpi / 72.0
+    full = (page.rect * fitz.Matrix(zoom, zoom)).round()
+    w, h = full.width, full.height
+
+    display_list = page.get_displaylist()
+    with antialiasing_off():
+        coarse_pix = display_list.get_pixmap(
+            matrix=fitz.Matrix(coarse_dpi / 72.0, coarse_dpi / 72.0), alpha=False
+        )
+    touched = coarse_pix.width * coarse_pix.height
+
+    sx = w / coarse_pix.width
+    sy = h / coarse_pix.height
+    coarse_boxes = detect_boxes_on_image(
+        pixmap_to_bgr_array(coarse_pix),
+        min_area_frac=min_area_frac,
+        min_size_px=max(1, int(min_size_px / max(sx, sy))),
+    )
+    margin = math.ceil(REFINE_MARGIN * max(sx, sy))
+    pad = margin + EDGE_WINDOW_HALO
+    budget = w * h
+
+    def whole_page(touched: int):
+        pix = display_list.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+        boxes = detect_boxes_on_image(pixmap_to_bgr_array(pix), min_area_frac, min_size_px)
+        return boxes, (w, h), touched + w * h
+
+    candidates = [
+        (
+            int(round(cx0 * sx)), int(round(cy0 * sy)),
+            int(round(cx1 * sx)), int(round(cy1 * sy)),
+        )
+        for (cx0, cy0, cx1, cy1), _, _ in coarse_boxes
+    ]
+    # Dense sheets (many frames, table cells): the strips alone would cost
+    # as much as the page, so render it whole without refining anything.
+    strips = sum(strip_pixels(box, margin, (w, h)) for box in candidates)
+    if touched + strips > STRIP_BUDGET_FRAC * budget:
+        return whole_page(touched)
+
+    snapped: List[BoxPx] = []
+    ambiguous: List[BoxPx] = []
+    window_pixels = 0
+    for predicted in candidates:
+        box, n = refine_box_edges(display_list, zoom, predicted, margin, (w, h))
+        touched += n
+        if box is not None:
+            snapped.append(box)
+        else:
+            ambiguous.append(predicted)
+            x0, y0, x1, y1 = predicted
+            window_pixels += _clipped_area((x0 - pad, y0 - pad, x1 + pad, y1 + pad), (w, h))
+        # Stacked frames / tables fused at coarse DPI: once the strips plus
+        # the queued windows cost more than the page, run the page whole.
+        if touched + window_pixels > budget:
+            return whole_page(touched)
+
+    # Exact full-DPI contours; a set, since overlapping windows find the
+    # same contour.
+    exact: set = set()
+    for predicted in ambiguous:
+        found, n = window_contour_boxes(display_list, zoom, predicted, pad, (w, h))
+        exact.update(found)
+        touched += n
+
+    boxes = filter_frame_boxes(snapped + sorted(exact), (w, h), min_area_frac, min_size_px)
+    boxes.sort(key=lambda item: item[1], reverse=True)
+    return boxes, (w, h), touched
+
+
 def pixel_box_to_pdf_box(
     pixel_box: BoxPx,
     page_rect: fitz.Rect,
@@ -212,6 +612,8 @@ def detect_boxes_for_pdf(
     dpi: int = 200,
     min_area_frac: float = 0.0005,
     min_size_px: int = 12,
+    coarse_dpi: Optional[int] = None,
+    max_raster_mb: Optional[float] = None,
 ) -> Dict[str, Any]:
     """
     Detect frame boxes for selected pages of a PDF.
@@ -222,6 +624,10 @@ def detect_boxes_for_pdf(
         dpi: rasterization DPI.
         min_area_frac: minimum area fraction per box.
         min_size_px: minimum width/height in pixels.
+        coarse_dpi: if set (and below dpi), detect coarse-to-fine
+                    (see module docstring).
+        max_raster_mb: memory ceiling per page; larger pages are
+                       rendered and edge-detected in bands.
 
     Returns:
         A dict ready to be dumped as JSON (see module docstring).
@@ -232,21 +638,49 @@ def detect_boxes_for_pdf(
         "pages": {},
     }
 
-    with fitz.open(pdf_path) as doc:
-        num_pages = doc.page_count
+    doc = open_document(pdf_path)
+    num_pages = doc.page_count
 
-        if pages is None:
-            target_indices = list(range(num_pages))
+    if pages is None:
+        target_indices = list(range(num_pages))
+    else:
+        target_indices = []
+        for p in pages:
+            if p < 1 or p > num_pages:
+                raise ValueError(f"Page {p} is out of range 1..{num_pages}")
+            target_indices.append(p - 1)
+
+    for page_index in target_indices:
+        page_num = page_index + 1
+        note = ""
+
+        if coarse_dpi and coarse_dpi < dpi:
+            page = doc[page_index]
+            page_rect = page.rect
+            boxes, (img_w, img_h), touched = detect_boxes_coarse_to_fine(
+                page,
+                dpi=dpi,
+                coarse_dpi=coarse_dpi,
+                min_area_frac=min_area_frac,
+                min_size_px=min_size_px,
+            )
+            note = f" (coarse-to-fine, {touched / float(img_w * img_h):.1%} of the pixels rendered)"
+        elif exceeds_limit(doc[page_index], dpi, EDGE_BYTES_PER_PIXEL, max_raster_mb):
+            page = doc[page_index]
+            page_rect = page.rect
+            edges = edge_map_banded(page, dpi, max_raster_mb)
+            img_h, img_w = edges.shape
+
+            boxes = detect_boxes_on_edge_map(
+                edges,
+                min_area_frac=min_area_frac,
+                min_size_px=min_size_px,
+            )
+            del edges
+            note = f" (banded under {max_raster_mb:g} MB)"
         else:
-            target_indices = []
-            for p in pages:
-                if p < 1 or p > num_pages:
-                    raise ValueError(f"Page {p} is out of range 1..{num_pages}")
-                target_indices.append(p - 1)
-
-        for page_index in target_indices:
-            page_num = page_index + 1
             img_bgr, page_rect = render_page_to_bgr_array(doc, page_index, dpi=dpi)
+            img_h, img_w = img_bgr.shape[:2]
 
             boxes = detect_boxes_on_image(
                 img_bgr,
@@ -254,33 +688,33 @@ def detect_boxes_for_pdf(
                 min_size_px=min_size_px,
             )
 
-            page_entry: Dict[str, Any] = {
-                "image_width_px": int(img_bgr.shape[1]),
-                "image_height_px": int(img_bgr.shape[0]),
-                "boxes": [],
-            }
-
-            for i, (bbox_px, area_frac, is_border) in enumerate(boxes, start=1):
-                bbox_pdf = pixel_box_to_pdf_box(bbox_px, page_rect, img_bgr.shape)
-                page_entry["boxes"].append(
-                    {
-                        "id": i,
-                        "bbox_px": [int(bbox_px[0]), int(bbox_px[1]),
-                                    int(bbox_px[2]), int(bbox_px[3])],
-                        "bbox_pdf": [bbox_pdf[0], bbox_pdf[1],
-                                     bbox_pdf[2], bbox_pdf[3]],
-                        "area_frac": area_frac,
-                        "is_page_border_hint": bool(is_border),
-                    }
-                )
-
-            result["pages"][str(page_num)] = page_entry
-
-            print(
-                f"[info] Page {page_num}: detected {len(page_entry['boxes'])} "
-                f"box candidate(s)."
+        page_entry: Dict[str, Any] = {
+            "image_width_px": int(img_w),
+            "image_height_px": int(img_h),
+            "boxes": [],
+        }
+
+        for i, (bbox_px, area_frac, is_border) in enumerate(boxes, start=1):
+            bbox_pdf = pixel_box_to_pdf_box(bbox_px, page_rect, (img_h, img_w, 3))
+            page_entry["boxes"].append(
+                {
+                    "id": i,
+                    "bbox_px": [int(bbox_px[0]), int(bbox_px[1]),
+                                int(bbox_px[2]), int(bbox_px[3])],
+                    "bbox_pdf": [bbox_pdf[0], bbox_pdf[1],
+                                 bbox_pdf[2], bbox_pdf[3]],
+                    "area_frac": area_frac,
+                    "is_page_border_hint": bool(is_border),
+                }
             )
 
+        result["pages"][str(page_num)] = page_entry
+
+        print(
+            f"[info] Page {page_num}: detected {len(page_entry['boxes'])} "
+            f"box candidate(s){note}."
+        )
+
     return result
 
 
@@ -330,6 +764,20 @@ def parse_args() -> argparse.Namespace:
         default=12,
         help="Minimum width/height in pixels for a box (default: 12).",
     )
+    parser.add_argument(
+        "--coarse-dpi",
+        type=int,
+        default=None,
+        help="Detect candidates at this DPI (e.g. 36) and refine their edges "
+             "on full-DPI clips instead of rasterizing whole pages at --dpi.",
+    )
+    parser.add_argument(
+        "--max-raster-mb",
+        type=float,
+        default=None,
+        help="Memory ceiling per page (MB); larger pages are rendered and "
+             "edge-detected in horizontal bands with identical results.",
+    )
     return parser.parse_args()
 
 
@@ -348,6 +796,8 @@ def main() -> None:
         dpi=args.dpi,
         min_area_frac=args.min_area_frac,
         min_size_px=args.min_size_px,
+        coarse_dpi=args.coarse_dpi,
+        max_raster_mb=args.max_raster_mb,
     )
 
     out_path.parent.mkdir(parents=True, exist_ok=True)
@@ -7,11 +7,22 @@
 #
 #   py tools\export_notes_json.py --all-pages --out exports\all_pages_notes_sheetwide.json --notes-only
 #
+#   py tools\export_notes_json.py --pages 3 5 7 --out exports\notes_pages_3_5_7.json --notes-only
+#
+# --page / --pages are pushed down into the visual pipeline and the Chunker,
+# so only the selected sheets are aligned, extracted and grouped.
+#
 # This will:
 #   1. Run the visual pipeline on test.pdf
 #   2. Run the text Chunker with visual bridge wired in
 #   3. Filter chunks according to CLI filters
 #   4. Write a JSON file with all matching chunks
+#
+# With --stream the Chunker is consumed page by page (Chunker.iter_pages)
+# and chunks are written to the JSON file as soon as each page is done,
+# so memory stays flat on large sets:
+#
+#   py tools\export_notes_json.py --all-pages --stream --out exports\all_pages_notes.json --notes-only
 
 from __future__ import annotations
 
@@ -19,7 +30,7 @@ import argparse
 import json
 import sys
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
 # ---------------------------------------------------------------------
 # Project root / imports
@@ -33,8 +44,9 @@ if str(ROOT) not in sys.path:
 
 from backbone.visual.visual_pipeline_integrator import VisualPipelineIntegrator
 from backbone.visual.visual_chunker_bridge import VisualChunkerBridge
-from backbone.chunking import Chunker
+from backbone.chunking import Chunker, ChunkerConfig
 from backbone.chunking.chunk import Chunk
+from backbone.chunking.chunk_ids import ID_MODE_UUID, ID_MODES
 from backbone.chunking.sheet_type_detector import detect_sheet_type
 
 
@@ -43,9 +55,11 @@ from backbone.chunking.sheet_type_detector import detect_sheet_type
 # ---------------------------------------------------------------------
 
 
-def run_visual_pipeline(pdf_path: str) -> Dict[str, Any]:
+def run_visual_pipeline(pdf_path: str, pages: Optional[List[int]] = None) -> Dict[str, Any]:
     """
     Run the visual pipeline and return its result dict.
+
+    *pages* (1-based) limits alignment to those sheets; None = all pages.
     """
     print(">>> STEP 1: Running visual pipeline...")
     integrator = VisualPipelineIntegrator()
@@ -56,6 +70,7 @@ def run_visual_pipeline(pdf_path: str) -> Dict[str, Any]:
         score_notes=True,
         make_debug_overlays=False,
         debug_output_dir="visual_debug",
+        pages=pages,
     )
 
     pages = result.get("pages", {})
@@ -66,24 +81,60 @@ def run_visual_pipeline(pdf_path: str) -> Dict[str, Any]:
     return result
 
 
-def run_text_chunker(pdf_path: str, visual_pages: Dict[str, Any]) -> List[Chunk]:
+def run_text_chunker(
+    pdf_path: str,
+    visual_pages: Dict[str, Any],
+    pages: Optional[List[int]] = None,
+    id_mode: str = ID_MODE_UUID,
+    page_sheet_types: Optional[Dict[int, str]] = None,
+) -> List[Chunk]:
     """
-    Run the text Chunker with the visual bridge wired in and return all chunks.
+    Run the text Chunker with the visual bridge wired in and return all chunks
+    (only for *pages*, 1-based, when given).
+
+    If *page_sheet_types* is given, it is updated with the sheet type the
+    Chunker detected for each page.
     """
     print("\n>>> STEP 2: Running text chunker...")
     bridge = VisualChunkerBridge()
-    chunker = Chunker(visual_pages=visual_pages, visual_bridge=bridge)
-    chunks: List[Chunk] = chunker.process(pdf_path)
+    chunker = Chunker(
+        ChunkerConfig(id_mode=id_mode), visual_pages=visual_pages, visual_bridge=bridge
+    )
+    chunks: List[Chunk] = chunker.process(pdf_path, pages=pages)
+    if page_sheet_types is not None:
+        page_sheet_types.update(chunker.page_sheet_types)
     print(f"    - Total chunks from Chunker: {len(chunks)}")
     return chunks
 
 
-def find_notes_sheet_pages(chunks: List[Chunk]) -> Set[int]:
+def iter_text_chunker_pages(
+    pdf_path: str,
+    visual_pages: Dict[str, Any],
+    pages: Optional[List[int]] = None,
+    id_mode: str = ID_MODE_UUID,
+) -> Iterator[Tuple[int, str, List[Chunk]]]:
+    """
+    Streaming variant of run_text_chunker: yields (page, sheet_type, chunks).
+    """
+    print("\n>>> STEP 2: Running text chunker (streaming)...")
+    bridge = VisualChunkerBridge()
+    chunker = Chunker(
+        ChunkerConfig(id_mode=id_mode), visual_pages=visual_pages, visual_bridge=bridge
+    )
+    yield from chunker.iter_pages(pdf_path, pages=pages)
+
+
+def find_notes_sheet_pages(
+    chunks: List[Chunk], page_sheet_types: Optional[Dict[int, str]] = None
+) -> Set[int]:
     """
     Use detect_sheet_type(page_number, chunks) to find which pages are notes sheets.
 
     This mirrors the chunker behavior so we stay in sync with core logic.
+    Pages found in *page_sheet_types* (``Chunker.page_sheet_types``) reuse
+    the Chunker's result instead of being detected again.
     """
+    page_sheet_types = page_sheet_types or {}
     by_page: Dict[int, List[Chunk]] = {}
     for ch in chunks:
         page = getattr(ch, "page", None)
@@ -93,8 +144,10 @@ def find_notes_sheet_pages(chunks: List[Chunk]) -> Set[int]:
 
     notes_pages: Set[int] = set()
     for page, page_chunks in by_page.items():
-        # detect_sheet_type signature is detect_sheet_type(page_number, chunks)
-        sheet_type = detect_sheet_type(page, page_chunks)
+        sheet_type = page_sheet_types.get(page)
+        if sheet_type is None:
+            # detect_sheet_type signature is detect_sheet_type(page_number, chunks)
+            sheet_type = detect_sheet_type(page, page_chunks)
         if sheet_type == "notes_sheet":
             notes_pages.add(page)
 
@@ -230,16 +283,20 @@ def build_export_structure(
     notes_only: bool,
     sheet_type_filter: Optional[str],
     min_confidence: Optional[float],
+    pages: Optional[List[int]] = None,
+    page_sheet_types: Optional[Dict[int, str]] = None,
 ) -> Dict[str, Any]:
     """
     Filter chunks according to CLI options and build the export JSON structure.
+
+    *page_sheet_types* (from the Chunker) avoids re-detecting sheet types.
     """
     print("\n>>> STEP 3: Filtering chunks for export...")
 
     # Determine which pages are notes sheets using detect_sheet_type
     notes_sheet_pages: Optional[Set[int]] = None
     if notes_only:
-        notes_sheet_pages = find_notes_sheet_pages(chunks)
+        notes_sheet_pages = find_notes_sheet_pages(chunks, page_sheet_types)
         print(f"    - Detected notes_sheet pages: {sorted(notes_sheet_pages)}")
 
     filtered: List[Dict[str, Any]] = []
@@ -273,6 +330,7 @@ def build_export_structure(
         "pdf_path": pdf_path,
         "filter": {
             "page": page,
+            "pages": pages,
             "notes_only": notes_only,
             "sheet_type": sheet_type_filter,
             "min_confidence": min_confidence,
@@ -287,6 +345,97 @@ def build_export_structure(
     return export_obj
 
 
+def _indent_json(value: Any, level: int) -> str:
+    """json.dumps(value, indent=2), re-indented to sit *level* spaces deep."""
+    text = json.dumps(value, indent=2)
+    return text.replace("\n", "\n" + " " * level)
+
+
+def stream_export(
+    pdf_path: str,
+    output_path: Path,
+    pages: Iterator[Tuple[int, str, List[Chunk]]],
+    page: Optional[int],
+    notes_only: bool,
+    sheet_type_filter: Optional[str],
+    min_confidence: Optional[float],
+    selected_pages: Optional[List[int]] = None,
+) -> Dict[str, Any]:
+    """
+    Filter + serialize chunks page by page, writing them straight to disk.
+
+    Produces the same JSON document as build_export_structure + write_json
+    (the "summary" block comes last because it is only known at the end).
+    Notes-sheet pages come from the sheet type the Chunker already yields,
+    so no second detect_sheet_type pass is needed.
+    """
+    print("\n>>> STEP 3: Filtering + streaming chunks for export...")
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    notes_sheet_pages: Optional[Set[int]] = set() if notes_only else None
+    per_page_counts: Dict[int, int] = {}
+    total = 0
+
+    filter_block = {
+        "page": page,
+        "pages": selected_pages,
+        "notes_only": notes_only,
+        "sheet_type": sheet_type_filter,
+        "min_confidence": min_confidence,
+    }
+
+    with output_path.open("w", encoding="utf-8") as f:
+        f.write("{\n")
+        f.write(f'  "pdf_path": {json.dumps(pdf_path)},\n')
+        f.write(f'  "filter": {_indent_json(filter_block, 2)},\n')
+        f.write('  "chunks": [')
+
+        for page_number, sheet_type, page_chunks in pages:
+            if notes_sheet_pages is not None and sheet_type == "notes_sheet":
+                notes_sheet_pages.add(page_number)
+
+            for ch in page_chunks:
+                if not chunk_matches_filters(
+                    chunk=ch,
+                    page=page,
+                    notes_only=notes_only,
+                    sheet_type_filter=sheet_type_filter,
+                    min_confidence=min_confidence,
+                    notes_sheet_pages=notes_sheet_pages,
+                ):
+                    continue
+
+                serialized = serialize_chunk(ch)
+                f.write("," if total else "")
+                f.write("\n    " + _indent_json(serialized, 4))
+                total += 1
+
+                p = serialized.get("page")
+                if isinstance(p, int):
+                    per_page_counts[p] = per_page_counts.get(p, 0) + 1
+
+        f.write("\n  ],\n" if total else "],\n")
+
+        summary = {
+            "total_exported_chunks": total,
+            "per_page_counts": per_page_counts,
+        }
+        f.write(f'  "summary": {_indent_json(summary, 2)}\n')
+        f.write("}")
+
+    if notes_sheet_pages is not None:
+        print(f"    - Detected notes_sheet pages: {sorted(notes_sheet_pages)}")
+    print(f"    - Exported {total} chunk(s) matching filters.")
+    if per_page_counts:
+        print("    - Counts per page:")
+        for p in sorted(per_page_counts.keys()):
+            print(f"        Page {p}: {per_page_counts[p]} chunks")
+    print(f"\n>>> JSON written to: {output_path}")
+
+    return summary
+
+
 def write_json(output_path: Path, data: Dict[str, Any]) -> None:
     """
     Write JSON to disk, ensuring parent folders exist.
@@ -319,6 +468,12 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
         type=int,
         help="Single page number to export.",
     )
+    group.add_argument(
+        "--pages",
+        type=int,
+        nargs="+",
+        help="One or more page numbers to export (e.g. --pages 3 5 7).",
+    )
     group.add_argument(
         "--all-pages",
         action="store_true",
@@ -352,6 +507,21 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
         help="Optional: minimum visual_confidence required (e.g. 0.7).",
     )
 
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Process and write one page at a time (flat memory on large sets).",
+    )
+
+    parser.add_argument(
+        "--id-mode",
+        type=str,
+        choices=list(ID_MODES),
+        default=ID_MODE_UUID,
+        help="Chunk IDs: random uuid4 per run (default) or deterministic "
+        "(stable across runs of the same PDF).",
+    )
+
     return parser.parse_args(argv)
 
 
@@ -365,15 +535,41 @@ def main(argv: Optional[List[str]] = None) -> None:
         print(f"ERROR: PDF not found: {pdf_path}")
         sys.exit(1)
 
+    page_filter: Optional[int] = args.page
     if args.all_pages:
-        page_filter: Optional[int] = None
+        selected_pages: Optional[List[int]] = None
+    elif args.pages:
+        selected_pages = sorted(set(args.pages))
     else:
-        page_filter = args.page
+        selected_pages = [args.page]
 
-    visual_result = run_visual_pipeline(pdf_path)
+    visual_result = run_visual_pipeline(pdf_path, pages=selected_pages)
     visual_pages = visual_result.get("pages", {})
 
-    chunks = run_text_chunker(pdf_path, visual_pages)
+    if args.stream:
+        stream_export(
+            pdf_path=pdf_path,
+            output_path=out_path,
+            pages=iter_text_chunker_pages(
+                pdf_path, visual_pages, selected_pages, id_mode=args.id_mode
+            ),
+            page=page_filter,
+            notes_only=args.notes_only,
+            sheet_type_filter=args.sheet_type,
+            min_confidence=args.min_confidence,
+            selected_pages=selected_pages,
+        )
+        print("\n>>> DONE.")
+        return
+
+    page_sheet_types: Dict[int, str] = {}
+    chunks = run_text_chunker(
+        pdf_path,
+        visual_pages,
+        pages=selected_pages,
+        id_mode=args.id_mode,
+        page_sheet_types=page_sheet_types,
+    )
 
     export_data = build_export_structure(
         pdf_path=pdf_path,
@@ -382,6 +578,8 @@ def main(argv: Optional[List[str]] = None) -> None:
         notes_only=args.notes_only,
         sheet_type_filter=args.sheet_type,
         min_confidence=args.min_confidence,
+        pages=selected_pages,
+        page_sheet_types=page_sheet_types,
     )
 
     write_json(out_path, export_data)
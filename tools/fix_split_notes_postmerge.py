@@ -26,27 +26,38 @@ from __future__ import annotations
 import argparse
 import copy
 import json
-import re
+import sys
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 import bbox_utils
 
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backbone.chunking.note_structure import (
+    KIND_LETTER,
+    KIND_NUMBER,
+    KIND_SYMBOL,
+    LineRole,
+    line_role,
+)
+
 
 # -----------------------------------------------------------------------------
 # Text + bullets
 # -----------------------------------------------------------------------------
 
 
-BULLET_RE = re.compile(
-    r"^\s*(?:\d{1,3}[\.)]|[A-Z][\.)]|[-*•+])(?:\s+|$)",
-    flags=re.UNICODE,
-)
-
-
-def looks_like_bullet(text: str) -> bool:
-    return bool(BULLET_RE.match(text or ""))
+def is_bullet_role(role: LineRole) -> bool:
+    """True for "9.", "123)", "A.", "B)", "-", "*", "•", "+" followed by whitespace / end of line."""
+    if not role.spaced:
+        return False
+    if role.kind == KIND_NUMBER:
+        return bool(role.sep) and len(role.label) <= 3
+    return role.kind in (KIND_LETTER, KIND_SYMBOL)
 
 
 def get_text(ch: Dict[str, Any]) -> str:
@@ -184,7 +195,7 @@ def stitch_page(
             text = get_text(ch)
 
             # If this isn't a bullet start, pass-through.
-            if not looks_like_bullet(text):
+            if not is_bullet_role(line_role(ch, text)):
                 out.append(ch)
                 i += 1
                 continue
@@ -201,7 +212,7 @@ def stitch_page(
                 n_text = get_text(n_ch)
 
                 # Stop at the next bullet.
-                if looks_like_bullet(n_text):
+                if is_bullet_role(line_role(n_ch, n_text)):
                     break
 
                 gap = merged_box.vertical_gap_to(n_box)
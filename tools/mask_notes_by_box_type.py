@@ -38,10 +38,19 @@ from __future__ import annotations
 import argparse
 import json
 import math
+import sys
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
 
+ROOT = Path(__file__).resolve().parents[1]
+
+# Ensure project root is on sys.path so imports work when running from tools/
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backbone.intake.word_index import MODE_INTERSECT, WordIndex
+
 
 @dataclass
 class Box:
@@ -270,6 +279,30 @@ def main() -> None:
         print(f"[info] Using excluded boxes on {len(pages_list)} page(s): {pages_list}")
         print(f"[info] Total unique excluded chunk indices = {len(total_excluded_indices)}")
 
+    # Geometry: per page, one index over the chunk boxes, queried once per
+    # excluded box; only chunks touching a box get the exact overlap test.
+    chunk_bboxes: List[Optional[Tuple[float, float, float, float]]] = [extract_chunk_bbox(ch) for ch in chunks]
+    overlap_matches: Set[int] = set()
+    for page, page_boxes in exclude_boxes_by_page.items():
+        if only_pages and page not in only_pages:
+            continue
+        rows = [
+            idx for idx, ch in enumerate(chunks)
+            if chunk_bboxes[idx] is not None and int(ch.get("page", -1)) == page
+        ]
+        if not rows:
+            continue
+        chunk_index = WordIndex.from_boxes([chunk_bboxes[idx] for idx in rows])
+        for box in page_boxes:
+            if min_overlap > 0:
+                candidates = chunk_index.indices_in_rect(box.bbox, MODE_INTERSECT).tolist()
+            else:
+                candidates = range(len(rows))  # every chunk passes a <= 0 threshold
+            for i in candidates:
+                idx = rows[i]
+                if idx not in overlap_matches and compute_overlap_frac(chunk_bboxes[idx], box.bbox) >= min_overlap:
+                    overlap_matches.add(idx)
+
     # Masking loop
     masked_chunks: List[Dict] = []
     dropped_by_index = 0
@@ -284,14 +317,13 @@ def main() -> None:
             masked_chunks.append(ch)
             continue
 
-        page_boxes = exclude_boxes_by_page.get(page, [])
         page_excluded_indices = exclude_indices_by_page.get(page, set())
 
         # Fast path: explicit index mapping
         index_match = idx in page_excluded_indices
 
         # Geometry path
-        bbox = extract_chunk_bbox(ch)
+        bbox = chunk_bboxes[idx]
         if bbox is None:
             # No geometry, keep it but track stats
             kept_with_no_bbox += 1
@@ -302,13 +334,7 @@ def main() -> None:
                 dropped_by_index += 1
             continue
 
-        overlap_match = False
-        if page_boxes:
-            for box in page_boxes:
-                overlap = compute_overlap_frac(bbox, box.bbox)
-                if overlap >= min_overlap:
-                    overlap_match = True
-                    break
+        overlap_match = idx in overlap_matches
 
         should_drop = index_match or overlap_match
 
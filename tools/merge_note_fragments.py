@@ -79,13 +79,15 @@ def merge_in_column(column_notes: List[Dict[str, Any]], headers: List[Dict[str,
                     "merge_diagnostics": {
                         "reason_ended": reason,
                         "line_count": len(current_group),
+                        "source_ids": [c.get("id") for c in current_group],
                         "vertical_span": current_union["y1"] - current_union["y0"]
                     }
                 }
             }
             merged.append(merged_note)
             if debug:
-                print(f"[DEBUG] Ended group ({reason}): {len(current_group)} lines -> '{merged_note['text'][:60].replace('\n', ' ')}...'")
+                preview = merged_note["text"][:60].replace("\n", " ")
+                print(f"[DEBUG] Ended group ({reason}): {len(current_group)} lines -> '{preview}...'")
             current_group = []
             current_union = None
 
@@ -107,7 +109,7 @@ def merge_in_column(column_notes: List[Dict[str, Any]], headers: List[Dict[str,
         if current_group and not header_between and gap < max_gap:
             # Continue group
             current_group.append(note)
-            current_union = union_bbox(current_union, bbox)
+            current_union = union_bbox([current_union, bbox])
             if debug:
                 print(f"[DEBUG] Continued group (gap {gap:.1f})")
         else:
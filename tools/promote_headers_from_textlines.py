@@ -21,13 +21,18 @@ from __future__ import annotations
 import argparse
 import json
 import re
+import sys
 import uuid
 from pathlib import Path
 from typing import Any, Dict, List, Tuple, Union
 
-BBox = Union[List[float], Dict[str, float]]
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backbone.chunking.note_structure import line_role
 
-HEADER_RE = re.compile(r"^[A-Z0-9\s\-\(\)\'\.\&\/]+NOTES(\s*\(CONT\'D\))?:\s*$")
+BBox = Union[List[float], Dict[str, float]]
 
 
 def _load_json(p: Path) -> Dict[str, Any]:
@@ -95,12 +100,13 @@ def main() -> int:
         if not txt:
             continue
 
+        # Caps line ending in "NOTES:" / "NOTES (CONT'D):" (see note_structure)
+        if not line_role(tl, txt).header_colon:
+            continue
+
         # Fast normalization: collapse double spaces
         norm = re.sub(r"\s+", " ", txt).strip()
 
-        if not HEADER_RE.match(norm):
-            continue
-
         # If it already overlaps an existing header a lot, skip (avoid duplicates)
         if any(overlap_frac(tl["bbox"], h["bbox"]) >= a.min_overlap_existing for h in existing_headers):
             continue
@@ -0,0 +1,362 @@
+# run_incremental_notes_export.py
+# Incremental notes export for reissued plan sets.
+#
+# Usage example (from project root):
+#
+#   py tools\run_incremental_notes_export.py --pdf test.pdf --notes-only
+#
+#   py tools\run_incremental_notes_export.py --pdf rev2.pdf --prev-run exports\Runs\20250114_00003
+#
+# This will:
+#   1. Fingerprint every page (content stream + geometry + fonts/resources)
+#   2. Load page_manifest.json from the previous run (latest run under
+#      exports/Runs that has one, or --prev-run)
+#   3. Carry forward per-page outputs whose fingerprint is unchanged
+#      (page numbers are remapped if sheets were inserted/removed; a moved
+#      sheet is reprocessed when the visual annotation covers its old or
+#      new page index, since the annotation is keyed by index)
+#   4. Run the visual pipeline + Chunker only on the changed pages
+#   5. Write per-page JSON, page_manifest.json and the combined
+#      notes_export.json into a new exports/Runs/<run_id> folder
+#      and sync the combined export to exports/MostRecent
+#
+# Anything that changes the output of *every* page (annotation / schema
+# JSON, --notes-only, this tool's version) is folded into a pipeline
+# signature; when it differs from the previous run, all pages are redone.
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+# ---------------------------------------------------------------------
+# Project root / imports
+# ---------------------------------------------------------------------
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Ensure project root is on sys.path so imports work when running from tools/
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backbone.chunking import Chunker
+from backbone.intake.page_fingerprint import FINGERPRINT_VERSION, document_fingerprints
+from backbone.visual.visual_chunker_bridge import VisualChunkerBridge
+
+import run_utils
+from export_notes_json import (
+    chunk_matches_filters,
+    run_visual_pipeline,
+    serialize_chunk,
+    write_json,
+)
+
+
+MANIFEST_NAME = "page_manifest.json"
+COMBINED_NAME = "notes_export.json"
+PAGES_SUBDIR = "pages"
+
+# Bump when per-page output format / processing changes.
+TOOL_VERSION = 1
+
+DEFAULT_ANNOTATION = ROOT / "backbone" / "visual" / "schemas" / "page3_annotation.json"
+DEFAULT_SCHEMA = ROOT / "backbone" / "visual" / "schemas" / "visual_note_schema.json"
+
+
+# ---------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------
+
+def _file_sha256(path: Path) -> str:
+    if not path.exists():
+        return "missing"
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def pipeline_signature(notes_only: bool) -> str:
+    """Hash of every input that affects all pages at once."""
+    parts = [
+        f"tool={TOOL_VERSION}",
+        f"fingerprint={FINGERPRINT_VERSION}",
+        f"notes_only={bool(notes_only)}",
+        f"annotation={_file_sha256(DEFAULT_ANNOTATION)}",
+        f"schema={_file_sha256(DEFAULT_SCHEMA)}",
+    ]
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def annotated_pages(path: Path = DEFAULT_ANNOTATION) -> Set[int]:
+    """1-based page numbers the visual annotation has regions for."""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return set()
+    return {int(entry.get("page_index", 0)) + 1 for entry in data.get("pages") or []}
+
+
+def page_output_name(page_number: int) -> str:
+    return f"{PAGES_SUBDIR}/page_{page_number:04d}.json"
+
+
+def find_previous_run(exclude: Optional[Path] = None) -> Optional[Path]:
+    """Latest run folder under exports/Runs that has a page manifest."""
+    runs = run_utils.runs_dir()
+    if not runs.exists():
+        return None
+    candidates = sorted(
+        (p for p in runs.iterdir() if p.is_dir() and (p / MANIFEST_NAME).exists()),
+        key=lambda p: p.name,
+    )
+    if exclude is not None:
+        candidates = [p for p in candidates if p.resolve() != exclude.resolve()]
+    return candidates[-1] if candidates else None
+
+
+def load_manifest(run_dir: Optional[Path]) -> Optional[Dict[str, Any]]:
+    if run_dir is None:
+        return None
+    path = run_dir / MANIFEST_NAME
+    if not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except Exception as exc:
+        print(f"[warn] Could not read {path}: {exc}")
+        return None
+
+
+def carry_forward_page(
+    prev_run: Path, prev_entry: Dict[str, Any], new_page: int
+) -> Optional[Dict[str, Any]]:
+    """
+    Load a previous per-page output and renumber it to *new_page*.
+
+    Only the page number is rewritten, so callers must not carry a moved
+    page whose visual annotation (keyed by page index) differs between the
+    old and the new position; see ``annotated_pages``.
+    """
+    src = prev_run / prev_entry["output"]
+    if not src.exists():
+        return None
+    try:
+        data = json.loads(src.read_text(encoding="utf-8"))
+    except Exception:
+        return None
+
+    data["page"] = new_page
+    for ch in data.get("chunks", []):
+        ch["page"] = new_page
+    return data
+
+
+def process_changed_pages(
+    pdf_path: str,
+    pages: List[int],
+    fingerprints: Dict[int, str],
+    notes_only: bool,
+) -> Dict[int, Dict[str, Any]]:
+    """Run visual pipeline + Chunker on *pages* only; return per-page outputs."""
+    outputs: Dict[int, Dict[str, Any]] = {
+        p: {"page": p, "fingerprint": fingerprints[p], "sheet_type": None, "chunks": []}
+        for p in pages
+    }
+    if not pages:
+        return outputs
+
+    visual_result = run_visual_pipeline(pdf_path, pages=pages)
+    visual_pages = visual_result.get("pages", {})
+
+    print("\n>>> STEP 2: Running text chunker on changed pages...")
+    chunker = Chunker(visual_pages=visual_pages, visual_bridge=VisualChunkerBridge())
+
+    for page_number, sheet_type, chunks in chunker.iter_pages(pdf_path, pages=pages):
+        notes_pages = {page_number} if sheet_type == "notes_sheet" else set()
+        out = outputs[page_number]
+        out["sheet_type"] = sheet_type
+        out["chunks"] = [
+            serialize_chunk(ch)
+            for ch in chunks
+            if chunk_matches_filters(
+                chunk=ch,
+                page=None,
+                notes_only=notes_only,
+                sheet_type_filter=None,
+                min_confidence=None,
+                notes_sheet_pages=notes_pages,
+            )
+        ]
+
+    return outputs
+
+
+# ---------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Incremental notes export: only reprocess pages that changed."
+    )
+    parser.add_argument("--pdf", type=str, default="test.pdf", help="PDF plan set.")
+    parser.add_argument(
+        "--prev-run",
+        type=str,
+        default=None,
+        help="Previous run folder to compare against (default: latest under exports/Runs).",
+    )
+    parser.add_argument(
+        "--notes-only",
+        action="store_true",
+        help="Only export note-like chunks (same meaning as export_notes_json).",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Ignore the previous run and reprocess every page.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+
+    pdf_path = args.pdf
+    if not Path(pdf_path).exists():
+        print(f"ERROR: PDF not found: {pdf_path}")
+        sys.exit(1)
+
+    print(">>> INCREMENTAL: Fingerprinting pages...")
+    fingerprints = document_fingerprints(pdf_path)
+    signature = pipeline_signature(args.notes_only)
+    print(f"    - Pages: {len(fingerprints)}")
+
+    prev_run = None if args.force else (
+        Path(args.prev_run) if args.prev_run else find_previous_run()
+    )
+    prev_manifest = load_manifest(prev_run)
+
+    prev_by_fp: Dict[str, Dict[str, Any]] = {}
+    if prev_manifest and prev_manifest.get("pipeline_signature") == signature:
+        for entry in prev_manifest.get("pages", []):
+            prev_by_fp.setdefault(entry.get("fingerprint"), entry)
+    elif prev_manifest:
+        print("    - Pipeline inputs changed since previous run; reprocessing all pages.")
+
+    ctx = run_utils.create_new_run()
+    run_dir = ctx.run_dir
+    print(f"    - Run: {ctx.run_id}")
+    if prev_run is not None and prev_by_fp:
+        print(f"    - Comparing against: {prev_run}")
+
+    # ----------------------------------------------------------------
+    # Carry forward unchanged pages
+    # ----------------------------------------------------------------
+    outputs: Dict[int, Dict[str, Any]] = {}
+    status: Dict[int, str] = {}
+    changed: List[int] = []
+    moved_visual: List[int] = []
+    visual_pages = annotated_pages()
+
+    for page_number, fp in fingerprints.items():
+        entry = prev_by_fp.get(fp)
+        if entry and entry.get("page") != page_number and (
+            {entry.get("page"), page_number} & visual_pages
+        ):
+            # The annotation follows the page index, not the sheet: a moved
+            # sheet's carried visual_* metadata would belong to the old slot.
+            moved_visual.append(page_number)
+            entry = None
+        data = carry_forward_page(prev_run, entry, page_number) if entry else None
+        if data is None:
+            changed.append(page_number)
+            continue
+        data["fingerprint"] = fp
+        outputs[page_number] = data
+        status[page_number] = (
+            "unchanged" if entry.get("page") == page_number else f"moved_from_{entry.get('page')}"
+        )
+
+    print(f"\n>>> INCREMENTAL: {len(outputs)} page(s) carried forward, {len(changed)} to process.")
+    if changed:
+        print(f"    - Changed pages: {changed}")
+    if moved_visual:
+        print(f"    - Moved pages with visual annotation (reprocessed): {moved_visual}")
+
+    # ----------------------------------------------------------------
+    # Reprocess changed pages
+    # ----------------------------------------------------------------
+    for page_number, data in process_changed_pages(
+        pdf_path, changed, fingerprints, args.notes_only
+    ).items():
+        outputs[page_number] = data
+        status[page_number] = "processed"
+
+    # ----------------------------------------------------------------
+    # Write per-page outputs, manifest and combined export
+    # ----------------------------------------------------------------
+    manifest_pages: List[Dict[str, Any]] = []
+    all_chunks: List[Dict[str, Any]] = []
+    per_page_counts: Dict[int, int] = {}
+
+    for page_number in sorted(outputs):
+        data = outputs[page_number]
+        rel = page_output_name(page_number)
+        out_path = run_dir / rel
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+        manifest_pages.append(
+            {
+                "page": page_number,
+                "fingerprint": data["fingerprint"],
+                "sheet_type": data.get("sheet_type"),
+                "status": status[page_number],
+                "output": rel,
+                "chunk_count": len(data.get("chunks", [])),
+            }
+        )
+        all_chunks.extend(data.get("chunks", []))
+        if data.get("chunks"):
+            per_page_counts[page_number] = len(data["chunks"])
+
+    manifest = {
+        "run_id": ctx.run_id,
+        "pdf_path": str(pdf_path),
+        "pipeline_signature": signature,
+        "previous_run": str(prev_run) if prev_run and prev_by_fp else None,
+        "processed_pages": sorted(changed),
+        "pages": manifest_pages,
+    }
+    write_json(run_dir / MANIFEST_NAME, manifest)
+
+    combined = {
+        "pdf_path": str(pdf_path),
+        "filter": {
+            "page": None,
+            "pages": None,
+            "notes_only": args.notes_only,
+            "sheet_type": None,
+            "min_confidence": None,
+        },
+        "summary": {
+            "total_exported_chunks": len(all_chunks),
+            "per_page_counts": per_page_counts,
+        },
+        "chunks": all_chunks,
+    }
+    combined_path = run_dir / COMBINED_NAME
+    write_json(combined_path, combined)
+    run_utils.sync_to_most_recent(combined_path, ctx.run_id)
+
+    print(
+        f"\n>>> DONE. {len(changed)} processed, "
+        f"{len(fingerprints) - len(changed)} carried forward."
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -37,6 +37,7 @@ from pathlib import Path
 from typing import Iterable, List, Optional
 
 import bbox_utils
+import stage_binary
 import validate_stage_json
 
 
@@ -158,7 +159,8 @@ def assert_no_header_inside_note(path: Path, *, page: int, containment_thresh: f
 
     Fails if any header bbox is mostly contained within any note_group bbox.
     """
-    root = json.loads(path.read_text(encoding="utf-8"))
+    # Only this page's chunks (a .stage file is read page-locally).
+    root = stage_binary.load_stage(path, page=page)
     chunks = root.get("chunks") if isinstance(root, dict) else None
     if not isinstance(chunks, list):
         return
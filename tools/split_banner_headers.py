@@ -47,7 +47,9 @@ def split_banner_headers(
             print(f"[DEBUG] No header candidates on page {page} - nothing to split")
         return chunks, 0
 
-    new_chunks = [c for c in chunks if c.get("page") != page]
+    # Keep everything except the headers being (re)placed below
+    header_ids = {id(c) for c in header_candidates}
+    new_chunks = [c for c in chunks if id(c) not in header_ids]
     split_count = 0
 
     for hc in header_candidates:
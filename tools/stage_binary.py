@@ -0,0 +1,427 @@
+#!/usr/bin/env python3
+"""
+tools/stage_binary.py
+
+Compact, memory-mappable binary format for stage chunk sets.
+
+Why this exists
+---------------
+Every stage of the page pipelines writes indented JSON and every tool
+re-parses the whole file only to keep the chunks where
+``str(ch.get("page")) == page``. On the all-pages sets that is megabytes of
+JSON parsed per stage per page.
+
+A ``.stage`` file holds the same root object, laid out so one page can be
+read without touching the rest:
+
+    header        magic, version, chunk count, section table
+    meta          zlib JSON of the root minus "chunks"
+    page index    zlib JSON: [page_key, first, count, blob_off, blob_len] per page
+    order         uint32 per chunk: position in the original "chunks" list
+    shape         uint8 per chunk: how bbox / content were stored (see below)
+    geometry      float64 (n, 4) x0, y0, x1, y1 (NaN = not in the block)
+    text offsets  uint64 (n + 1) into the string table
+    strings       UTF-8 "content" strings, one page after another
+    page blobs    per page: zlib JSON list of the remaining chunk fields
+
+Chunks are stored grouped by page key (``str(chunk["page"])``, pages in
+first-appearance order). "bbox" and "content" keep their place in each
+chunk's JSON as ``null`` placeholders, so conversion back to JSON restores
+the original objects exactly (key order, list/dict bbox shape, chunk order).
+
+Usage (from project root):
+
+    py tools\\stage_binary.py to-bin  exports\\MostRecent\\notes.json notes.stage
+    py tools\\stage_binary.py to-json notes.stage notes_roundtrip.json
+    py tools\\stage_binary.py to-json notes.stage page3.json --page 3
+    py tools\\stage_binary.py info    notes.stage
+
+In code, ``load_stage(path, page=None)`` reads either format (detected by
+the file magic) and returns the usual ``{"chunks": [...], ...}`` root.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+
+MAGIC = b"PRSTAGE\x00"
+FORMAT_VERSION = 1
+
+# Header: magic, version, flags, n_chunks, then (offset, length) per section.
+SECTIONS = ("meta", "index", "order", "shape", "geom", "text_offsets", "text", "blobs")
+_HEADER = struct.Struct("<8sIIQ" + "QQ" * len(SECTIONS))
+
+FLAG_LIST_ROOT = 1  # original JSON root was a bare list of chunks
+
+# shape byte: low 3 bits = bbox storage, bit 3 = content in string table
+BBOX_ABSENT = 0  # no "bbox" key
+BBOX_NULL = 1  # "bbox": null
+BBOX_DICT = 2  # {"x0", "y0", "x1", "y1"} floats, in that order -> geometry block
+BBOX_LIST = 3  # [x0, y0, x1, y1] floats -> geometry block
+BBOX_OTHER = 4  # anything else, kept verbatim in the page blob
+CONTENT_IN_TABLE = 8
+
+_BBOX_KEYS = ("x0", "y0", "x1", "y1")
+
+PathLike = Union[str, Path]
+
+
+def page_key(chunk: Any) -> str:
+    """Page key used by the index (same comparison the stage tools use)."""
+    return str(chunk.get("page")) if isinstance(chunk, dict) else "None"
+
+
+def is_stage_file(path: PathLike) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+# ---------------------------------------------------------------------
+# Writing
+# ---------------------------------------------------------------------
+
+def _is_float4(values: List[Any]) -> bool:
+    return len(values) == 4 and all(type(v) is float for v in values)
+
+
+def _split_chunk(ch: Any) -> Tuple[Any, int, Optional[List[float]], Optional[str]]:
+    """Return (json_part, shape, geometry or None, content or None)."""
+    if not isinstance(ch, dict):
+        return ch, BBOX_ABSENT, None, None
+
+    rest = dict(ch)
+    shape = BBOX_ABSENT
+    geom = None
+    content = None
+
+    if "bbox" in ch:
+        bbox = ch["bbox"]
+        if bbox is None:
+            shape = BBOX_NULL
+        elif isinstance(bbox, dict) and tuple(bbox) == _BBOX_KEYS and _is_float4(list(bbox.values())):
+            shape, geom = BBOX_DICT, list(bbox.values())
+            rest["bbox"] = None
+        elif isinstance(bbox, list) and _is_float4(bbox):
+            shape, geom = BBOX_LIST, list(bbox)
+            rest["bbox"] = None
+        else:
+            shape = BBOX_OTHER
+
+    if isinstance(ch.get("content"), str):
+        content = ch["content"]
+        rest["content"] = None
+        shape |= CONTENT_IN_TABLE
+
+    return rest, shape, geom, content
+
+
+def write_stage(path: PathLike, root: Any) -> Dict[str, int]:
+    """Write a stage root (``{"chunks": [...]}`` or a bare list) as a .stage file."""
+    if isinstance(root, list):
+        flags, chunks, meta = FLAG_LIST_ROOT, root, {}
+    elif isinstance(root, dict) and isinstance(root.get("chunks"), list):
+        flags, chunks = 0, root["chunks"]
+        meta = {"keys": list(root), "values": {k: v for k, v in root.items() if k != "chunks"}}
+    else:
+        raise ValueError("Unsupported stage root. Expected {'chunks':[...]} or a list root.")
+
+    # Group chunk positions by page, pages in first-appearance order.
+    groups: Dict[str, List[int]] = {}
+    for i, ch in enumerate(chunks):
+        groups.setdefault(page_key(ch), []).append(i)
+
+    n = len(chunks)
+    order = np.empty(n, dtype=np.uint32)
+    shape = np.zeros(n, dtype=np.uint8)
+    geom = np.full((n, 4), np.nan, dtype=np.float64)
+    text_parts: List[bytes] = []
+    text_offsets = np.zeros(n + 1, dtype=np.uint64)
+    blobs: List[bytes] = []
+    index: List[List[Any]] = []
+
+    row = 0
+    text_pos = 0
+    blob_pos = 0
+    for key, positions in groups.items():
+        first = row
+        page_rest = []
+        for pos in positions:
+            rest, code, box, content = _split_chunk(chunks[pos])
+            order[row] = pos
+            shape[row] = code
+            if box is not None:
+                geom[row] = box
+            if content is not None:
+                encoded = content.encode("utf-8")
+                text_parts.append(encoded)
+                text_pos += len(encoded)
+            text_offsets[row + 1] = text_pos
+            page_rest.append(rest)
+            row += 1
+
+        blob = zlib.compress(
+            json.dumps(page_rest, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        )
+        index.append([key, first, len(positions), blob_pos, len(blob)])
+        blobs.append(blob)
+        blob_pos += len(blob)
+
+    payloads = {
+        "meta": zlib.compress(json.dumps(meta, ensure_ascii=False).encode("utf-8")),
+        "index": zlib.compress(json.dumps(index, ensure_ascii=False).encode("utf-8")),
+        "order": order.tobytes(),
+        "shape": shape.tobytes(),
+        "geom": geom.tobytes(),
+        "text_offsets": text_offsets.tobytes(),
+        "text": b"".join(text_parts),
+        "blobs": b"".join(blobs),
+    }
+
+    # Lay sections out after the header, 8-byte aligned for the arrays.
+    table: List[int] = []
+    pos = _HEADER.size
+    for name in SECTIONS:
+        pos = (pos + 7) & ~7
+        table += [pos, len(payloads[name])]
+        pos += len(payloads[name])
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, flags, n, *table))
+        for i, name in enumerate(SECTIONS):
+            f.seek(table[2 * i])
+            f.write(payloads[name])
+    os.replace(tmp, path)
+
+    return {"chunks": n, "pages": len(index), "bytes": pos}
+
+
+# ---------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------
+
+class StageFile:
+    """Memory-mapped reader; only the requested page's bytes are touched."""
+
+    def __init__(self, path: PathLike) -> None:
+        self.path = Path(path)
+        self._f = open(self.path, "rb")
+        try:
+            self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            self._f.close()
+            raise ValueError(f"Not a stage file: {self.path}")
+
+        fields = _HEADER.unpack_from(self._mm, 0)
+        magic, version, self.flags, self.n_chunks = fields[:4]
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Not a stage file: {self.path}")
+        if version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"Unsupported stage format version {version} in {self.path}")
+
+        self._sections = {
+            name: (fields[4 + 2 * i], fields[5 + 2 * i]) for i, name in enumerate(SECTIONS)
+        }
+        self._index: Dict[str, Tuple[int, int, int, int]] = {
+            str(key): (first, count, blob_off, blob_len)
+            for key, first, count, blob_off, blob_len in json.loads(
+                zlib.decompress(self._section_bytes("index"))
+            )
+        }
+
+    # context manager ----------------------------------------------------
+    def __enter__(self) -> "StageFile":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        mm = getattr(self, "_mm", None)
+        if mm is not None:
+            mm.close()
+            self._mm = None
+        self._f.close()
+
+    # low level ----------------------------------------------------------
+    def _section_bytes(self, name: str, start: int = 0, length: Optional[int] = None) -> bytes:
+        off, size = self._sections[name]
+        length = size - start if length is None else length
+        return self._mm[off + start: off + start + length]
+
+    def _array(self, name: str, dtype: Any, first: int, count: int, width: int = 1) -> np.ndarray:
+        """Zero-copy view of rows [first, first + count) of an array section."""
+        off, _ = self._sections[name]
+        dtype = np.dtype(dtype)
+        arr = np.frombuffer(
+            self._mm, dtype=dtype, count=count * width, offset=off + first * width * dtype.itemsize
+        )
+        return arr.reshape(count, width) if width > 1 else arr
+
+    # public -------------------------------------------------------------
+    def page_keys(self) -> List[str]:
+        return list(self._index)
+
+    def page_count(self, page: Any) -> int:
+        rec = self._index.get(str(page))
+        return rec[1] if rec else 0
+
+    def meta(self) -> Dict[str, Any]:
+        return json.loads(zlib.decompress(self._section_bytes("meta")))
+
+    def geometry(self, page: Any) -> np.ndarray:
+        """(count, 4) float64 bbox block of the page (NaN rows = no float bbox)."""
+        rec = self._index.get(str(page))
+        if rec is None:
+            return np.empty((0, 4), dtype=np.float64)
+        first, count, _, _ = rec
+        # Copy so the caller's array does not pin the mmap open.
+        return self._array("geom", np.float64, first, count, width=4).copy()
+
+    def original_indices(self, page: Any) -> np.ndarray:
+        """Positions of the page's chunks in the original "chunks" list."""
+        rec = self._index.get(str(page))
+        if rec is None:
+            return np.empty(0, dtype=np.uint32)
+        first, count, _, _ = rec
+        return self._array("order", np.uint32, first, count).copy()
+
+    def read_page(self, page: Any) -> List[Any]:
+        """Chunks whose ``str(chunk["page"]) == str(page)``, in original order."""
+        rec = self._index.get(str(page))
+        if rec is None:
+            return []
+        return self._read_rows(*rec)
+
+    def read_chunks(self) -> List[Any]:
+        """All chunks, in original order."""
+        out: List[Any] = [None] * self.n_chunks
+        for rec in self._index.values():
+            first, count = rec[0], rec[1]
+            order = self._array("order", np.uint32, first, count).tolist()
+            for pos, ch in zip(order, self._read_rows(*rec)):
+                out[pos] = ch
+        return out
+
+    def read_root(self, page: Any = None) -> Any:
+        """The original root object (only *page*'s chunks when given)."""
+        chunks = self.read_chunks() if page is None else self.read_page(page)
+        if self.flags & FLAG_LIST_ROOT:
+            return chunks
+        meta = self.meta()
+        values = meta["values"]
+        return {k: (chunks if k == "chunks" else values[k]) for k in meta["keys"]}
+
+    def _read_rows(self, first: int, count: int, blob_off: int, blob_len: int) -> List[Any]:
+        rows = json.loads(zlib.decompress(self._section_bytes("blobs", blob_off, blob_len)))
+        shape = self._array("shape", np.uint8, first, count).tolist()
+        geom = self._array("geom", np.float64, first, count, width=4).tolist() if count else []
+        offs = self._array("text_offsets", np.uint64, first, count + 1).tolist()
+        text_off, _ = self._sections["text"]
+
+        for i, ch in enumerate(rows):
+            code = shape[i]
+            bbox_code = code & 7
+            if bbox_code == BBOX_DICT:
+                ch["bbox"] = dict(zip(_BBOX_KEYS, geom[i]))
+            elif bbox_code == BBOX_LIST:
+                ch["bbox"] = list(geom[i])
+            if code & CONTENT_IN_TABLE:
+                ch["content"] = self._mm[text_off + offs[i]: text_off + offs[i + 1]].decode("utf-8")
+        return rows
+
+
+def load_stage(path: PathLike, page: Any = None) -> Any:
+    """
+    Load a stage root from JSON or .stage (detected by magic).
+
+    With *page*, only chunks whose ``str(page)`` matches are returned; for
+    .stage files that reads just that page's bytes.
+    """
+    if is_stage_file(path):
+        with StageFile(path) as sf:
+            return sf.read_root(page)
+
+    root = json.loads(Path(path).read_text(encoding="utf-8"))
+    if page is None:
+        return root
+    key = str(page)
+    if isinstance(root, list):
+        return [c for c in root if page_key(c) == key]
+    if isinstance(root, dict) and isinstance(root.get("chunks"), list):
+        root["chunks"] = [c for c in root["chunks"] if page_key(c) == key]
+    return root
+
+
+# ---------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Convert stage JSON <-> binary .stage files.")
+    sub = p.add_subparsers(dest="cmd", required=True)
+
+    a = sub.add_parser("to-bin", help="JSON stage -> .stage")
+    a.add_argument("src")
+    a.add_argument("dst")
+
+    b = sub.add_parser("to-json", help=".stage -> JSON stage")
+    b.add_argument("src")
+    b.add_argument("dst")
+    b.add_argument("--page", type=str, default=None, help="Only export this page.")
+    b.add_argument("--indent", type=int, default=2)
+
+    c = sub.add_parser("info", help="Print page index of a .stage file")
+    c.add_argument("src")
+    return p.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+
+    if args.cmd == "to-bin":
+        root = json.loads(Path(args.src).read_text(encoding="utf-8"))
+        stats = write_stage(args.dst, root)
+        src_size = Path(args.src).stat().st_size
+        print(
+            f"[OK] {args.src} -> {args.dst}  chunks={stats['chunks']} pages={stats['pages']} "
+            f"bytes={stats['bytes']} ({stats['bytes'] / max(1, src_size):.1%} of JSON)"
+        )
+        return 0
+
+    if args.cmd == "to-json":
+        root = load_stage(args.src, page=args.page)
+        Path(args.dst).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.dst).write_text(
+            json.dumps(root, indent=args.indent, ensure_ascii=False), encoding="utf-8"
+        )
+        print(f"[OK] {args.src} -> {args.dst}")
+        return 0
+
+    with StageFile(args.src) as sf:
+        print(f"{args.src}: chunks={sf.n_chunks} pages={len(sf.page_keys())}")
+        for key in sf.page_keys():
+            print(f"  page {key}: {sf.page_count(key)} chunk(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,582 @@
+#!/usr/bin/env python
+"""
+tools/sweep_grouping_params.py
+
+Sweep the hand-tuned grouping parameters against a labeled notes export and
+write a ranked report.
+
+Stages that can be swept (one per run):
+
+  grouper   SemanticGrouper layout grouping
+            (max_line_gap, max_indent_delta, partition_by_column, ...)
+  merge     merge_note_fragments.py                 (max_gap)
+  stitch    fix_split_notes_postmerge.py            (max_gap, min_overlap, x0_tolerance)
+
+Each stage is fed what it sees in the real pipeline:
+
+  grouper   the extracted lines (as in the Chunker)
+  merge     stages 1-2b of run_notes_page_pipeline.py on the extracted lines
+            (header tagging, bbox tightening, banner splitting), run once
+            with the same tools and arguments
+  stitch    the merge stage's output (default max_gap) on that input
+
+How it works
+------------
+1. The gold grouping comes from the labeled export: every top-level chunk is
+   one group and its content lines ("\\n"-separated) are the members.
+2. The PDF text is extracted ONCE (through the extraction cache) into the
+   same per-line chunks the Chunker produces, and every extracted line is
+   matched to a gold group by (page, text). The swept stage's upstream
+   output is built once from these lines; predicted groups are traced back
+   to the extracted lines they contain.
+3. Every combination of the parameter grid is run over all pages in a
+   process pool (the extracted lines are handed to each worker once) and
+   scored against the gold grouping:
+     - B-cubed precision / recall / F1 (per line)
+     - pairwise precision / recall / F1 (per pair of lines)
+     - runtime (seconds and lines/s for the grouping itself)
+4. Combinations are ranked by B-cubed F1 (then pairwise F1, then runtime).
+
+Usage (from repo root):
+
+    py tools\\sweep_grouping_params.py --stage grouper ^
+        --grid max_line_gap=8,12,18,24 --grid max_indent_delta=15,25,40 ^
+        --out exports\\grouping_sweep.json --workers 4
+
+    py tools\\sweep_grouping_params.py --stage stitch --pdf plans.pdf ^
+        --out exports\\stitch_sweep.json
+
+Without --grid a built-in grid around the current defaults is used.
+--pdf defaults to the "pdf_path" recorded in the labels file.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import fields
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backbone.chunking.chunk import Chunk
+from backbone.chunking.chunker import Chunker, ChunkerConfig
+from backbone.chunking.semantic_grouper import SemanticGrouper, SemanticGrouperConfig
+from backbone.intake.page_text import PageText
+
+import bbox_utils
+import fix_split_notes_postmerge
+import merge_note_fragments
+
+
+DEFAULT_LABELS = ROOT / "data" / "ocr_raw" / "all_pages_notes_labeled.json"
+
+# (text, (x0, y0, x1, y1)) per extracted line, per page
+PageLines = Dict[int, List[Tuple[str, Tuple[float, float, float, float]]]]
+
+# (page, line index) -> group key
+Assignment = Dict[Tuple[int, int], Any]
+
+# page -> (stage input chunks, chunk id -> extracted line ids it covers)
+Upstream = Dict[int, Tuple[List[Dict[str, Any]], Dict[str, List[str]]]]
+
+TOOLS = ROOT / "tools"
+
+# Stages 1-2b of run_notes_page_pipeline.py (same tools, same arguments):
+# their output is what merge_note_fragments runs on.
+PRE_MERGE_STAGES: List[Tuple[str, List[str]]] = [
+    ("tag_header_candidates.py", []),
+    ("tighten_group_bboxes.py", [
+        "--group-types", "note_group", "--child-types", "text_line",
+        "--min-child-overlap", "0.20", "--pad", "0.0",
+    ]),
+    ("split_banner_headers.py", [
+        "--x-tol", "140", "--split-gap", "2.0", "--edge-inset", "0.75",
+        "--min-banner-width", "250.0",
+    ]),
+    ("tighten_group_bboxes.py", [
+        "--group-types", "header", "--child-types", "text_line",
+        "--min-child-overlap", "0.20", "--pad", "1.5",
+    ]),
+]
+
+
+# ---------------------------------------------------------------------------
+# Stages: parameters + runner (page lines, params, upstream) -> predicted assignment
+# ---------------------------------------------------------------------------
+
+_GROUPER_SKIP = {"debug", "workers", "executor", "deterministic_ids"}
+GROUPER_PARAMS = {
+    f.name: f.default for f in fields(SemanticGrouperConfig) if f.name not in _GROUPER_SKIP
+}
+MERGE_PARAMS = {"max_gap": 28.0}
+STITCH_PARAMS = {"max_gap": 28.0, "min_overlap": 0.60, "x0_tolerance": 100.0}
+
+DEFAULT_GRIDS: Dict[str, Dict[str, List[Any]]] = {
+    "grouper": {
+        "max_line_gap": [6.0, 10.0, 14.0, 18.0, 24.0, 32.0],
+        "max_indent_delta": [10.0, 25.0, 40.0, 60.0],
+        "partition_by_column": [False, True],
+    },
+    "merge": {"max_gap": [8.0, 12.0, 16.0, 20.0, 28.0, 36.0, 48.0]},
+    "stitch": {
+        "max_gap": [8.0, 16.0, 28.0, 40.0],
+        "min_overlap": [0.3, 0.45, 0.6, 0.75],
+        "x0_tolerance": [50.0, 100.0, 150.0],
+    },
+}
+
+
+def _line_id(page: int, i: int) -> str:
+    return f"{page}:{i}"
+
+
+def _line_dicts(page: int, lines) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": _line_id(page, i),
+            "page": page,
+            "type": "text_line",
+            "text": text,
+            "bbox": {"x0": b[0], "y0": b[1], "x1": b[2], "y1": b[3]},
+        }
+        for i, (text, b) in enumerate(lines)
+    ]
+
+
+def _assign(page: int, groups: List[List[str]], n_lines: int) -> Assignment:
+    """Group member ids -> assignment; lines in no group become singletons."""
+    out: Assignment = {}
+    for g, ids in enumerate(groups):
+        for line_id in ids:
+            i = int(str(line_id).split(":", 1)[1])
+            out.setdefault((page, i), (page, g))
+    for i in range(n_lines):
+        out.setdefault((page, i), (page, "single", i))
+    return out
+
+
+def run_grouper(pages: PageLines, params: Dict[str, Any], upstream: Optional[Upstream]) -> Assignment:
+    grouper = SemanticGrouper(SemanticGrouperConfig(**params))
+    out: Assignment = {}
+    for page, lines in pages.items():
+        chunks = [
+            Chunk(id=_line_id(page, i), content=text, type="text_line", bbox=b, page=page)
+            for i, (text, b) in enumerate(lines)
+        ]
+        grouped = grouper.group_page_chunks(chunks, "notes_sheet")
+        groups = [[c.id for c in (g.children or [g])] for g in grouped]
+        out.update(_assign(page, groups, len(lines)))
+    return out
+
+
+def _merge_page(chunks: List[Dict[str, Any]], page: int, max_gap: float) -> List[Dict[str, Any]]:
+    with contextlib.redirect_stdout(io.StringIO()):
+        return merge_note_fragments.merge_note_fragments(chunks, page, max_gap=max_gap)
+
+
+def run_merge(pages: PageLines, params: Dict[str, Any], upstream: Optional[Upstream]) -> Assignment:
+    out: Assignment = {}
+    for page, lines in pages.items():
+        chunks, members = upstream[page]
+        merged = _merge_page(chunks, page, float(params["max_gap"]))
+        groups = [
+            [line for cid in (c.get("metadata") or {}).get("merge_diagnostics", {}).get("source_ids", [])
+             for line in members.get(str(cid), [])]
+            for c in merged
+            if c.get("type") == "merged_note"
+        ]
+        out.update(_assign(page, groups, len(lines)))
+    return out
+
+
+def run_stitch(pages: PageLines, params: Dict[str, Any], upstream: Optional[Upstream]) -> Assignment:
+    out: Assignment = {}
+    for page, lines in pages.items():
+        chunks, members = upstream[page]
+        items = [(i, ch, bbox_utils.extract_bbox(ch)) for i, ch in enumerate(chunks)]
+        stitched = fix_split_notes_postmerge.stitch_page(
+            page_num=page,
+            page_items=[item for item in items if item[2] is not None],
+            max_gap=float(params["max_gap"]),
+            min_overlap=float(params["min_overlap"]),
+            x0_tolerance=float(params["x0_tolerance"]),
+        )
+        groups = [
+            [
+                line
+                for cid in (c.get("metadata") or {}).get("postmerge_stitched_from_ids") or [c.get("id")]
+                for line in members.get(str(cid), [])
+            ]
+            for c in stitched
+        ]
+        out.update(_assign(page, groups, len(lines)))
+    return out
+
+
+STAGES: Dict[
+    str, Tuple[Dict[str, Any], Callable[[PageLines, Dict[str, Any], Optional[Upstream]], Assignment]]
+] = {
+    "grouper": (GROUPER_PARAMS, run_grouper),
+    "merge": (MERGE_PARAMS, run_merge),
+    "stitch": (STITCH_PARAMS, run_stitch),
+}
+
+
+# ---------------------------------------------------------------------------
+# Gold + extraction
+# ---------------------------------------------------------------------------
+
+def load_labels(path: Path) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+    root = json.loads(path.read_text(encoding="utf-8"))
+    if isinstance(root, dict):
+        return root.get("pdf_path"), [c for c in root.get("chunks", []) if isinstance(c, dict)]
+    return None, [c for c in root if isinstance(c, dict)]
+
+
+def gold_lines(chunks: List[Dict[str, Any]]) -> Dict[int, Dict[str, List[int]]]:
+    """page -> line text -> gold group index per occurrence (in export order)."""
+    out: Dict[int, Dict[str, List[int]]] = defaultdict(lambda: defaultdict(list))
+    for g, ch in enumerate(chunks):
+        try:
+            page = int(ch.get("page"))
+        except (TypeError, ValueError):
+            continue
+        text = ch.get("content") or ch.get("text") or ""
+        for line in text.split("\n"):
+            line = line.strip()
+            if line:
+                out[page][line].append(g)
+    return out
+
+
+def extract_pages(pdf_path: str, pages: List[int]) -> PageLines:
+    """Per-line chunks exactly as the Chunker builds them (extraction cached)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        chunker = Chunker(ChunkerConfig(debug=False))
+    out: PageLines = {}
+    for page in pages:
+        blocks = PageText.load(pdf_path, page - 1).blocks
+        lines = chunker._lines_from_blocks(blocks, page)
+        out[page] = [(c.content, tuple(c.bbox)) for c in lines]
+    return out
+
+
+def match_gold(pages: PageLines, gold: Dict[int, Dict[str, List[int]]]) -> Assignment:
+    """(page, line index) -> gold group, for extracted lines found in the labels."""
+    out: Assignment = {}
+    for page, lines in pages.items():
+        remaining = {t: list(gs) for t, gs in gold.get(page, {}).items()}
+        for i, (text, _b) in enumerate(lines):
+            queue = remaining.get(text)
+            if queue:
+                out[(page, i)] = (page, queue.pop(0))
+    return out
+
+
+def run_pre_merge_stages(page: int, lines) -> List[Dict[str, Any]]:
+    """Stages 1-2b of the notes page pipeline on one page's extracted lines."""
+    with tempfile.TemporaryDirectory(prefix="sweep_") as tmp:
+        current = Path(tmp) / "stage0.json"
+        current.write_text(json.dumps(_line_dicts(page, lines)), encoding="utf-8")
+        for n, (script, args) in enumerate(PRE_MERGE_STAGES, start=1):
+            nxt = Path(tmp) / f"stage{n}.json"
+            cmd = [
+                sys.executable, str(TOOLS / script),
+                "--input", str(current), "--output", str(nxt), "--page", str(page),
+            ] + args
+            proc = subprocess.run(cmd, cwd=str(ROOT), capture_output=True, text=True)
+            if proc.returncode != 0 or not nxt.exists():
+                raise RuntimeError(f"{script} failed on page {page}:\n{proc.stderr.strip()}")
+            current = nxt
+        root = json.loads(current.read_text(encoding="utf-8"))
+    chunks = root.get("chunks", []) if isinstance(root, dict) else root
+    return [c for c in chunks if isinstance(c, dict)]
+
+
+def build_upstream(stage: str, pages: PageLines) -> Tuple[Optional[Upstream], str]:
+    """Input of *stage* in the real pipeline, per page, plus a description."""
+    if stage == "grouper":
+        return None, "extracted lines"
+
+    upstream: Upstream = {}
+    for page, lines in pages.items():
+        chunks = run_pre_merge_stages(page, lines)
+        members = {str(c["id"]): [str(c["id"])] for c in chunks if c.get("id") is not None}
+        if stage == "stitch":
+            # merge_note_fragments leaves merged notes without an id; give
+            # them one so stitched groups can be traced back to their lines.
+            merged = _merge_page(chunks, page, float(MERGE_PARAMS["max_gap"]))
+            for k, ch in enumerate(merged):
+                if ch.get("type") == "merged_note":
+                    ch["id"] = f"merged:{page}:{k}"
+                    members[ch["id"]] = [
+                        line
+                        for cid in ch["metadata"]["merge_diagnostics"]["source_ids"]
+                        for line in members.get(str(cid), [])
+                    ]
+            chunks = merged
+        upstream[page] = (chunks, members)
+
+    described = "stages 1-2b of run_notes_page_pipeline.py"
+    if stage == "stitch":
+        described += f" + merge_note_fragments (max_gap={MERGE_PARAMS['max_gap']})"
+    return upstream, described
+
+
+# ---------------------------------------------------------------------------
+# Scoring
+# ---------------------------------------------------------------------------
+
+def _f1(p: float, r: float) -> float:
+    return 2 * p * r / (p + r) if p + r else 0.0
+
+
+def score(pred: Assignment, gold: Assignment) -> Dict[str, float]:
+    """B-cubed and pairwise precision / recall / F1 over the gold lines."""
+    keys = [k for k in gold if k in pred]
+    n = len(keys)
+    if not n:
+        return {k: 0.0 for k in ("b3_p", "b3_r", "b3_f1", "pair_p", "pair_r", "pair_f1")}
+
+    cell = Counter((pred[k], gold[k]) for k in keys)
+    p_size = Counter(pred[k] for k in keys)
+    g_size = Counter(gold[k] for k in keys)
+
+    b3_p = sum(c * c / p_size[p] for (p, _g), c in cell.items()) / n
+    b3_r = sum(c * c / g_size[g] for (_p, g), c in cell.items()) / n
+
+    pairs = lambda c: c * (c - 1) / 2
+    tp = sum(pairs(c) for c in cell.values())
+    pred_pairs = sum(pairs(c) for c in p_size.values())
+    gold_pairs = sum(pairs(c) for c in g_size.values())
+    pair_p = tp / pred_pairs if pred_pairs else 1.0
+    pair_r = tp / gold_pairs if gold_pairs else 1.0
+
+    return {
+        "b3_p": b3_p,
+        "b3_r": b3_r,
+        "b3_f1": _f1(b3_p, b3_r),
+        "pair_p": pair_p,
+        "pair_r": pair_r,
+        "pair_f1": _f1(pair_p, pair_r),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Worker pool
+# ---------------------------------------------------------------------------
+
+_W: Dict[str, Any] = {}
+
+
+def _init_worker(stage: str, pages: PageLines, gold: Assignment, upstream: Optional[Upstream]) -> None:
+    _W["run"] = STAGES[stage][1]
+    _W["pages"] = pages
+    _W["gold"] = gold
+    _W["upstream"] = upstream
+
+
+def _evaluate(params: Dict[str, Any]) -> Dict[str, Any]:
+    t0 = time.perf_counter()
+    try:
+        pred = _W["run"](_W["pages"], params, _W["upstream"])
+    except Exception as exc:  # keep the sweep going; report the failure
+        return {"params": params, "error": f"{type(exc).__name__}: {exc}"}
+    elapsed = time.perf_counter() - t0
+
+    n_lines = sum(len(v) for v in _W["pages"].values())
+    row: Dict[str, Any] = {"params": params}
+    row.update(score(pred, _W["gold"]))
+    row["seconds"] = elapsed
+    row["lines_per_s"] = n_lines / elapsed if elapsed > 0 else 0.0
+    return row
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def _parse_value(raw: str, default: Any) -> Any:
+    if isinstance(default, bool):
+        if raw.lower() in ("1", "true", "yes", "on"):
+            return True
+        if raw.lower() in ("0", "false", "no", "off"):
+            return False
+        raise ValueError(f"not a boolean: {raw!r}")
+    if isinstance(default, int):
+        return int(raw)
+    if isinstance(default, float):
+        return float(raw)
+    return raw
+
+
+def build_grid(stage: str, specs: List[str]) -> List[Dict[str, Any]]:
+    """Every combination of the --grid values (built-in grid if none given)."""
+    known = STAGES[stage][0]
+    axes: Dict[str, List[Any]] = {}
+    if specs:
+        for spec in specs:
+            name, _, values = spec.partition("=")
+            name = name.strip().replace("-", "_")
+            if name not in known:
+                raise SystemExit(
+                    f"Unknown parameter {name!r} for stage {stage!r}; "
+                    f"expected one of {sorted(known)}"
+                )
+            axes[name] = [_parse_value(v.strip(), known[name]) for v in values.split(",") if v.strip()]
+    else:
+        axes = dict(DEFAULT_GRIDS[stage])
+
+    names = list(axes)
+    return [dict(zip(names, combo)) for combo in itertools.product(*(axes[n] for n in names))]
+
+
+def write_markdown(path: Path, report: Dict[str, Any], top: int) -> None:
+    names = list(report["rows"][0]["params"]) if report["rows"] else []
+    lines = [
+        f"# Grouping parameter sweep: {report['stage']}",
+        "",
+        f"- Labels: `{report['labels']}`",
+        f"- PDF: `{report['pdf']}`",
+        f"- Stage input: {report['upstream']}",
+        f"- Pages: {len(report['pages'])}, lines: {report['lines']}, "
+        f"matched to gold: {report['matched_lines']}",
+        f"- Combinations: {len(report['rows'])}, wall time: {report['wall_seconds']:.1f}s",
+        "",
+        "| rank | " + " | ".join(names) + " | B3 F1 | B3 P | B3 R | pair F1 | s |",
+        "|---:|" + "---|" * len(names) + "---:|---:|---:|---:|---:|",
+    ]
+    for rank, row in enumerate(report["rows"][:top], start=1):
+        if "error" in row:
+            continue
+        vals = " | ".join(str(row["params"][n]) for n in names)
+        lines.append(
+            f"| {rank} | {vals} | {row['b3_f1']:.4f} | {row['b3_p']:.4f} | {row['b3_r']:.4f} "
+            f"| {row['pair_f1']:.4f} | {row['seconds']:.3f} |"
+        )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    p = argparse.ArgumentParser(description="Sweep grouping parameters against labeled notes.")
+    p.add_argument("--stage", choices=sorted(STAGES), default="grouper")
+    p.add_argument("--labels", default=str(DEFAULT_LABELS), help="Labeled notes export (gold grouping).")
+    p.add_argument("--pdf", default=None, help="Source PDF (default: pdf_path from the labels file).")
+    p.add_argument(
+        "--grid",
+        action="append",
+        default=[],
+        metavar="NAME=V1,V2,...",
+        help="Values for one parameter (repeatable). Default: built-in grid for the stage.",
+    )
+    p.add_argument("--pages", type=int, nargs="+", default=None, help="Only these pages (1-based).")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    p.add_argument("--out", required=True, help="Ranked report (JSON); a .md table is written next to it.")
+    p.add_argument("--top", type=int, default=20, help="Rows to print / put in the Markdown table.")
+    return p.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    a = parse_args(argv)
+
+    labels_path = Path(a.labels)
+    if not labels_path.exists():
+        print(f"ERROR: labels file not found: {labels_path}")
+        return 1
+    label_pdf, label_chunks = load_labels(labels_path)
+    pdf_path = a.pdf or label_pdf
+    if not pdf_path or not Path(pdf_path).exists():
+        print(f"ERROR: PDF not found: {pdf_path!r} (pass --pdf)")
+        return 1
+
+    grid = build_grid(a.stage, a.grid)
+    gold_by_text = gold_lines(label_chunks)
+    pages = sorted(a.pages or gold_by_text.keys())
+
+    print(f">>> Extracting {len(pages)} page(s) from {pdf_path} ...")
+    t0 = time.perf_counter()
+    page_lines = extract_pages(pdf_path, pages)
+    gold = match_gold(page_lines, gold_by_text)
+    n_lines = sum(len(v) for v in page_lines.values())
+    print(
+        f"    {n_lines} lines, {len(gold)} matched to gold "
+        f"({time.perf_counter() - t0:.1f}s)"
+    )
+    if not gold:
+        print("ERROR: no extracted line matched the labels (wrong PDF?)")
+        return 1
+
+    t0 = time.perf_counter()
+    upstream, upstream_desc = build_upstream(a.stage, page_lines)
+    if upstream is not None:
+        print(f">>> Stage input: {upstream_desc} ({time.perf_counter() - t0:.1f}s)")
+
+    workers = max(1, min(int(a.workers), len(grid)))
+    print(f">>> Evaluating {len(grid)} combination(s) of stage '{a.stage}' on {workers} worker(s) ...")
+    t0 = time.perf_counter()
+    if workers == 1:
+        _init_worker(a.stage, page_lines, gold, upstream)
+        rows = [_evaluate(params) for params in grid]
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(a.stage, page_lines, gold, upstream),
+        ) as pool:
+            rows = list(pool.map(_evaluate, grid, chunksize=max(1, len(grid) // (workers * 4))))
+    wall = time.perf_counter() - t0
+
+    ok = [r for r in rows if "error" not in r]
+    failed = [r for r in rows if "error" in r]
+    ok.sort(key=lambda r: (-r["b3_f1"], -r["pair_f1"], r["seconds"]))
+
+    report = {
+        "stage": a.stage,
+        "labels": str(labels_path),
+        "pdf": str(pdf_path),
+        "upstream": upstream_desc,
+        "pages": pages,
+        "lines": n_lines,
+        "matched_lines": len(gold),
+        "wall_seconds": wall,
+        "rows": ok + failed,
+    }
+
+    out_path = Path(a.out)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    md_path = out_path.with_suffix(".md")
+    write_markdown(md_path, report, a.top)
+
+    print(f"\n>>> Top {min(a.top, len(ok))} of {len(rows)} (wall {wall:.1f}s):")
+    for rank, row in enumerate(ok[: a.top], start=1):
+        params = ", ".join(f"{k}={v}" for k, v in row["params"].items())
+        print(
+            f"  {rank:>3}. B3 F1={row['b3_f1']:.4f} pair F1={row['pair_f1']:.4f} "
+            f"{row['seconds']:.3f}s  {params}"
+        )
+    for row in failed:
+        print(f"  [FAILED] {row['params']}: {row['error']}")
+
+    print(f"\n[OK] Wrote: {out_path}")
+    print(f"[OK] Wrote: {md_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
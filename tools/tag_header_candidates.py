@@ -31,17 +31,20 @@ import argparse
 import json
 import os
 import re
+import sys
+from pathlib import Path
 from typing import Any, Dict
 
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
 
-# Core signals
-NOTES_RE = re.compile(r"\bNOTES\b", re.IGNORECASE)
-BAD_CONTEXT_RE = re.compile(r"\b(SEE|REFER TO)\b", re.IGNORECASE)
-CONT_RE = re.compile(r"\bCONT(?:'D|INUED|\.|’D)?\b", re.IGNORECASE)
+from backbone.chunking.note_structure import classify_line, line_role
 
-# Allow common header characters (FIX: include ":" and unicode apostrophe ’)
-# Also allow periods/commas/parentheses/dashes which appear in your headers.
-HEADER_SHAPE_RE = re.compile(r"^[A-Z0-9\s/&'’\-(),.:]+$")
+# Continuation marker ("(CONT'D)", "CONTINUED", ...). The header rule itself
+# (NOTES word, caps ratio, word count, header characters incl. ":" and ’)
+# lives in backbone.chunking.note_structure.
+CONT_RE = re.compile(r"\bCONT(?:'D|INUED|\.|’D)?\b", re.IGNORECASE)
 
 
 def parse_args() -> argparse.Namespace:
@@ -81,13 +84,6 @@ def normalize_spaces(s: str) -> str:
     return re.sub(r"\s+", " ", (s or "").strip())
 
 
-def uppercase_ratio(s: str) -> float:
-    letters = [c for c in s if c.isalpha()]
-    if not letters:
-        return 0.0
-    return sum(1 for c in letters if c.isupper()) / len(letters)
-
-
 def header_norm(s: str) -> str:
     """
     Normalize header text for matching:
@@ -103,38 +99,7 @@ def header_norm(s: str) -> str:
 
 
 def is_header_candidate(text: str) -> bool:
-    s0 = normalize_spaces(text)
-    if not s0:
-        return False
-
-    # Must contain NOTES
-    if not NOTES_RE.search(s0):
-        return False
-
-    # Avoid "SEE / REFER TO" lines (these are usually not headers)
-    if BAD_CONTEXT_RE.search(s0) and not CONT_RE.search(s0):
-        return False
-
-    # Reject obvious sentence-like "(SEE ... NOTES)." patterns
-    if s0.endswith(".") and "(" in s0 and not CONT_RE.search(s0):
-        return False
-
-    # Headers are almost always mostly uppercase on your sheets
-    if uppercase_ratio(s0) < 0.80:
-        return False
-
-    # Word count sanity (prevents grabbing paragraphs)
-    wc = len(s0.split())
-    if wc < 2 or wc > 14:
-        return False
-
-    # Character whitelist sanity:
-    # allow trailing ":" by checking after stripping it
-    shape_check = s0.rstrip(" :")
-    if not HEADER_SHAPE_RE.match(shape_check.upper()):
-        return False
-
-    return True
+    return classify_line(text).header_candidate
 
 
 def main() -> None:
@@ -152,7 +117,7 @@ def main() -> None:
             continue
 
         txt = get_text(ch)
-        if not is_header_candidate(txt):
+        if not line_role(ch, txt).header_candidate:
             continue
 
         # Preserve prior type for debugging
@@ -17,11 +17,22 @@ py tools\\visualize_note_columns.py --pdf test.pdf --json exports\\MostRecent\\p
 import argparse
 import json
 import re
+import sys
+from pathlib import Path
 from typing import Any, Dict, List, Tuple, Optional
 
 import fitz  # PyMuPDF
 from PIL import Image, ImageDraw
 
+ROOT = Path(__file__).resolve().parents[1]
+
+# Ensure project root is on sys.path so imports work when running from tools/
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backbone.chunking.note_structure import classify_line
+from backbone.intake.document_pool import open_document
+
 BBox = Tuple[float, float, float, float]
 
 
@@ -29,9 +40,6 @@ BBox = Tuple[float, float, float, float]
 # Text helpers
 # -----------------------------
 
-HEADER_RE = re.compile(r"^[A-Z0-9&/\-\s]{4,90}NOTES(?:\s*\([^)]*\))?:?$")
-
-
 def get_text(ch: Dict[str, Any]) -> str:
     if isinstance(ch.get("text"), str):
         return ch["text"]
@@ -41,16 +49,8 @@ def get_text(ch: Dict[str, Any]) -> str:
 
 
 def is_header(text: str) -> bool:
-    t = re.sub(r"\s+", " ", (text or "").strip())
-    if "NOTES" not in t:
-        return False
-
-    letters = [c for c in t if c.isalpha()]
-    if not letters:
-        return False
-
-    upper_ratio = sum(1 for c in letters if c.isupper()) / max(len(letters), 1)
-    return upper_ratio >= 0.85 and bool(HEADER_RE.match(t))
+    # >=85% caps, ends in "NOTES" (+ optional "(...)" / ":"); see note_structure
+    return classify_line(text).header_caps
 
 
 def norm_header(text: str) -> str:
@@ -169,7 +169,7 @@ def main() -> None:
         if p == page_num:
             page_chunks.append((i, ch))
 
-    doc = fitz.open(args.pdf)
+    doc = open_document(args.pdf)
     page = doc[page_num - 1]
 
     scale = args.dpi / 72.0
@@ -18,12 +18,21 @@ from __future__ import annotations
 
 import argparse
 import json
+import sys
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 import fitz  # PyMuPDF
 from PIL import Image, ImageDraw, ImageFont
 
+ROOT = Path(__file__).resolve().parents[1]
+
+# Ensure project root is on sys.path so imports work when running from tools/
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from backbone.intake.document_pool import open_document
+
 import bbox_utils
 
 
@@ -67,7 +76,7 @@ def _parse_type_list(s: str) -> List[str]:
 
 
 def _render_page(pdf_path: Path, page_1_based: int, dpi: int) -> Image.Image:
-    doc = fitz.open(str(pdf_path))
+    doc = open_document(str(pdf_path))
     page = doc.load_page(page_1_based - 1)
     mat = fitz.Matrix(dpi / 72.0, dpi / 72.0)
     pix = page.get_pixmap(matrix=mat, alpha=False)
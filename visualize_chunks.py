@@ -2,6 +2,7 @@ import os
 import fitz  # PyMuPDF
 from PIL import Image, ImageDraw
 from backbone.chunking import Chunker
+from backbone.intake.document_pool import open_document
 
 PDF_NAME = "test.pdf"
 OUTPUT_DIR = "chunk_visuals"
@@ -34,7 +35,7 @@ def visualize_pdf_chunks():
     for chunk in chunks:
         pages.setdefault(chunk.page_number, []).append(chunk)
 
-    doc = fitz.open(PDF_NAME)
+    doc = open_document(PDF_NAME)
     zoom = DPI / 72.0
     matrix = fitz.Matrix(zoom, zoom)
 